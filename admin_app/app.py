@@ -9,6 +9,9 @@ from admin_app.handlers import (
     get_daily_stats,
     get_language_stats,
     get_performance_stats,
+    get_write_stats,
+    get_query_stats,
+    get_pool_stats,
     get_users,
     block_user_endpoint,
     unblock_user_endpoint,
@@ -16,6 +19,8 @@ from admin_app.handlers import (
     send_message_endpoint,
     get_user_history,
     get_translation_logs,
+    search_translation_logs,
+    get_archived_translation_logs,
     get_feedback,
     update_feedback_status,
     get_admin_logs_endpoint,
@@ -66,6 +71,9 @@ def setup_admin_routes(aiohttp_app):
     aiohttp_app.router.add_get('/api/stats/daily', get_daily_stats)
     aiohttp_app.router.add_get('/api/stats/languages', get_language_stats)
     aiohttp_app.router.add_get('/api/stats/performance', get_performance_stats)
+    aiohttp_app.router.add_get('/api/stats/writes', get_write_stats)
+    aiohttp_app.router.add_get('/api/stats/queries', get_query_stats)
+    aiohttp_app.router.add_get('/api/stats/pool', get_pool_stats)
 
     # API routes - Users
     aiohttp_app.router.add_get('/api/users/', get_users)
@@ -77,6 +85,8 @@ def setup_admin_routes(aiohttp_app):
 
     # API routes - Logs
     aiohttp_app.router.add_get('/api/logs/translations', get_translation_logs)
+    aiohttp_app.router.add_get('/api/logs/search', search_translation_logs)
+    aiohttp_app.router.add_get('/api/logs/archive', get_archived_translation_logs)
 
     # API routes - Feedback
     aiohttp_app.router.add_get('/api/feedback', get_feedback)
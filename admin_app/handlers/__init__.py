@@ -1,6 +1,6 @@
 """Admin panel handlers"""
 
-from .stats import get_stats, get_daily_stats, get_language_stats, get_performance_stats
+from .stats import get_stats, get_daily_stats, get_language_stats, get_performance_stats, get_write_stats, get_query_stats, get_pool_stats
 from .users import (
     get_users,
     block_user_endpoint,
@@ -9,7 +9,7 @@ from .users import (
     send_message_endpoint,
     get_user_history
 )
-from .logs import get_translation_logs
+from .logs import get_translation_logs, search_translation_logs, get_archived_translation_logs
 from .feedback import get_feedback, update_feedback_status
 from .admin_logs import get_admin_logs_endpoint
 from .roles import (
@@ -30,6 +30,9 @@ __all__ = [
     'get_daily_stats',
     'get_language_stats',
     'get_performance_stats',
+    'get_write_stats',
+    'get_query_stats',
+    'get_pool_stats',
     'get_users',
     'block_user_endpoint',
     'unblock_user_endpoint',
@@ -37,6 +40,8 @@ __all__ = [
     'send_message_endpoint',
     'get_user_history',
     'get_translation_logs',
+    'search_translation_logs',
+    'get_archived_translation_logs',
     'get_feedback',
     'update_feedback_status',
     'get_admin_logs_endpoint',
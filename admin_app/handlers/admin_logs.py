@@ -2,21 +2,26 @@
 
 from aiohttp import web
 from admin_app.auth import check_admin_with_permission
+from admin_app.pagination import decode_cursor, wants_exact_total, count_rows, page_response
 
 
 async def get_admin_logs_endpoint(request):
-    """Get admin action logs"""
+    """Get admin action logs, newest first, with keyset pagination"""
     from aiohttp import web as aiohttp_web
 
     try:
         await check_admin_with_permission(request, 'view_admin_logs')  # Check admin access
 
         from bot.database import db
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
+        from datetime import datetime
 
         # Get query parameters
         admin_user_id = request.query.get('admin_user_id')
         action = request.query.get('action')
         limit = int(request.query.get('limit', 100))
+        cursor = decode_cursor(request.query.get('cursor'))
+        exact = wants_exact_total(request)
 
         # Convert admin_user_id to int if provided
         if admin_user_id:
@@ -26,13 +31,28 @@ async def get_admin_logs_endpoint(request):
         logs = await db.get_admin_logs(
             admin_user_id=admin_user_id,
             action=action,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
 
-        return web.json_response({
-            "logs": logs,
-            "total": len(logs)
-        })
+        # Total with the same filters
+        conditions = []
+        params = []
+        if admin_user_id:
+            conditions.append("aa.admin_user_id = ?")
+            params.append(admin_user_id)
+        if action:
+            conditions.append("aa.action = ?")
+            params.append(action)
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
+            total = await count_rows(conn, "FROM admin_actions aa", where_clause, params, exact)
+
+        last = logs[-1] if logs else None
+        last_row = (datetime.fromisoformat(last['created_at']) if last['created_at'] else None,
+                    last['id']) if last else None
+        return page_response("logs", logs, last_row, limit, total, exact)
     except aiohttp_web.HTTPException:
         raise  # Re-raise HTTP exceptions (403, 404, etc.)
     except Exception as e:
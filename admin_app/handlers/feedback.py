@@ -2,26 +2,37 @@
 
 from aiohttp import web
 from admin_app.auth import check_admin_with_permission
+from admin_app.pagination import decode_cursor, wants_exact_total, count_rows, page_response
 
 
 async def get_feedback(request):
-    """Get all feedback with optional status filter"""
+    """Get feedback with optional status filter, newest first, with keyset pagination"""
     from aiohttp import web as aiohttp_web
 
     try:
         await check_admin_with_permission(request, 'view_feedback')
 
         from bot.database import db
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
+        from datetime import datetime
 
         status = request.query.get('status', None)
         limit = int(request.query.get('limit', 100))
+        cursor = decode_cursor(request.query.get('cursor'))
+        exact = wants_exact_total(request)
 
-        feedback_list = await db.get_all_feedback(status=status, limit=limit)
+        feedback_list = await db.get_all_feedback(status=status, limit=limit, cursor=cursor)
 
-        return web.json_response({
-            "feedback": feedback_list,
-            "total": len(feedback_list)
-        })
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
+            total = await count_rows(
+                conn, "FROM feedback f",
+                "WHERE f.status = ?" if status else "", [status] if status else [], exact
+            )
+
+        last = feedback_list[-1] if feedback_list else None
+        last_row = (datetime.fromisoformat(last['created_at']) if last['created_at'] else None,
+                    last['id']) if last else None
+        return page_response("feedback", feedback_list, last_row, limit, total, exact)
     except aiohttp_web.HTTPException:
         raise  # Re-raise HTTP exceptions (403, 404, etc.)
     except Exception as e:
@@ -2,20 +2,22 @@
 
 from aiohttp import web
 from admin_app.auth import check_admin_with_permission
+from admin_app.pagination import decode_cursor, wants_exact_total, count_rows, page_response
 
 
 async def get_translation_logs(request):
-    """Get translation logs"""
+    """Get translation logs, newest first, with keyset pagination (cursor from next_cursor)"""
     from aiohttp import web as aiohttp_web
 
     try:
         await check_admin_with_permission(request, 'view_logs')
 
         from bot.database import db
-        from bot.db_adapter import db_adapter
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
 
-        page = int(request.query.get('page', 1))
         per_page = int(request.query.get('per_page', 20))
+        cursor = decode_cursor(request.query.get('cursor'))
+        exact = wants_exact_total(request)
         filter_type = request.query.get('filter', 'all')
         search = request.query.get('search', '').strip()
 
@@ -29,25 +31,37 @@ async def get_translation_logs(request):
             where_conditions.append("is_voice = FALSE")
 
         if search:
-            # Search in username, source_text, and translation
-            where_conditions.append("(u.username ILIKE ? OR th.source_text ILIKE ? OR th.basic_translation ILIKE ?)")
+            # Search in username, source_text, and translation. The username match is a
+            # subquery so all three branches are index scans on translation_history
+            # (user_id and trigram indexes, migration 019)
+            where_conditions.append(
+                "(th.user_id IN (SELECT user_id FROM users WHERE username ILIKE ?)"
+                " OR th.source_text ILIKE ? OR th.basic_translation ILIKE ?)"
+            )
             search_pattern = f"%{search}%"
             params.extend([search_pattern, search_pattern, search_pattern])
 
         where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        count_params = list(params)
 
-        # Add pagination params
-        params.extend([per_page, (page-1)*per_page])
+        # Rows after the cursor of the previous page
+        page_conditions = list(where_conditions)
+        if cursor:
+            # created_at is the NOT NULL partition key (migration 018), plain row comparison is enough
+            page_conditions.append("(th.created_at, th.id) < (?, ?)")
+            params.extend(cursor)
+        page_where = "WHERE " + " AND ".join(page_conditions) if page_conditions else ""
+        params.append(per_page)
 
-        async with db_adapter.get_connection() as conn:
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
             rows = await conn.fetchall(
                 f"""SELECT th.id, th.user_id, u.username, th.source_language, th.target_language,
                            th.source_text, th.basic_translation, th.created_at, th.is_voice
                    FROM translation_history th
                    LEFT JOIN users u ON th.user_id = u.user_id
-                   {where_clause}
-                   ORDER BY th.created_at DESC
-                   LIMIT ? OFFSET ?""",
+                   {page_where}
+                   ORDER BY th.created_at DESC, th.id DESC
+                   LIMIT ?""",
                 *params
             )
 
@@ -65,13 +79,162 @@ async def get_translation_logs(request):
                     "is_voice": bool(row[8])
                 })
 
-            # Get total count (reuse where_clause and search params)
-            count_params = params[:-2]  # Exclude LIMIT and OFFSET params
-            count_query = f"""SELECT COUNT(*) FROM translation_history th
-                              LEFT JOIN users u ON th.user_id = u.user_id
-                              {where_clause}"""
-            total_row = await conn.fetchone(count_query, *count_params)
-            total = total_row[0] if total_row else 0
+            # Estimated total (reuse where_clause and search params) unless exact_total=true
+            total = await count_rows(
+                conn, "FROM translation_history th LEFT JOIN users u ON th.user_id = u.user_id",
+                where_clause, count_params, exact
+            )
+
+        last_row = (rows[-1][7], rows[-1][0]) if rows else None
+        return page_response("logs", logs, last_row, per_page, total, exact)
+    except aiohttp_web.HTTPException:
+        raise  # Re-raise HTTP exceptions (403, 404, etc.)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def search_translation_logs(request):
+    """Full-text search over translations, best matches first (ts_rank over search_vector)"""
+    from aiohttp import web as aiohttp_web
+
+    try:
+        await check_admin_with_permission(request, 'view_logs')
+
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
+
+        query = request.query.get('q', '').strip()
+        limit = min(int(request.query.get('limit', 20)), 100)
+        user_id = request.query.get('user_id', '').strip()
+
+        if not query:
+            return web.json_response({"error": "Query parameter q is required"}, status=400)
+
+        params = [query]
+        user_condition = ""
+        if user_id:
+            user_condition = "AND th.user_id = ?"
+            params.append(int(user_id))
+        params.append(limit)
+
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
+            rows = await conn.fetchall(
+                f"""SELECT th.id, th.user_id, u.username, th.source_language, th.target_language,
+                           th.source_text, th.basic_translation, th.created_at, th.is_voice,
+                           ts_rank(th.search_vector, q) AS rank
+                   FROM translation_history th
+                   CROSS JOIN websearch_to_tsquery('pg_catalog.simple', ?) q
+                   LEFT JOIN users u ON th.user_id = u.user_id
+                   WHERE th.search_vector @@ q {user_condition}
+                   ORDER BY rank DESC, th.created_at DESC
+                   LIMIT ?""",
+                *params
+            )
+
+        results = []
+        for row in rows:
+            results.append({
+                "id": row[0],
+                "user_id": row[1],
+                "username": row[2] or "Unknown",
+                "source_lang": row[3] or "auto",
+                "target_lang": row[4] or "en",
+                "source_text": row[5][:100] if row[5] else "",  # First 100 chars
+                "translation": row[6][:100] if row[6] else "",
+                "created_at": str(row[7]) if row[7] else None,
+                "is_voice": bool(row[8]),
+                "rank": round(float(row[9]), 4)
+            })
+
+        return web.json_response({"results": results, "query": query})
+    except aiohttp_web.HTTPException:
+        raise  # Re-raise HTTP exceptions (403, 404, etc.)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_archived_translation_logs(request):
+    """Get translations archived out of translation_history, by user and/or month
+
+    One of user_id or month (YYYY-MM) is required, an unfiltered request
+    would unpack every archived month.
+    """
+    from aiohttp import web as aiohttp_web
+
+    try:
+        await check_admin_with_permission(request, 'view_logs')
+
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
+        from datetime import datetime
+
+        page = int(request.query.get('page', 1))
+        per_page = int(request.query.get('per_page', 20))
+        user_id = request.query.get('user_id', '').strip()
+        month = request.query.get('month', '').strip()  # YYYY-MM
+
+        if not user_id and not month:
+            return web.json_response({"error": "user_id or month is required"}, status=400)
+
+        where_conditions = []
+        params = []
+
+        if user_id:
+            if not user_id.isdigit():
+                return web.json_response({"error": "Invalid user_id"}, status=400)
+            where_conditions.append("a.user_id = ?")
+            params.append(int(user_id))
+
+        if month:
+            try:
+                params.append(datetime.strptime(month, "%Y-%m").date())
+            except ValueError:
+                return web.json_response({"error": "Invalid month, expected YYYY-MM"}, status=400)
+            where_conditions.append("a.month = ?")
+
+        where_clause = "WHERE " + " AND ".join(where_conditions)
+
+        params.extend([per_page, (page-1)*per_page])
+
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
+            # Items are stored oldest first: newest first is the reverse array position, so
+            # rows come in archive index order and are only sorted within a user-month
+            rows = await conn.fetchall(
+                f"""SELECT a.user_id, u.username, item->>'id', item->>'source_language',
+                           item->>'target_language', item->>'source_text', item->>'basic_translation',
+                           item->>'created_at', (item->>'is_voice')::BOOLEAN
+                   FROM translation_history_archive a
+                   CROSS JOIN LATERAL jsonb_array_elements(a.items) WITH ORDINALITY AS e(item, position)
+                   LEFT JOIN users u ON a.user_id = u.user_id
+                   {where_clause}
+                   ORDER BY a.month DESC, a.user_id DESC, e.position DESC
+                   LIMIT ? OFFSET ?""",
+                *params
+            )
+
+            logs = []
+            for row in rows:
+                logs.append({
+                    "id": int(row[2]) if row[2] else None,
+                    "user_id": row[0],
+                    "username": row[1] or "Unknown",
+                    "source_lang": row[3] or "auto",
+                    "target_lang": row[4] or "en",
+                    "source_text": row[5][:100] if row[5] else "",  # First 100 chars
+                    "translation": row[6][:100] if row[6] else "",
+                    "created_at": row[7],
+                    "is_voice": bool(row[8])
+                })
+
+            # Total items of the matching user-months
+            count_params = params[:-2]
+            total_row = await conn.fetchone(
+                f"SELECT COALESCE(SUM(a.item_count), 0) FROM translation_history_archive a {where_clause}",
+                *count_params
+            )
+            total = int(total_row[0]) if total_row else 0
 
         return web.json_response({
             "logs": logs,
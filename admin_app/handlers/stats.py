@@ -26,6 +26,43 @@ async def get_stats(request):
         return web.json_response({"error": str(e)}, status=500)
 
 
+async def get_write_stats(request):
+    """Get write-behind queue metrics (queue depth, flush latency, drops)"""
+    try:
+        await check_admin_with_permission(request, 'view_dashboard')
+
+        from bot.services.history_writer import history_writer
+
+        return web.json_response(history_writer.get_stats())
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_query_stats(request):
+    """Get per-statement database timings and query cache counters"""
+    try:
+        await check_admin_with_permission(request, 'view_dashboard')
+
+        from bot.db_adapter import db_adapter
+
+        limit = int(request.query.get('limit', 50))
+        return web.json_response(db_adapter.get_query_stats(limit))
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_pool_stats(request):
+    """Get connection pool size, acquire wait times and timeouts"""
+    try:
+        await check_admin_with_permission(request, 'view_dashboard')
+
+        from bot.db_adapter import db_adapter
+
+        return web.json_response(db_adapter.get_pool_stats())
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+
 async def get_daily_stats(request):
     """Get daily statistics for last N days"""
     try:
@@ -35,18 +72,19 @@ async def get_daily_stats(request):
         from datetime import datetime, timedelta
 
         days = int(request.query.get('days', 7))
-        stats = []
-
-        for i in range(days):
-            date = (datetime.now() - timedelta(days=i)).date()
-            day_stats = await db.get_statistics(date)
-            stats.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "translations": day_stats.get("total_translations", 0) if day_stats else 0,
-                "users": day_stats.get("active_users", 0) if day_stats else 0
-            })
-
-        return web.json_response({"stats": list(reversed(stats))})
+        today = datetime.now().date()
+        rows = await db.get_daily_statistics(today - timedelta(days=days - 1), today)
+
+        stats = [
+            {
+                "date": row["date"].strftime("%Y-%m-%d"),
+                "translations": row["total_translations"],
+                "users": row["active_users"]
+            }
+            for row in rows
+        ]
+
+        return web.json_response({"stats": stats})
     except Exception as e:
         return web.json_response({"error": str(e)}, status=500)
 
@@ -56,15 +94,13 @@ async def get_language_stats(request):
     try:
         await check_admin_with_permission(request, 'view_dashboard')
 
-        from bot.database import db
-        from bot.db_adapter import db_adapter
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
 
-        async with db_adapter.get_connection() as conn:
-            # Source languages
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
+            # Source languages (translation_stats_daily rollup)
             source_rows = await conn.fetchall(
-                """SELECT source_language, COUNT(*) as count
-                   FROM translation_history
-                   WHERE source_language IS NOT NULL
+                """SELECT source_language, SUM(translations) as count
+                   FROM translation_stats_daily
                    GROUP BY source_language
                    ORDER BY count DESC
                    LIMIT 10"""
@@ -73,9 +109,8 @@ async def get_language_stats(request):
 
             # Target languages
             target_rows = await conn.fetchall(
-                """SELECT target_language, COUNT(*) as count
-                   FROM translation_history
-                   WHERE target_language IS NOT NULL
+                """SELECT target_language, SUM(translations) as count
+                   FROM translation_stats_daily
                    GROUP BY target_language
                    ORDER BY count DESC
                    LIMIT 10"""
@@ -95,75 +130,60 @@ async def get_performance_stats(request):
     try:
         await check_admin_with_permission(request, 'view_dashboard')
 
-        from bot.db_adapter import db_adapter
+        from bot.database import db
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
         from datetime import datetime, timedelta
 
-        async with db_adapter.get_connection() as conn:
-            # Average processing time (overall and by type)
-            avg_time_row = await conn.fetchone(
-                """SELECT
-                       AVG(processing_time_ms) as avg_overall,
-                       AVG(CASE WHEN is_voice = TRUE THEN processing_time_ms END) as avg_voice,
-                       AVG(CASE WHEN is_voice = FALSE THEN processing_time_ms END) as avg_text
-                   FROM translation_history
-                   WHERE processing_time_ms IS NOT NULL"""
-            )
-
-            avg_overall = int(avg_time_row[0]) if avg_time_row and avg_time_row[0] else 0
-            avg_voice = int(avg_time_row[1]) if avg_time_row and avg_time_row[1] else 0
-            avg_text = int(avg_time_row[2]) if avg_time_row and avg_time_row[2] else 0
-
-            # Success rate
-            status_row = await conn.fetchone(
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
+            # All-time totals from the statistics rollup
+            totals_row = await conn.fetchone(
                 """SELECT
-                       COUNT(*) as total,
-                       COUNT(CASE WHEN status = 'success' THEN 1 END) as success_count
-                   FROM translation_history"""
+                       SUM(total_translations) as total,
+                       SUM(error_count) as errors,
+                       SUM(processing_time_sum_ms) as time_sum,
+                       SUM(processing_time_count) as time_count,
+                       SUM(voice_time_sum_ms) as voice_time_sum,
+                       SUM(voice_time_count) as voice_time_count
+                   FROM statistics"""
             )
 
-            total_count = status_row[0] if status_row else 0
-            success_count = status_row[1] if status_row else 0
-            success_rate = round((success_count / total_count * 100), 2) if total_count > 0 else 100.0
-
-            # Error breakdown by day (last 7 days)
-            seven_days_ago = datetime.now() - timedelta(days=7)
-            error_rows = await conn.fetchall(
-                """SELECT
-                       DATE(created_at) as date,
-                       COUNT(*) as error_count
-                   FROM translation_history
-                   WHERE status != 'success'
-                     AND created_at >= ?
-                   GROUP BY DATE(created_at)
-                   ORDER BY date DESC""",
-                seven_days_ago
-            )
-
-            errors_by_day = [
-                {
-                    "date": str(row[0]) if row[0] else None,
-                    "count": row[1]
-                }
-                for row in error_rows
-            ]
-
-            # Today's stats
-            today = datetime.now().date()
-            today_row = await conn.fetchone(
-                """SELECT
-                       AVG(processing_time_ms) as avg_time,
-                       COUNT(*) as total,
-                       COUNT(CASE WHEN status = 'success' THEN 1 END) as success_count
-                   FROM translation_history
-                   WHERE DATE(created_at) = ?
-                     AND processing_time_ms IS NOT NULL""",
-                today
-            )
-
-            today_avg_time = int(today_row[0]) if today_row and today_row[0] else 0
-            today_total = today_row[1] if today_row else 0
-            today_success = today_row[2] if today_row else 0
-            today_success_rate = round((today_success / today_total * 100), 2) if today_total > 0 else 100.0
+        total_count = int(totals_row[0] or 0) if totals_row else 0
+        error_count = int(totals_row[1] or 0) if totals_row else 0
+        time_sum = int(totals_row[2] or 0) if totals_row else 0
+        time_count = int(totals_row[3] or 0) if totals_row else 0
+        voice_time_sum = int(totals_row[4] or 0) if totals_row else 0
+        voice_time_count = int(totals_row[5] or 0) if totals_row else 0
+        text_time_sum = time_sum - voice_time_sum
+        text_time_count = time_count - voice_time_count
+
+        # Average processing time (overall and by type)
+        avg_overall = time_sum // time_count if time_count else 0
+        avg_voice = voice_time_sum // voice_time_count if voice_time_count else 0
+        avg_text = text_time_sum // text_time_count if text_time_count else 0
+
+        # Success rate
+        success_count = total_count - error_count
+        success_rate = round((success_count / total_count * 100), 2) if total_count > 0 else 100.0
+
+        # Error breakdown by day (last 7 days) and today's stats
+        today = datetime.now().date()
+        days = await db.get_daily_statistics(today - timedelta(days=7), today)
+
+        errors_by_day = [
+            {
+                "date": str(day["date"]),
+                "count": day["error_count"]
+            }
+            for day in reversed(days)
+            if day["error_count"]
+        ]
+
+        today_stats = days[-1]
+        today_total = today_stats["total_translations"]
+        today_success = today_total - today_stats["error_count"]
+        today_avg_time = (today_stats["processing_time_sum_ms"] // today_stats["processing_time_count"]
+                          if today_stats["processing_time_count"] else 0)
+        today_success_rate = round((today_success / today_total * 100), 2) if today_total > 0 else 100.0
 
         return web.json_response({
             "average_processing_time": {
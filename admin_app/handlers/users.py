@@ -2,20 +2,26 @@
 
 from aiohttp import web
 from admin_app.auth import check_admin_with_permission
+from admin_app.pagination import (decode_cursor, keyset_condition, keyset_order, wants_exact_total,
+                                  count_rows, page_response)
+
+# Largest users.user_id, longer digit strings are only searched in names
+BIGINT_MAX = 2 ** 63 - 1
 
 
 async def get_users(request):
-    """Get users list with pagination"""
+    """Get users list, newest first, with keyset pagination (cursor from next_cursor)"""
     from aiohttp import web as aiohttp_web
 
     try:
         await check_admin_with_permission(request, 'view_users')  # Check admin access
 
         from bot.database import db
-        from bot.db_adapter import db_adapter
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
 
-        page = int(request.query.get('page', 1))
         per_page = int(request.query.get('per_page', 10))
+        cursor = decode_cursor(request.query.get('cursor'))
+        exact = wants_exact_total(request)
         search = request.query.get('search', '').strip()
         premium_only = request.query.get('premium_only', '').lower() == 'true'
 
@@ -24,43 +30,42 @@ async def get_users(request):
         params = []
 
         if search:
-            where_conditions.append(
-                "(u.username LIKE ? OR u.first_name LIKE ? OR u.last_name LIKE ? OR CAST(u.user_id AS TEXT) LIKE ?)"
-            )
+            # Trigram indexes on the name columns (migration 019)
+            name_condition = "u.username LIKE ? OR u.first_name LIKE ? OR u.last_name LIKE ?"
             search_param = f"%{search}%"
-            params.extend([search_param, search_param, search_param, search_param])
+            if search.isascii() and search.isdigit() and int(search) <= BIGINT_MAX:
+                # Telegram ID (primary key) or digits in a name, combined with a BitmapOr
+                where_conditions.append(f"(u.user_id = ? OR {name_condition})")
+                params.append(int(search))
+            else:
+                where_conditions.append(f"({name_condition})")
+            params.extend([search_param, search_param, search_param])
 
         if premium_only:
-            where_conditions.append(
-                """EXISTS (
-                    SELECT 1 FROM subscriptions s
-                    WHERE s.user_id = u.user_id
-                      AND s.status = 'active'
-                      AND s.expires_at > CURRENT_TIMESTAMP
-                )"""
-            )
+            where_conditions.append("u.premium_until > CURRENT_TIMESTAMP")
 
         where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        count_params = list(params)
+
+        # Rows after the cursor of the previous page
+        page_conditions = list(where_conditions)
+        if cursor:
+            page_conditions.append(keyset_condition("u.created_at", "u.user_id"))
+            params.extend(cursor)
+        page_where = "WHERE " + " AND ".join(page_conditions) if page_conditions else ""
 
         # Get users directly from database with SQL
-        async with db_adapter.get_connection() as conn:
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
             query = f"""SELECT u.user_id, u.username, u.first_name, u.last_name,
                           u.total_translations, u.created_at,
-                          CASE
-                            WHEN EXISTS (
-                              SELECT 1 FROM subscriptions s
-                              WHERE s.user_id = u.user_id
-                                AND s.status = 'active'
-                                AND s.expires_at > CURRENT_TIMESTAMP
-                            ) THEN 1 ELSE 0
-                          END as is_premium,
+                          CASE WHEN u.premium_until > CURRENT_TIMESTAMP THEN 1 ELSE 0 END as is_premium,
                           u.is_blocked
                    FROM users u
-                   {where_clause}
-                   ORDER BY u.created_at DESC
-                   LIMIT ? OFFSET ?"""
+                   {page_where}
+                   ORDER BY {keyset_order("u.created_at", "u.user_id")}
+                   LIMIT ?"""
 
-            params.extend([per_page, (page-1)*per_page])
+            params.append(per_page)
             rows = await conn.fetchall(query, *params)
 
             users = []
@@ -75,17 +80,11 @@ async def get_users(request):
                     "is_blocked": bool(row[7]) if row[7] is not None else False
                 })
 
-            # Get total count with same filters
-            count_query = f"SELECT COUNT(*) FROM users u {where_clause}"
-            total_row = await conn.fetchone(count_query, *params[:-2])  # Exclude LIMIT/OFFSET params
-            total = total_row[0] if total_row else 0
+            # Estimated total with same filters unless exact_total=true
+            total = await count_rows(conn, "FROM users u", where_clause, count_params, exact)
 
-        return web.json_response({
-            "users": users,
-            "total": total,
-            "page": page,
-            "per_page": per_page
-        })
+        last_row = (rows[-1][5], rows[-1][0]) if rows else None
+        return page_response("users", users, last_row, per_page, total, exact)
     except aiohttp_web.HTTPException:
         raise  # Re-raise HTTP exceptions (403, 404, etc.)
     except Exception as e:
@@ -258,12 +257,12 @@ async def get_user_history(request):
         admin_id, _, _ = await check_admin_with_permission(request, 'view_history')
 
         from bot.database import db
-        from bot.db_adapter import db_adapter
+        from bot.db_adapter import db_adapter, POOL_ANALYTICS
 
         user_id = int(request.match_info['user_id'])
         limit = int(request.query.get('limit', 10))
 
-        async with db_adapter.get_connection() as conn:
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
             rows = await conn.fetchall(
                 """SELECT th.id, th.source_language, th.target_language,
                           th.source_text, th.basic_translation, th.created_at, th.is_voice
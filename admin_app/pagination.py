@@ -0,0 +1,75 @@
+"""Keyset pagination and approximate counts for admin list endpoints"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from aiohttp import web
+
+# Shared with the bot's admin queries (bot/database.py)
+from bot.utils.keyset import NULL_CREATED_AT, sort_key, keyset_condition, keyset_order
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: Any) -> str:
+    """Opaque cursor of the last row of a page"""
+    raw = json.dumps([(created_at or NULL_CREATED_AT).isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, Any]]:
+    """(created_at, id) of a cursor from encode_cursor, None for the first page"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, TypeError):
+        raise web.HTTPBadRequest(text="Invalid cursor")
+
+
+def wants_exact_total(request) -> bool:
+    return request.query.get('exact_total', '').lower() == 'true'
+
+
+async def count_rows(conn, from_clause: str, where_clause: str, params: List[Any],
+                     exact: bool = False) -> int:
+    """Row count of `SELECT ... {from_clause} {where_clause}`
+
+    Exact COUNT(*) only when asked for. Otherwise unfiltered tables use
+    pg_class.reltuples (summed over partitions) and filtered ones the
+    planner's row estimate.
+    """
+    if exact:
+        row = await conn.fetchone(f"SELECT COUNT(*) {from_clause} {where_clause}", *params)
+        return row[0] if row else 0
+
+    if not where_clause:
+        table = from_clause.split()[1]
+        row = await conn.fetchone('''
+            SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)
+            FROM pg_class c
+            WHERE c.oid = to_regclass(?)
+               OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(?))
+        ''', table, table)
+        return int(row[0]) if row else 0
+
+    row = await conn.fetchone(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_clause} {where_clause}", *params)
+    plan = row[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def page_response(key: str, items: List[Any], last_row: Optional[Tuple[datetime, Any]],
+                  per_page: int, total: int, exact: bool) -> web.Response:
+    """JSON page with the cursor of the next page (null on the last one)"""
+    next_cursor = encode_cursor(*last_row) if last_row and len(items) == per_page else None
+    return web.json_response({
+        key: items,
+        "total": total,
+        "total_exact": exact,
+        "per_page": per_page,
+        "next_cursor": next_cursor
+    })
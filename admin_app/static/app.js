@@ -18,9 +18,9 @@ import {
     goToNextPage,
     getCurrentPage
 } from './modules/users.js';
-import { loadLogs } from './modules/logs.js';
-import { loadFeedback, updateFeedbackStatus } from './modules/feedback.js';
-import { loadAdminLogs } from './modules/adminLogs.js';
+import { loadLogs, loadMoreLogs } from './modules/logs.js';
+import { loadFeedback, loadMoreFeedback, updateFeedbackStatus } from './modules/feedback.js';
+import { loadAdminLogs, loadMoreAdminLogs } from './modules/adminLogs.js';
 import {
     loadRoles,
     openAssignRoleModal,
@@ -47,6 +47,9 @@ window.openSendMessageModal = openSendMessageModal;
 window.closeSendMessageModal = closeSendMessageModal;
 window.confirmSendMessage = confirmSendMessage;
 window.updateFeedbackStatus = updateFeedbackStatus;
+window.loadMoreLogs = loadMoreLogs;
+window.loadMoreFeedback = loadMoreFeedback;
+window.loadMoreAdminLogs = loadMoreAdminLogs;
 window.openAssignRoleModal = openAssignRoleModal;
 window.openEditRoleModal = openEditRoleModal;
 window.closeAssignRoleModal = closeAssignRoleModal;
@@ -1,11 +1,24 @@
 // Admin Logs Module
 
 import { apiRequest, showLoading, hideLoading, tg } from './api.js';
-import { formatDateTime } from './utils.js';
+import { formatDateTime, loadMoreButton } from './utils.js';
 import { t } from './i18n.js';
 
-// Load Admin Logs
+// Cursor pagination state
+let loadedLogs = [];
+let nextCursor = null;
+
+// Load Admin Logs (first page)
 export async function loadAdminLogs() {
+    await fetchAdminLogs(false);
+}
+
+// Load the next page below the current one
+export async function loadMoreAdminLogs() {
+    if (nextCursor) await fetchAdminLogs(true);
+}
+
+async function fetchAdminLogs(append) {
     try {
         showLoading();
 
@@ -16,17 +29,22 @@ export async function loadAdminLogs() {
         const actionValue = actionFilter ? actionFilter.value : '';
 
         // Build URL with filters
-        let url = '/api/admin-logs?limit=100';
+        let url = '/api/admin-logs?limit=50';
         if (adminValue) {
             url += `&admin_user_id=${adminValue}`;
         }
         if (actionValue) {
             url += `&action=${actionValue}`;
         }
+        if (append) {
+            url += `&cursor=${encodeURIComponent(nextCursor)}`;
+        }
 
         const data = await apiRequest(url);
-        renderAdminLogs(data.logs);
-        populateAdminFilter(data.logs);
+        loadedLogs = append ? loadedLogs.concat(data.logs) : data.logs;
+        nextCursor = data.next_cursor;
+        renderAdminLogs(loadedLogs);
+        populateAdminFilter(loadedLogs);
 
         hideLoading();
     } catch (error) {
@@ -99,6 +117,8 @@ function renderAdminLogs(logs) {
             </div>
         `;
     }).join('');
+
+    if (nextCursor) container.innerHTML += loadMoreButton('loadMoreAdminLogs');
 }
 
 // Populate admin filter dropdown
@@ -1,11 +1,24 @@
 // Feedback Module
 
 import { apiRequest, showLoading, hideLoading, tg } from './api.js';
-import { formatDateTime } from './utils.js';
+import { formatDateTime, loadMoreButton } from './utils.js';
 import { t } from './i18n.js';
 
-// Load Feedback
+// Cursor pagination state
+let loadedFeedback = [];
+let nextCursor = null;
+
+// Load Feedback (first page)
 export async function loadFeedback() {
+    await fetchFeedback(false);
+}
+
+// Load the next page below the current one
+export async function loadMoreFeedback() {
+    if (nextCursor) await fetchFeedback(true);
+}
+
+async function fetchFeedback(append) {
     try {
         showLoading();
 
@@ -14,13 +27,18 @@ export async function loadFeedback() {
         const filterValue = filterSelect ? filterSelect.value : '';
 
         // Build URL with filter
-        let url = '/api/feedback?limit=100';
+        let url = '/api/feedback?limit=50';
         if (filterValue) {
             url += `&status=${filterValue}`;
         }
+        if (append) {
+            url += `&cursor=${encodeURIComponent(nextCursor)}`;
+        }
 
         const data = await apiRequest(url);
-        renderFeedback(data.feedback);
+        loadedFeedback = append ? loadedFeedback.concat(data.feedback) : data.feedback;
+        nextCursor = data.next_cursor;
+        renderFeedback(loadedFeedback);
 
         hideLoading();
     } catch (error) {
@@ -90,6 +108,8 @@ function renderFeedback(feedbackList) {
             </div>
         `;
     }).join('');
+
+    if (nextCursor) container.innerHTML += loadMoreButton('loadMoreFeedback');
 }
 
 // Update feedback status
@@ -144,6 +144,7 @@ export const translations = {
         'pagination.next': 'Вперёд',
         'pagination.page': 'Страница',
         'pagination.of': 'из',
+        'pagination.load_more': 'Показать ещё',
 
         // Performance
         'perf.voice': 'Голос',
@@ -310,6 +311,7 @@ export const translations = {
         'pagination.next': 'Next',
         'pagination.page': 'Page',
         'pagination.of': 'of',
+        'pagination.load_more': 'Load more',
 
         // Performance
         'perf.voice': 'Voice',
@@ -1,11 +1,24 @@
 // Logs Module
 
 import { apiRequest, showLoading, hideLoading, tg } from './api.js';
-import { formatDateTime } from './utils.js';
+import { formatDateTime, loadMoreButton } from './utils.js';
 import { t } from './i18n.js';
 
-// Load Logs
+// Cursor pagination state
+let loadedLogs = [];
+let nextCursor = null;
+
+// Load Logs (first page)
 export async function loadLogs() {
+    await fetchLogs(false);
+}
+
+// Load the next page below the current one
+export async function loadMoreLogs() {
+    if (nextCursor) await fetchLogs(true);
+}
+
+async function fetchLogs(append) {
     try {
         showLoading();
 
@@ -23,10 +36,15 @@ export async function loadLogs() {
         if (searchValue) {
             url += `&search=${encodeURIComponent(searchValue)}`;
         }
+        if (append) {
+            url += `&cursor=${encodeURIComponent(nextCursor)}`;
+        }
 
         // Load translation logs
         const logsData = await apiRequest(url);
-        renderTranslationLogs(logsData.logs);
+        loadedLogs = append ? loadedLogs.concat(logsData.logs) : logsData.logs;
+        nextCursor = logsData.next_cursor;
+        renderTranslationLogs(loadedLogs);
 
         hideLoading();
     } catch (error) {
@@ -62,4 +80,6 @@ export function renderTranslationLogs(logs) {
             </div>
         </div>
     `).join('') || `<p class="text-sm text-gray-500">${t('common.no_data')}</p>`;
+
+    if (nextCursor) container.innerHTML += loadMoreButton('loadMoreLogs');
 }
@@ -106,6 +106,7 @@ function getSettingInput(setting) {
                 return `
                     <select id="setting-${key}" class="flex-1">
                         <option value="openai" ${value === 'openai' ? 'selected' : ''}>OpenAI Whisper</option>
+                        <option value="local" ${value === 'local' ? 'selected' : ''}>Local Whisper (CPU)</option>
                         <option value="google" ${value === 'google' ? 'selected' : ''}>Google Speech-to-Text</option>
                         <option value="azure" ${value === 'azure' ? 'selected' : ''}>Azure Speech</option>
                     </select>
@@ -115,6 +116,7 @@ function getSettingInput(setting) {
                     <select id="setting-${key}" class="flex-1">
                         <option value="openai" ${value === 'openai' ? 'selected' : ''}>OpenAI TTS</option>
                         <option value="elevenlabs" ${value === 'elevenlabs' ? 'selected' : ''}>ElevenLabs</option>
+                        <option value="local" ${value === 'local' ? 'selected' : ''}>Local (espeak-ng)</option>
                     </select>
                 `;
             }
@@ -6,10 +6,15 @@ import { t } from './i18n.js';
 
 // Global state
 let currentPage = 1;
+let pageCursors = [null];  // cursor of each page reached so far (index = page - 1)
 let currentMessageUserId = null;
 
 // Load Users
 export async function loadUsers(page = 1) {
+    if (page === 1) pageCursors = [null];
+    const cursor = pageCursors[page - 1];
+    if (cursor === undefined) return;  // page not reached through "next" yet
+
     try {
         showLoading();
         currentPage = page;
@@ -17,11 +22,13 @@ export async function loadUsers(page = 1) {
         const search = document.getElementById('userSearch').value;
         const premiumOnly = document.getElementById('premiumFilter').checked;
 
-        let url = `/api/users/?page=${page}&per_page=20`;
+        let url = `/api/users/?per_page=20`;
+        if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
         if (search) url += `&search=${encodeURIComponent(search)}`;
         if (premiumOnly) url += `&premium_only=true`;
 
         const data = await apiRequest(url);
+        pageCursors[page] = data.next_cursor;
         renderUsers(data);
 
         hideLoading();
@@ -73,11 +80,12 @@ function renderUsers(data) {
         </div>
     `).join('');
 
-    // Update pagination
-    const totalPages = Math.ceil(data.total / data.per_page);
-    document.getElementById('pageInfo').textContent = `${t('pagination.page')} ${data.page} ${t('pagination.of')} ${totalPages}`;
-    document.getElementById('prevPage').disabled = data.page === 1;
-    document.getElementById('nextPage').disabled = data.page >= totalPages;
+    // Update pagination (total is an estimate unless total_exact)
+    const totalPages = Math.max(Math.ceil(data.total / data.per_page), currentPage);
+    const approx = data.total_exact ? '' : '~';
+    document.getElementById('pageInfo').textContent = `${t('pagination.page')} ${currentPage} ${t('pagination.of')} ${approx}${totalPages}`;
+    document.getElementById('prevPage').disabled = currentPage === 1;
+    document.getElementById('nextPage').disabled = !data.next_cursor;
 }
 
 // View user details with history
@@ -216,7 +224,7 @@ export function goToPrevPage() {
 }
 
 export function goToNextPage() {
-    loadUsers(currentPage + 1);
+    if (pageCursors[currentPage]) loadUsers(currentPage + 1);
 }
 
 // Export current page for external access
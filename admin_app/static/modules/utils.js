@@ -1,5 +1,7 @@
 // Utility Functions Module
 
+import { t } from './i18n.js';
+
 // Language code to name mapping
 const LANGUAGE_NAMES = {
     'en': 'English',
@@ -90,6 +92,15 @@ export function formatDuration(ms) {
     }
 }
 
+// Helper: "Load more" button for cursor-paginated lists (handler exposed on window)
+export function loadMoreButton(handlerName) {
+    return `
+        <button class="w-full px-4 py-2 bg-gray-100 text-gray-800 rounded-lg text-sm font-medium hover:bg-gray-200 transition" onclick="window.${handlerName}()">
+            ${t('pagination.load_more')}
+        </button>
+    `;
+}
+
 // Get language name from code
 export function getLanguageName(code) {
     return LANGUAGE_NAMES[code] || code.toUpperCase();
@@ -4,7 +4,115 @@ from typing import Optional, List, Dict, Any
 from pathlib import Path
 import json
 from config import config
-from bot.db_adapter import db_adapter
+from bot.db_adapter import db_adapter, POOL_ANALYTICS
+from bot.utils.keyset import keyset_condition, keyset_order
+from bot.utils.premium import premium_cache
+from bot.services.history_retention import history_retention
+from bot.services.stats_rollup import stats_rollup
+
+# Hot-path queries, prepared as named statements on every pool connection
+SQL_USER_CONTEXT = db_adapter.register_hot_query('user_context', '''
+WITH u AS (
+    INSERT INTO users (
+        user_id, username, first_name, last_name, language_code,
+        interface_language, target_language, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, 'en', ?)
+    ON CONFLICT (user_id) DO UPDATE SET
+        username = EXCLUDED.username,
+        first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        language_code = EXCLUDED.language_code,
+        interface_language = EXCLUDED.interface_language,
+        updated_at = EXCLUDED.updated_at
+    RETURNING *
+),
+new_settings AS (
+    INSERT INTO user_settings (user_id) VALUES (?)
+    ON CONFLICT (user_id) DO NOTHING
+    RETURNING *
+)
+SELECT u.*,
+       COALESCE(s.auto_voice, ns.auto_voice) AS auto_voice,
+       COALESCE(s.save_history, ns.save_history) AS save_history,
+       COALESCE(s.notifications_enabled, ns.notifications_enabled) AS notifications_enabled,
+       COALESCE(s.voice_speed, ns.voice_speed) AS voice_speed,
+       COALESCE(s.voice_type, ns.voice_type) AS voice_type,
+       COALESCE(s.show_transcription, ns.show_transcription) AS show_transcription,
+       CASE WHEN u.last_translation_date = ? THEN u.free_translations_today ELSE 0 END
+           AS translations_today,
+       (SELECT value FROM system_settings WHERE key = 'free_daily_limit') AS free_daily_limit
+FROM u
+LEFT JOIN user_settings s ON s.user_id = u.user_id
+LEFT JOIN new_settings ns ON ns.user_id = u.user_id
+''')
+
+SQL_LOAD_USER_CONTEXT = db_adapter.register_hot_query('user_context_load', '''
+SELECT u.*,
+       s.auto_voice, s.save_history, s.notifications_enabled,
+       s.voice_speed, s.voice_type, s.show_transcription,
+       CASE WHEN u.last_translation_date = ? THEN u.free_translations_today ELSE 0 END
+           AS translations_today,
+       (SELECT value FROM system_settings WHERE key = 'free_daily_limit') AS free_daily_limit
+FROM users u
+LEFT JOIN user_settings s ON s.user_id = u.user_id
+WHERE u.user_id = ?
+''')
+
+SQL_CONSUME_CREDIT = db_adapter.register_hot_query('consume_translation_credit', '''
+WITH lim AS (
+    SELECT COALESCE(
+        (SELECT value::INTEGER FROM system_settings WHERE key = 'free_daily_limit'), ?
+    ) AS free_daily_limit
+)
+UPDATE users u
+SET free_translations_today = CASE
+        WHEN u.last_translation_date = ? THEN u.free_translations_today + 1
+        ELSE 1
+    END,
+    total_translations = u.total_translations + 1,
+    last_translation_date = ?,
+    updated_at = ?
+FROM lim
+WHERE u.user_id = ?
+  AND (
+      ? OR u.premium_until > ?
+      OR u.last_translation_date IS DISTINCT FROM ?
+      OR u.free_translations_today < lim.free_daily_limit
+  )
+RETURNING u.free_translations_today, u.premium_until, lim.free_daily_limit
+''')
+
+SQL_REFUND_CREDIT = db_adapter.register_hot_query('refund_translation_credit', '''
+UPDATE users
+SET free_translations_today = GREATEST(free_translations_today - 1, 0),
+    total_translations = GREATEST(total_translations - 1, 0)
+WHERE user_id = ? AND last_translation_date = ?
+''')
+
+SQL_INSERT_HISTORY = db_adapter.register_hot_query('translation_history_insert', '''
+INSERT INTO translation_history (
+    user_id, source_text, source_language, translated_text,
+    basic_translation, enhanced_translation, alternatives,
+    transcription, enhanced_transcription, target_language, translation_style, is_voice,
+    processing_time_ms, status, error_message,
+    original_duration_ms, trimmed_duration_ms, created_at
+)
+SELECT ?::BIGINT, ?::TEXT, ?::TEXT, ?::TEXT, ?::TEXT, ?::TEXT, ?::TEXT,
+       ?::TEXT, ?::TEXT, ?::TEXT, ?::TEXT, ?::BOOLEAN,
+       ?::INTEGER, ?::TEXT, ?::TEXT, ?::INTEGER, ?::INTEGER,
+       COALESCE(?::TIMESTAMP, CURRENT_TIMESTAMP)
+WHERE EXISTS (
+    SELECT 1 FROM user_settings WHERE user_id = ?::BIGINT AND save_history
+)
+''')
+
+SQL_USER_HISTORY = db_adapter.register_hot_query('user_history', '''
+SELECT * FROM translation_history
+WHERE user_id = ?
+ORDER BY created_at DESC
+LIMIT ?
+''')
+
 
 class Database:
     def __init__(self, db_path: str = None):
@@ -33,6 +141,7 @@ class Database:
                     free_translations_today INTEGER DEFAULT 0,
                     last_translation_date DATE,
                     total_translations INTEGER DEFAULT 0,
+                    premium_until {ts_type},
                     created_at {ts_type} DEFAULT CURRENT_TIMESTAMP,
                     updated_at {ts_type} DEFAULT CURRENT_TIMESTAMP
                 )
@@ -102,7 +211,12 @@ class Database:
                     premium_users INTEGER DEFAULT 0,
                     total_translations INTEGER DEFAULT 0,
                     voice_translations INTEGER DEFAULT 0,
-                    revenue REAL DEFAULT 0
+                    revenue REAL DEFAULT 0,
+                    error_count INTEGER DEFAULT 0,
+                    processing_time_sum_ms BIGINT DEFAULT 0,
+                    processing_time_count INTEGER DEFAULT 0,
+                    voice_time_sum_ms BIGINT DEFAULT 0,
+                    voice_time_count INTEGER DEFAULT 0
                 )
             ''')
 
@@ -191,6 +305,11 @@ class Database:
             return
 
         async with db_adapter.get_connection() as conn:
+            # Index builds and backfills may run longer than both limits of the pool:
+            # the server-side DB_STATEMENT_TIMEOUT_MS is lifted for this session and the
+            # client-side DB_COMMAND_TIMEOUT is replaced by DB_MAINTENANCE_TIMEOUT per statement
+            await conn.execute('SET statement_timeout = 0')
+
             # Get applied migrations
             applied = set()
             try:
@@ -217,14 +336,26 @@ class Database:
                     with open(migration_file, 'r', encoding='utf-8') as f:
                         sql = f.read()
 
-                    # Execute each statement (split by semicolons, excluding comments)
-                    statements = [s.strip() for s in sql.split(';') if s.strip() and not s.strip().startswith('--')]
-
-                    # Execute all statements in the migration (PostgreSQL autocommit mode)
+                    # Execute each statement (comment lines dropped, split by semicolons
+                    # outside $$-quoted DO block bodies)
+                    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+                    statements = []
+                    pending = []
+                    for chunk in '\n'.join(lines).split(';'):
+                        pending.append(chunk)
+                        statement = ';'.join(pending)
+                        if statement.count('$$') % 2:
+                            continue
+                        pending = []
+                        if statement.strip():
+                            statements.append(statement.strip())
+
+                    # Execute all statements in the migration (PostgreSQL autocommit mode,
+                    # required by CREATE INDEX CONCURRENTLY)
                     for statement in statements:
                         if statement:
                             print(f"[MIGRATIONS]   Executing: {statement[:80]}...")
-                            await conn.execute(statement)
+                            await conn.execute(statement, timeout=config.DB_MAINTENANCE_TIMEOUT)
 
                     # Mark migration as applied
                     await conn.execute(
@@ -334,6 +465,41 @@ class Database:
             await conn.commit()
             return True
 
+    async def get_user_context(self, user_id: int, username: str = None, first_name: str = None,
+                               last_name: str = None, language_code: str = 'ru') -> Optional[Dict[str, Any]]:
+        """Register/update user and load everything a request needs in one round-trip
+
+        Returns the same fields as get_user plus daily limit counters
+        (translations_today, free_daily_limit).
+        """
+        now = datetime.now()
+        async with db_adapter.get_connection() as conn:
+            row = await conn.fetchone(SQL_USER_CONTEXT, user_id, username, first_name, last_name,
+                                      language_code, language_code, now, user_id, now.date())
+
+            return self._user_context_from_row(row)
+
+    async def load_user_context(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Read-only variant of get_user_context for users whose profile is unchanged"""
+        now = datetime.now()
+        async with db_adapter.get_connection() as conn:
+            row = await conn.fetchone(SQL_LOAD_USER_CONTEXT, now.date(), user_id)
+
+            return self._user_context_from_row(row)
+
+    def _user_context_from_row(self, row) -> Optional[Dict[str, Any]]:
+        """Convert user context row to dict with derived fields"""
+        if not row:
+            return None
+
+        user_data = dict(row)
+        self._apply_premium_until(user_data)
+        try:
+            user_data['free_daily_limit'] = int(user_data['free_daily_limit'])
+        except (TypeError, ValueError):
+            user_data['free_daily_limit'] = config.FREE_DAILY_LIMIT
+        return user_data
+
     async def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user information with dynamic premium status"""
         async with db_adapter.get_connection() as conn:
@@ -350,19 +516,34 @@ class Database:
 
             user_data = dict(row)
 
-            # Add dynamic premium status from subscriptions table
-            cursor_sub = await conn.execute('''
-                SELECT expires_at FROM subscriptions
-                WHERE user_id = ? AND status = 'active' AND expires_at > ?
-                ORDER BY expires_at DESC LIMIT 1
-            ''', user_id, datetime.now())
-            subscription = await cursor_sub.fetchone()
-
-            user_data['is_premium'] = subscription is not None
-            user_data['premium_until'] = subscription['expires_at'] if subscription else None
+            # Premium status from the denormalized users.premium_until
+            self._apply_premium_until(user_data)
 
             return user_data
 
+    def _apply_premium_until(self, user_data: Dict[str, Any]):
+        """Derive is_premium from premium_until (expired dates count as no premium)"""
+        premium_until = user_data.get('premium_until')
+        if premium_until is not None and premium_until <= datetime.now():
+            premium_until = None
+
+        user_data['premium_until'] = premium_until
+        user_data['is_premium'] = premium_until is not None
+        premium_cache.set(user_data['user_id'], premium_until)
+
+    async def _sync_premium_until(self, conn, user_id: int) -> Optional[datetime]:
+        """Recompute users.premium_until from active subscriptions (call inside the write transaction)"""
+        row = await conn.fetchone('''
+            UPDATE users
+            SET premium_until = (
+                SELECT MAX(expires_at) FROM subscriptions
+                WHERE user_id = ? AND status = 'active'
+            )
+            WHERE user_id = ?
+            RETURNING premium_until
+        ''', user_id, user_id)
+        return row['premium_until'] if row else None
+
     async def update_user_language(self, user_id: int, target_language: str) -> bool:
         """Update user's target translation language"""
         async with db_adapter.get_connection() as conn:
@@ -385,70 +566,32 @@ class Database:
             await conn.commit()
             return True
 
-    async def check_daily_limit(self, user_id: int) -> tuple[bool, int]:
-        """Check if user has reached daily translation limit"""
+    async def consume_translation_credit(self, user_id: int, unlimited: bool = False) -> tuple[bool, int]:
+        """Atomically check the daily limit and count one translation
+
+        Resets the counter on a new day, and consumes a credit only while the
+        user is premium, unlimited (admins) or under free_daily_limit.
+        Returns (allowed, remaining translations today; -1 when unlimited).
+        Call refund_translation_credit() if the translation then fails.
+        """
         async with db_adapter.get_connection() as conn:
-            cursor = await conn.execute('''
-                SELECT free_translations_today, last_translation_date
-                FROM users WHERE user_id = ?
-            ''', user_id)
-            row = await cursor.fetchone()
+            now = datetime.now()
+            today = now.date()
+            row = await conn.fetchone(SQL_CONSUME_CREDIT, config.FREE_DAILY_LIMIT, today, today, now,
+                                      user_id, unlimited, now, today)
 
-            if not row:
-                return False, 0
-
-            translations_today, last_date = row
-
-            # Check if user has active premium subscription
-            cursor_sub = await conn.execute('''
-                SELECT expires_at FROM subscriptions
-                WHERE user_id = ? AND status = 'active' AND expires_at > ?
-                ORDER BY expires_at DESC LIMIT 1
-            ''', user_id, datetime.now())
-            subscription = await cursor_sub.fetchone()
-
-            is_premium = subscription is not None
-
-            # Premium users have unlimited translations
-            if is_premium:
-                return True, -1
-
-            # Reset counter if it's a new day
-            today = datetime.now().date()
-            if last_date:
-                # Handle both datetime objects and strings from database
-                if isinstance(last_date, datetime):
-                    last_date = last_date.date()
-                elif isinstance(last_date, str):
-                    last_date = datetime.fromisoformat(last_date).date()
-                # If it's already a date object, use as is
-
-                if last_date < today:
-                    translations_today = 0
-                    await conn.execute('''
-                        UPDATE users
-                        SET free_translations_today = 0, last_translation_date = ?
-                        WHERE user_id = ?
-                    ''', today, user_id)
-                    await conn.commit()
-
-            free_daily_limit = int(await self.get_setting('free_daily_limit', config.FREE_DAILY_LIMIT))
-            remaining = free_daily_limit - translations_today
-            return remaining > 0, remaining
-
-    async def increment_translation_count(self, user_id: int) -> bool:
-        """Increment user's translation count"""
+        if not row:
+            # Limit reached (or unknown user)
+            return False, 0
+
+        if unlimited or (row['premium_until'] and row['premium_until'] > now):
+            return True, -1
+        return True, row['free_daily_limit'] - row['free_translations_today']
+
+    async def refund_translation_credit(self, user_id: int) -> bool:
+        """Give back a credit consumed today for a translation that failed"""
         async with db_adapter.get_connection() as conn:
-            today = datetime.now().date()
-            await conn.execute('''
-                UPDATE users
-                SET free_translations_today = free_translations_today + 1,
-                    total_translations = total_translations + 1,
-                    last_translation_date = ?,
-                    updated_at = ?
-                WHERE user_id = ?
-            ''', today, datetime.now(), user_id)
-            await conn.commit()
+            await conn.execute(SQL_REFUND_CREDIT, user_id, datetime.now().date())
             return True
 
     async def add_translation_history(self, user_id: int, source_text: str,
@@ -462,64 +605,64 @@ class Database:
                                      enhanced_transcription: str = None,
                                      processing_time_ms: int = None,
                                      status: str = 'success',
-                                     error_message: str = None) -> bool:
-        """Add translation to history"""
-        async with db_adapter.get_connection() as conn:
-            # Check if history saving is enabled
-            cursor = await conn.execute('''
-                SELECT save_history FROM user_settings WHERE user_id = ?
-            ''', user_id)
-            row = await cursor.fetchone()
+                                     error_message: str = None,
+                                     original_duration_ms: int = None,
+                                     trimmed_duration_ms: int = None,
+                                     created_at: datetime = None) -> bool:
+        """Add translation to history (old items are trimmed by history_retention)"""
+        return await self.add_translation_history_batch([dict(
+            user_id=user_id, source_text=source_text, source_language=source_language,
+            translated_text=translated_text, target_language=target_language, style=style,
+            is_voice=is_voice, basic_translation=basic_translation,
+            enhanced_translation=enhanced_translation, alternatives=alternatives,
+            transcription=transcription, enhanced_transcription=enhanced_transcription,
+            processing_time_ms=processing_time_ms, status=status, error_message=error_message,
+            original_duration_ms=original_duration_ms, trimmed_duration_ms=trimmed_duration_ms,
+            created_at=created_at
+        )])
+
+    async def add_translation_history_batch(self, records: List[Dict[str, Any]]) -> bool:
+        """Add several translations (add_translation_history keyword arguments) in one round trip"""
+        rows = [self._history_row(record) for record in records]
 
-            if row and row[0]:
-                # Convert alternatives list to JSON string for storage
-                alternatives_json = None
-                if alternatives:
-                    import json
-                    # Handle both old format (list of strings) and new format (list of dicts)
-                    if alternatives and len(alternatives) > 0:
-                        if isinstance(alternatives[0], dict):
-                            # New format: [{"text": "...", "transcription": "..."}, ...]
-                            alternatives_json = json.dumps(alternatives, ensure_ascii=False)
-                        else:
-                            # Old format: ["text1", "text2", ...] - convert to new format
-                            alternatives_json = json.dumps([{"text": alt, "transcription": ""} for alt in alternatives], ensure_ascii=False)
-
-                await conn.execute('''
-                    INSERT INTO translation_history (
-                        user_id, source_text, source_language, translated_text,
-                        basic_translation, enhanced_translation, alternatives,
-                        transcription, enhanced_transcription, target_language, translation_style, is_voice,
-                        processing_time_ms, status, error_message
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', user_id, source_text, source_language, translated_text,
-                     basic_translation, enhanced_translation, alternatives_json,
-                     transcription, enhanced_transcription, target_language, style, is_voice,
-                     processing_time_ms, status, error_message)
-
-                # Clean old history (keep only last MAX_HISTORY_ITEMS)
-                await conn.execute('''
-                    DELETE FROM translation_history
-                    WHERE user_id = ? AND id NOT IN (
-                        SELECT id FROM translation_history
-                        WHERE user_id = ?
-                        ORDER BY created_at DESC
-                        LIMIT ?
-                    )
-                ''', user_id, user_id, config.MAX_HISTORY_ITEMS)
-
-                await conn.commit()
-            return True
+        async with db_adapter.get_connection() as conn:
+            # Each row is only written when history saving is enabled for its user
+            # (explicit casts, INSERT ... SELECT does not infer parameter types from columns)
+            await conn.executemany(SQL_INSERT_HISTORY, rows)
+
+        for record in records:
+            history_retention.mark(record['user_id'])
+        return True
+
+    def _history_row(self, record: Dict[str, Any]) -> tuple:
+        """Query arguments of one translation_history insert"""
+        # Convert alternatives list to JSON string for storage
+        alternatives = record.get('alternatives')
+        alternatives_json = None
+        if alternatives:
+            # Handle both old format (list of strings) and new format (list of dicts)
+            if isinstance(alternatives[0], dict):
+                # New format: [{"text": "...", "transcription": "..."}, ...]
+                alternatives_json = json.dumps(alternatives, ensure_ascii=False)
+            else:
+                # Old format: ["text1", "text2", ...] - convert to new format
+                alternatives_json = json.dumps([{"text": alt, "transcription": ""} for alt in alternatives], ensure_ascii=False)
+
+        return (
+            record['user_id'], record['source_text'], record.get('source_language'),
+            record['translated_text'], record.get('basic_translation'),
+            record.get('enhanced_translation'), alternatives_json,
+            record.get('transcription'), record.get('enhanced_transcription'),
+            record['target_language'], record.get('style', 'informal'), record.get('is_voice', False),
+            record.get('processing_time_ms'), record.get('status', 'success'),
+            record.get('error_message'), record.get('original_duration_ms'),
+            record.get('trimmed_duration_ms'), record.get('created_at'), record['user_id']
+        )
 
     async def get_user_history(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Get user's translation history"""
         async with db_adapter.get_connection() as conn:
-            cursor = await conn.execute('''
-                SELECT * FROM translation_history
-                WHERE user_id = ?
-                ORDER BY created_at DESC
-                LIMIT ?
-            ''', user_id, limit)
+            cursor = await conn.execute(SQL_USER_HISTORY, user_id, limit)
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
 
@@ -554,68 +697,59 @@ class Database:
             else:  # yearly
                 expires_at = now + timedelta(days=365)
 
-            # Add subscription record
-            await conn.execute('''
-                INSERT INTO subscriptions (
-                    user_id, subscription_type, amount, payment_id,
-                    status, started_at, expires_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', user_id, subscription_type, amount, payment_id,
-                 'active', now, expires_at)
-
-            await conn.commit()
+            # Add subscription record and update premium_until atomically
+            async with conn.transaction():
+                await conn.execute('''
+                    INSERT INTO subscriptions (
+                        user_id, subscription_type, amount, payment_id,
+                        status, started_at, expires_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', user_id, subscription_type, amount, payment_id,
+                     'active', now, expires_at)
+                premium_until = await self._sync_premium_until(conn, user_id)
+
+            premium_cache.set(user_id, premium_until)
+            stats_rollup.record_payment(amount)
             return True
 
     async def get_statistics(self, date: datetime = None) -> Dict[str, Any]:
-        """Get statistics for a specific date or today"""
+        """Get statistics for a specific date or today (from the statistics rollup)"""
         if not date:
             date = datetime.now().date()
-
-        async with db_adapter.get_connection() as conn:
-            # Get user statistics
-            cursor = await conn.execute('''
-                SELECT
-                    COUNT(*) as total_users,
-                    SUM(CASE WHEN last_translation_date = ? THEN 1 ELSE 0 END) as active_users
-                FROM users
-            ''', date)
-            user_stats = await cursor.fetchone()
-
-            # Get premium user count from active subscriptions
-            cursor = await conn.execute('''
-                SELECT COUNT(DISTINCT user_id) as premium_users
-                FROM subscriptions
-                WHERE status = 'active' AND expires_at > ?
-            ''', datetime.now())
-            premium_stats = await cursor.fetchone()
-
-            # Get translation statistics
-            cursor = await conn.execute('''
-                SELECT
-                    COUNT(*) as total_translations,
-                    SUM(CASE WHEN is_voice = TRUE THEN 1 ELSE 0 END) as voice_translations
-                FROM translation_history
-                WHERE DATE(created_at) = ?
-            ''', date)
-            trans_stats = await cursor.fetchone()
-
-            # Get revenue
-            cursor = await conn.execute('''
-                SELECT SUM(amount) as revenue
-                FROM subscriptions
-                WHERE DATE(created_at) = ? AND status = 'active'
-            ''', date)
-            revenue = await cursor.fetchone()
-
-            return {
-                'date': date,
-                'total_users': user_stats[0] or 0,
-                'active_users': user_stats[1] or 0,
-                'premium_users': premium_stats[0] or 0,
-                'total_translations': trans_stats[0] or 0,
-                'voice_translations': trans_stats[1] or 0,
-                'revenue': revenue[0] or 0
-            }
+        elif isinstance(date, datetime):
+            date = date.date()
+
+        rows = await self.get_daily_statistics(date, date)
+        return rows[0]
+
+    async def get_daily_statistics(self, start_date, end_date) -> List[Dict[str, Any]]:
+        """Get rollup rows for every day from start_date to end_date (missing days as zeros)"""
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
+            rows = await conn.fetchall('''
+                SELECT * FROM statistics
+                WHERE date >= ? AND date <= ?
+            ''', start_date, end_date)
+
+        by_date = {row['date']: dict(row) for row in rows}
+        days = []
+        for i in range((end_date - start_date).days + 1):
+            day = start_date + timedelta(days=i)
+            row = by_date.get(day, {})
+            days.append({
+                'date': day,
+                'total_users': row.get('total_users') or 0,
+                'active_users': row.get('active_users') or 0,
+                'premium_users': row.get('premium_users') or 0,
+                'total_translations': row.get('total_translations') or 0,
+                'voice_translations': row.get('voice_translations') or 0,
+                'error_count': row.get('error_count') or 0,
+                'processing_time_sum_ms': row.get('processing_time_sum_ms') or 0,
+                'processing_time_count': row.get('processing_time_count') or 0,
+                'voice_time_sum_ms': row.get('voice_time_sum_ms') or 0,
+                'voice_time_count': row.get('voice_time_count') or 0,
+                'revenue': row.get('revenue') or 0
+            })
+        return days
 
     async def update_user_settings(self, user_id: int, **settings) -> bool:
         """Update user settings"""
@@ -643,17 +777,17 @@ class Database:
 
     async def get_user_count(self) -> int:
         """Get total user count"""
-        async with db_adapter.get_connection() as conn:
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
             cursor = await conn.execute('SELECT COUNT(*) FROM users')
             result = await cursor.fetchone()
             return result[0] if result else 0
 
     async def get_premium_user_count(self) -> int:
-        """Get premium user count from active subscriptions"""
-        async with db_adapter.get_connection() as conn:
+        """Get premium user count from users.premium_until"""
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
             cursor = await conn.execute('''
-                SELECT COUNT(DISTINCT user_id) FROM subscriptions
-                WHERE status = 'active' AND expires_at > ?
+                SELECT COUNT(*) FROM users
+                WHERE premium_until > ?
             ''', datetime.now())
             result = await cursor.fetchone()
             return result[0] if result else 0
@@ -665,25 +799,28 @@ class Database:
 
         async with db_adapter.get_connection() as conn:
             try:
-                if is_premium and expires_at:
-                    # Add or update subscription
-                    now = datetime.now()
-                    await conn.execute('''
-                        INSERT INTO subscriptions (
-                            user_id, subscription_type, amount, payment_id,
-                            status, started_at, expires_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', user_id, subscription_type or 'unknown', 0.0, 'legacy_update',
-                         'active', now, expires_at)
-                else:
-                    # Deactivate subscription
-                    await conn.execute('''
-                        UPDATE subscriptions
-                        SET status = 'expired'
-                        WHERE user_id = ? AND status = 'active'
-                    ''', user_id)
-
-                await conn.commit()
+                async with conn.transaction():
+                    if is_premium and expires_at:
+                        # Add or update subscription
+                        now = datetime.now()
+                        await conn.execute('''
+                            INSERT INTO subscriptions (
+                                user_id, subscription_type, amount, payment_id,
+                                status, started_at, expires_at
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ''', user_id, subscription_type or 'unknown', 0.0, 'legacy_update',
+                             'active', now, expires_at)
+                    else:
+                        # Deactivate subscription
+                        await conn.execute('''
+                            UPDATE subscriptions
+                            SET status = 'expired'
+                            WHERE user_id = ? AND status = 'active'
+                        ''', user_id)
+
+                    premium_until = await self._sync_premium_until(conn, user_id)
+
+                premium_cache.set(user_id, premium_until)
                 return True
             except Exception as e:
                 print(f"Error updating subscription: {e}")
@@ -746,29 +883,37 @@ class Database:
                 print(f"Error adding feedback from user {user_id}: {e}")
                 return False
 
-    async def get_all_feedback(self, status: str = None, limit: int = 100):
-        """Get all feedback, optionally filtered by status"""
-        async with db_adapter.get_connection() as conn:
+    async def get_all_feedback(self, status: str = None, limit: int = 100, cursor: tuple = None):
+        """Get all feedback, optionally filtered by status, newest first
+
+        cursor is (created_at, id) of the last item of the previous page.
+        """
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
             try:
+                conditions = []
+                params = []
+
                 if status:
-                    rows = await conn.fetchall('''
-                        SELECT f.id, f.user_id, u.username, u.first_name, u.last_name,
-                               f.message, f.status, f.created_at, f.updated_at
-                        FROM feedback f
-                        LEFT JOIN users u ON f.user_id = u.user_id
-                        WHERE f.status = $1
-                        ORDER BY f.created_at DESC
-                        LIMIT $2
-                    ''', status, limit)
-                else:
-                    rows = await conn.fetchall('''
-                        SELECT f.id, f.user_id, u.username, u.first_name, u.last_name,
-                               f.message, f.status, f.created_at, f.updated_at
-                        FROM feedback f
-                        LEFT JOIN users u ON f.user_id = u.user_id
-                        ORDER BY f.created_at DESC
-                        LIMIT $1
-                    ''', limit)
+                    conditions.append("f.status = ?")
+                    params.append(status)
+
+                # NULL created_at sorts last (migration 020)
+                if cursor:
+                    conditions.append(keyset_condition("f.created_at", "f.id"))
+                    params.extend(cursor)
+
+                where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+                params.append(limit)
+                rows = await conn.fetchall(f'''
+                    SELECT f.id, f.user_id, u.username, u.first_name, u.last_name,
+                           f.message, f.status, f.created_at, f.updated_at
+                    FROM feedback f
+                    LEFT JOIN users u ON f.user_id = u.user_id
+                    {where_clause}
+                    ORDER BY {keyset_order("f.created_at", "f.id")}
+                    LIMIT ?
+                ''', *params)
 
                 feedback_list = []
                 for row in rows:
@@ -833,9 +978,13 @@ class Database:
                 traceback.print_exc()
                 return False
 
-    async def get_admin_logs(self, admin_user_id: int = None, action: str = None, limit: int = 100):
-        """Get admin action logs with optional filters"""
-        async with db_adapter.get_connection() as conn:
+    async def get_admin_logs(self, admin_user_id: int = None, action: str = None, limit: int = 100,
+                             cursor: tuple = None):
+        """Get admin action logs with optional filters, newest first
+
+        cursor is (created_at, id) of the last item of the previous page.
+        """
+        async with db_adapter.get_connection(POOL_ANALYTICS) as conn:
             try:
                 conditions = []
                 params = []
@@ -848,6 +997,11 @@ class Database:
                     conditions.append("aa.action = ?")
                     params.append(action)
 
+                # NULL created_at sorts last (migration 020)
+                if cursor:
+                    conditions.append(keyset_condition("aa.created_at", "aa.id"))
+                    params.extend(cursor)
+
                 where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
 
                 params.append(limit)
@@ -859,7 +1013,7 @@ class Database:
                     LEFT JOIN users u1 ON aa.admin_user_id = u1.user_id
                     LEFT JOIN users u2 ON aa.target_user_id = u2.user_id
                     {where_clause}
-                    ORDER BY aa.created_at DESC
+                    ORDER BY {keyset_order("aa.created_at", "aa.id")}
                     LIMIT ?
                 '''
 
@@ -966,6 +1120,40 @@ class Database:
                 print(f"Error removing admin role: {e}")
                 return False
 
+    # ==================== Voice Transcriptions ====================
+
+    async def get_cached_transcription(self, file_unique_id: str, asr_model: str) -> Optional[str]:
+        """Get stored transcription of a Telegram voice file"""
+        async with db_adapter.get_connection() as conn:
+            try:
+                row = await conn.fetchone('''
+                    UPDATE voice_transcriptions
+                    SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+                    WHERE file_unique_id = ? AND asr_model = ?
+                    RETURNING text
+                ''', file_unique_id, asr_model)
+                return row['text'] if row else None
+            except Exception as e:
+                print(f"Error getting cached transcription {file_unique_id}: {e}")
+                return None
+
+    async def save_transcription(self, file_unique_id: str, asr_model: str, text: str) -> bool:
+        """Store transcription of a Telegram voice file"""
+        async with db_adapter.get_connection() as conn:
+            try:
+                await conn.execute('''
+                    INSERT INTO voice_transcriptions (file_unique_id, asr_model, text)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (file_unique_id, asr_model) DO UPDATE SET
+                        text = EXCLUDED.text,
+                        last_used_at = CURRENT_TIMESTAMP
+                ''', file_unique_id, asr_model, text)
+                await conn.commit()
+                return True
+            except Exception as e:
+                print(f"Error saving transcription {file_unique_id}: {e}")
+                return False
+
     # ==================== System Settings ====================
 
     async def get_setting(self, key: str, default: Any = None) -> Any:
@@ -1,39 +1,363 @@
 """Database adapter for PostgreSQL only"""
 
 import os
+import re
+import time
+import asyncio
 import asyncpg
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Dict, NamedTuple
 from contextlib import asynccontextmanager
 
+from config import config
+
+# Statements that return a status string instead of rows
+STATUS_COMMANDS = ('CREATE', 'ALTER', 'DROP', 'INSERT', 'UPDATE', 'DELETE', 'SET', 'DO', 'BEGIN', 'COMMIT', 'ROLLBACK')
+
+SQL_CACHE_SIZE = int(os.getenv("DB_SQL_CACHE_SIZE", "1024"))  # converted query strings
+
+# Named pools: bot traffic and writes / read-only admin and statistics queries
+POOL_DEFAULT = 'default'
+POOL_ANALYTICS = 'analytics'
+POOLS = (POOL_DEFAULT, POOL_ANALYTICS)
+
+# Errors that mean the server could not be reached (replica fallback)
+CONNECT_ERRORS = (OSError, asyncpg.exceptions.PostgresConnectionError, asyncpg.exceptions.CannotConnectNowError)
+# Errors of an established connection that went away (replica restart, failover)
+CONNECTION_LOST_ERRORS = CONNECT_ERRORS + (asyncpg.exceptions.ConnectionDoesNotExistError,
+                                           asyncpg.exceptions.InterfaceError)
+
+
+class ConvertedQuery(NamedTuple):
+    sql: str  # query with $1, $2, ... placeholders
+    returns_status: bool  # DDL/DML without rows
+    label: str  # key for per-statement stats
+
+
+def convert_placeholders(query: str) -> str:
+    """Convert ? placeholders to $1, $2, etc"""
+    result = []
+    param_index = 1
+    i = 0
+    in_string = False
+    string_char = None
+
+    while i < len(query):
+        char = query[i]
+
+        # Handle string literals
+        if char in ('"', "'"):
+            if not in_string:
+                in_string = True
+                string_char = char
+            elif char == string_char:
+                in_string = False
+                string_char = None
+            result.append(char)
+            i += 1
+            continue
+
+        # Replace ? with $n outside of strings
+        if char == '?' and not in_string:
+            result.append(f'${param_index}')
+            param_index += 1
+        else:
+            result.append(char)
+
+        i += 1
+
+    return ''.join(result)
+
+
+@lru_cache(maxsize=SQL_CACHE_SIZE)
+def convert_query(query: str) -> ConvertedQuery:
+    """Placeholder conversion and statement type, memoized by the original string"""
+    pg_query = convert_placeholders(query)
+    query_upper = pg_query.strip().upper()
+    label = re.sub(r'\s+', ' ', pg_query.strip())[:120]
+    return ConvertedQuery(pg_query, query_upper.startswith(STATUS_COMMANDS), label)
+
+
+class QueryStats:
+    """Per-statement call counts and timings"""
+
+    def __init__(self):
+        self.statements: Dict[str, Dict[str, float]] = {}
+
+    def record(self, label: str, elapsed_ms: float, failed: bool = False):
+        entry = self.statements.get(label)
+        if entry is None:
+            entry = self.statements[label] = {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        entry['calls'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        if failed:
+            entry['errors'] += 1
+
+    def report(self, limit: int = 50):
+        """Statements sorted by total time"""
+        rows = [
+            {
+                'statement': label,
+                'calls': entry['calls'],
+                'errors': entry['errors'],
+                'total_ms': round(entry['total_ms'], 1),
+                'avg_ms': round(entry['total_ms'] / entry['calls'], 2),
+                'max_ms': round(entry['max_ms'], 1)
+            }
+            for label, entry in self.statements.items()
+        ]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows[:limit]
+
 
 class DatabaseAdapter:
-    """Adapter for PostgreSQL database"""
+    """Adapter for PostgreSQL database
+
+    Connections come from named pools so admin/statistics reads cannot starve
+    bot traffic: POOL_DEFAULT serves the bot and all writes, POOL_ANALYTICS
+    serves read-only dashboard queries. The analytics pool connects to
+    DATABASE_REPLICA_URL when it is set and falls back to the primary while
+    the replica is unreachable, retrying it every DB_REPLICA_RETRY_INTERVAL.
+    """
 
     def __init__(self):
         self.database_url = os.getenv("DATABASE_URL")
         if not self.database_url:
             raise ValueError("DATABASE_URL environment variable is required")
-
-        self._pool: Optional[asyncpg.Pool] = None
-
-    async def init_pool(self):
-        """Initialize connection pool for PostgreSQL"""
-        if not self._pool:
-            self._pool = await asyncpg.create_pool(self.database_url)
+        self.replica_url = os.getenv("DATABASE_REPLICA_URL")
+
+        self._pools: Dict[str, asyncpg.Pool] = {}
+        self._pool_settings: Dict[str, tuple] = {}
+        self._pool_lock = asyncio.Lock()
+        # pool name -> url it is connected to
+        self.pool_urls: Dict[str, str] = {}
+        self._replica_failed_at = float('-inf')
+        self.replica_fallbacks = 0
+        # name -> query, prepared as a named statement on every new default pool connection
+        self.hot_queries: Dict[str, str] = {}
+        # backend pid -> {converted query -> PreparedStatement}
+        self.prepared: Dict[int, Dict[str, object]] = {}
+        self.stats = QueryStats()
+        self.pool_stats: Dict[str, Dict[str, float]] = {name: self._new_pool_stats() for name in POOLS}
+
+    @staticmethod
+    def _new_pool_stats() -> Dict[str, float]:
+        return {
+            'acquired': 0, 'in_use': 0, 'max_in_use': 0, 'waiting': 0, 'timeouts': 0,
+            'wait_total_ms': 0.0, 'wait_max_ms': 0.0
+        }
+
+    def register_hot_query(self, name: str, query: str) -> str:
+        """Declare a query to prepare on each connection, returns it unchanged"""
+        self.hot_queries[name] = query
+        return query
+
+    def _current_pool_settings(self, name: str) -> tuple:
+        if name == POOL_ANALYTICS:
+            limits = (config.DB_ANALYTICS_POOL_MIN_SIZE, config.DB_ANALYTICS_POOL_MAX_SIZE,
+                      config.DB_ANALYTICS_STATEMENT_TIMEOUT_MS)
+        else:
+            limits = (config.DB_POOL_MIN_SIZE, config.DB_POOL_MAX_SIZE, config.DB_STATEMENT_TIMEOUT_MS)
+        return limits + (config.DB_COMMAND_TIMEOUT, config.DB_MAX_INACTIVE_LIFETIME,
+                         config.DB_STATEMENT_CACHE_SIZE)
+
+    def _pool_url(self, name: str) -> str:
+        """Replica for the analytics pool unless it failed recently, primary otherwise"""
+        if (name == POOL_ANALYTICS and self.replica_url
+                and time.monotonic() - self._replica_failed_at >= config.DB_REPLICA_RETRY_INTERVAL):
+            return self.replica_url
+        return self.database_url
+
+    def _replica_unavailable(self, error: Exception):
+        self._replica_failed_at = time.monotonic()
+        self.replica_fallbacks += 1
+        print(f"[DB] Replica unavailable, analytics queries use the primary: {error}")
+
+    async def _create_pool(self, name: str) -> asyncpg.Pool:
+        settings = self._current_pool_settings(name)
+        min_size, max_size, statement_timeout_ms, command_timeout, max_inactive, cache_size = settings
+        url = self._pool_url(name)
+        try:
+            pool = await asyncpg.create_pool(
+                url,
+                min_size=min_size,
+                max_size=max_size,
+                command_timeout=command_timeout or None,
+                max_inactive_connection_lifetime=max_inactive,
+                statement_cache_size=cache_size,
+                server_settings={'statement_timeout': str(statement_timeout_ms)},
+                init=self._init_connection if name == POOL_DEFAULT else None
+            )
+        except CONNECT_ERRORS as e:
+            if url == self.database_url:
+                raise
+            self._replica_unavailable(e)
+            return await self._create_pool(name)
+
+        self._pool_settings[name] = settings
+        self.pool_urls[name] = url
+        return pool
+
+    async def init_pool(self, name: str = POOL_DEFAULT) -> asyncpg.Pool:
+        """Initialize a named connection pool"""
+        async with self._pool_lock:
+            if name not in self._pools:
+                self._pools[name] = await self._create_pool(name)
+            return self._pools[name]
+
+    async def _replace_pool(self, name: str, stale: asyncpg.Pool) -> asyncpg.Pool:
+        """Reconnect a pool to another url, the old one closes once its connections are released"""
+        async with self._pool_lock:
+            if self._pools.get(name) is stale:
+                self._pools[name] = await self._create_pool(name)
+                asyncio.create_task(stale.close())
+            return self._pools[name]
+
+    async def warm_up(self):
+        """Create the pools (re-created if settings changed) and open their min_size connections"""
+        for name in POOLS:
+            if name in self._pools and self._pool_settings[name] != self._current_pool_settings(name):
+                print(f"[DB] Pool settings changed, re-creating {name} pool")
+                await self._pools.pop(name).close()
+                if name == POOL_DEFAULT:
+                    self.prepared.clear()
+            pool = await self.init_pool(name)
+
+            async def ping():
+                async with self.get_connection(name) as conn:
+                    await conn.fetchone('SELECT 1')
+
+            min_size = self._pool_settings[name][0]
+            await asyncio.gather(*[ping() for _ in range(min_size)])
+            print(f"[DB] {name} pool ready: {pool.get_size()} connections to "
+                  f"{'replica' if self.pool_urls[name] != self.database_url else 'primary'} "
+                  f"(min {min_size}, max {self._pool_settings[name][1]})")
+
+    async def _init_connection(self, conn):
+        """Prepare hot queries once per new connection"""
+        statements = {}
+        for name, query in self.hot_queries.items():
+            pg_query = convert_query(query).sql
+            try:
+                statements[pg_query] = await conn.prepare(pg_query, name=name)
+            except Exception as e:
+                # e.g. tables are created or migrated after the pool started
+                print(f"[DB] Could not prepare statement {name}: {e}")
+        pid = conn.get_server_pid()
+        self.prepared[pid] = statements
+
+        def forget(_conn):
+            # A later connection may have been given the same pid
+            if self.prepared.get(pid) is statements:
+                del self.prepared[pid]
+
+        conn.add_termination_listener(forget)
 
     async def close_pool(self):
-        """Close connection pool"""
-        if self._pool:
-            await self._pool.close()
-            self._pool = None
+        """Close all connection pools"""
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            await pool.close()
+        self.prepared.clear()
+
+    async def _acquire(self, name: str):
+        pool = self._pools.get(name)
+        if pool is None:
+            pool = await self.init_pool(name)
+        if self.pool_urls[name] != self._pool_url(name):
+            # Replica retry interval passed
+            pool = await self._replace_pool(name, pool)
+        try:
+            return pool, await pool.acquire(timeout=config.DB_POOL_ACQUIRE_TIMEOUT)
+        except CONNECT_ERRORS as e:
+            if self.pool_urls[name] == self.database_url:
+                raise
+            self._replica_unavailable(e)
+            pool = await self._replace_pool(name, pool)
+            return pool, await pool.acquire(timeout=config.DB_POOL_ACQUIRE_TIMEOUT)
 
     @asynccontextmanager
-    async def get_connection(self):
-        """Get database connection (context manager)"""
-        if not self._pool:
-            await self.init_pool()
-        async with self._pool.acquire() as conn:
-            yield PostgreSQLConnection(conn)
+    async def get_connection(self, pool: str = POOL_DEFAULT):
+        """Get database connection from a named pool (context manager)"""
+        stats = self.pool_stats[pool]
+        stats['waiting'] += 1
+        start = time.perf_counter()
+        try:
+            owner, conn = await self._acquire(pool)
+        except asyncio.TimeoutError:
+            stats['timeouts'] += 1
+            raise
+        finally:
+            stats['waiting'] -= 1
+
+        wait_ms = (time.perf_counter() - start) * 1000
+        stats['acquired'] += 1
+        stats['wait_total_ms'] += wait_ms
+        stats['wait_max_ms'] = max(stats['wait_max_ms'], wait_ms)
+        stats['in_use'] += 1
+        stats['max_in_use'] = max(stats['max_in_use'], stats['in_use'])
+        # Hot queries are only prepared on the default pool (pids are not unique across servers)
+        prepared = self.prepared.get(conn.get_server_pid()) if pool == POOL_DEFAULT else None
+        wrapper = PostgreSQLConnection(conn, prepared, self.stats)
+
+        if self.pool_urls.get(pool, self.database_url) != self.database_url:
+            async def reconnect(error: Exception):
+                """Replica connection lost: switch the pool to the primary and continue there"""
+                nonlocal owner, conn
+                self._replica_unavailable(error)
+                try:
+                    await owner.release(conn)
+                except Exception:
+                    pass
+                owner, conn = await self._acquire(pool)
+                return conn
+
+            wrapper.reconnect = reconnect
+
+        try:
+            yield wrapper
+        finally:
+            stats['in_use'] -= 1
+            await owner.release(conn)
+
+    def get_pool_stats(self) -> Dict[str, object]:
+        """Per-pool size, acquire wait times and timeouts for sizing the pools"""
+        result = {}
+        for name, stats in self.pool_stats.items():
+            acquired = stats['acquired']
+            settings = self._pool_settings.get(name) or self._current_pool_settings(name)
+            entry = {
+                **stats,
+                'wait_total_ms': round(stats['wait_total_ms'], 1),
+                'wait_max_ms': round(stats['wait_max_ms'], 1),
+                'wait_avg_ms': round(stats['wait_total_ms'] / acquired, 2) if acquired else 0,
+                'min_size': settings[0],
+                'max_size': settings[1],
+                'target': 'replica' if self.pool_urls.get(name, self.database_url) != self.database_url else 'primary'
+            }
+            pool = self._pools.get(name)
+            if pool:
+                entry['size'] = pool.get_size()
+                entry['idle'] = pool.get_idle_size()
+            result[name] = entry
+        return {
+            'pools': result,
+            'replica_configured': bool(self.replica_url),
+            'replica_fallbacks': self.replica_fallbacks
+        }
+
+    def get_query_stats(self, limit: int = 50) -> Dict[str, object]:
+        """Per-statement timings and cache counters for monitoring"""
+        cache = convert_query.cache_info()
+        return {
+            'statements': self.stats.report(limit),
+            'sql_cache': {'hits': cache.hits, 'misses': cache.misses,
+                          'size': cache.currsize, 'max_size': cache.maxsize},
+            'statement_cache_size': config.DB_STATEMENT_CACHE_SIZE,
+            'prepared': sorted(self.hot_queries),
+            'prepared_connections': len(self.prepared)
+        }
 
     def placeholder(self, index: int) -> str:
         """Get parameter placeholder for query"""
@@ -55,57 +379,92 @@ class DatabaseAdapter:
 class PostgreSQLCursor:
     """Cursor-like wrapper for PostgreSQL query results"""
 
-    def __init__(self, conn, query, args):
-        self.conn = conn
+    def __init__(self, connection, query, args, timeout: Optional[float] = None):
+        self.connection = connection
         self.query = query
         self.args = args
+        self.timeout = timeout
 
     async def fetchone(self):
         """Fetch one row"""
-        return await self.conn.fetchrow(self.query, *self.args)
+        return await self.connection._run(self.query, 'fetchrow', self.args, self.timeout)
 
     async def fetchall(self):
         """Fetch all rows"""
-        return await self.conn.fetch(self.query, *self.args)
+        return await self.connection._run(self.query, 'fetch', self.args, self.timeout)
 
 
 class PostgreSQLConnection:
     """Wrapper for PostgreSQL connection"""
 
-    def __init__(self, conn):
+    def __init__(self, conn, prepared: Optional[Dict] = None, stats: Optional[QueryStats] = None):
         self.conn = conn
         self.is_postgres = True
-
-    async def execute(self, query: str, *args):
+        self.prepared = prepared if prepared is not None else {}
+        self.stats = stats
+        # Set by get_connection on replica connections, retries a query once on the primary
+        self.reconnect = None
+
+    async def _run(self, query: ConvertedQuery, method: str, args, timeout: Optional[float] = None):
+        """Run through the named prepared statement when there is one, timing the call
+
+        timeout overrides the pool's command_timeout (seconds) for this call.
+        """
+        start = time.perf_counter()
+        failed = False
+        try:
+            statement = self.prepared.get(query.sql)
+            if statement is not None:
+                try:
+                    if method == 'execute':
+                        await statement.fetch(*args, timeout=timeout)
+                        return statement.get_statusmsg()
+                    return await getattr(statement, method)(*args, timeout=timeout)
+                except asyncpg.exceptions.InvalidCachedStatementError:
+                    # Schema changed under the statement, use asyncpg's own cache from now on
+                    self.prepared.pop(query.sql, None)
+
+            try:
+                return await getattr(self.conn, method)(query.sql, *args, timeout=timeout)
+            except CONNECTION_LOST_ERRORS as e:
+                if self.reconnect is None or self.conn.is_in_transaction():
+                    raise
+                reconnect, self.reconnect = self.reconnect, None
+                self.conn = await reconnect(e)
+                return await getattr(self.conn, method)(query.sql, *args, timeout=timeout)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.record(query.label, (time.perf_counter() - start) * 1000, failed)
+
+    async def execute(self, query: str, *args, timeout: Optional[float] = None):
         """Execute query - returns cursor-like object or status"""
-        # Convert ? to $1, $2, etc for PostgreSQL
-        pg_query = self._convert_placeholders(query)
-
-        # Check if this is a DDL/DML statement that doesn't return rows
-        query_upper = pg_query.strip().upper()
-        if any(query_upper.startswith(cmd) for cmd in ['CREATE', 'ALTER', 'DROP', 'INSERT', 'UPDATE', 'DELETE']):
-            # Execute directly and return status
-            if args:
-                return await self.conn.execute(pg_query, *args)
-            else:
-                return await self.conn.execute(pg_query)
+        converted = convert_query(query)
+
+        # DDL/DML statements that don't return rows are executed directly
+        if converted.returns_status:
+            return await self._run(converted, 'execute', args, timeout)
 
         # Return cursor-like object for SELECT queries
-        return PostgreSQLCursor(self.conn, pg_query, args)
+        return PostgreSQLCursor(self, converted, args, timeout)
 
-    async def fetchone(self, query: str, *args):
+    async def fetchone(self, query: str, *args, timeout: Optional[float] = None):
         """Fetch one row"""
-        pg_query = self._convert_placeholders(query)
-        return await self.conn.fetchrow(pg_query, *args)
+        return await self._run(convert_query(query), 'fetchrow', args, timeout)
 
-    async def fetchall(self, query: str, *args):
+    async def fetchall(self, query: str, *args, timeout: Optional[float] = None):
         """Fetch all rows"""
-        pg_query = self._convert_placeholders(query)
-        return await self.conn.fetch(pg_query, *args)
+        return await self._run(convert_query(query), 'fetch', args, timeout)
 
-    async def fetch(self, query: str, *args):
+    async def fetch(self, query: str, *args, timeout: Optional[float] = None):
         """Fetch all rows (alias for fetchall)"""
-        return await self.fetchall(query, *args)
+        return await self.fetchall(query, *args, timeout=timeout)
+
+    async def executemany(self, query: str, args_list, timeout: Optional[float] = None):
+        """Execute query once per argument tuple in a single round trip"""
+        return await self._run(convert_query(query), 'executemany', (args_list,), timeout)
 
     async def commit(self):
         """Commit transaction (no-op for PostgreSQL, autocommit by default)"""
@@ -117,37 +476,7 @@ class PostgreSQLConnection:
 
     def _convert_placeholders(self, query: str) -> str:
         """Convert ? placeholders to $1, $2, etc"""
-        result = []
-        param_index = 1
-        i = 0
-        in_string = False
-        string_char = None
-
-        while i < len(query):
-            char = query[i]
-
-            # Handle string literals
-            if char in ('"', "'"):
-                if not in_string:
-                    in_string = True
-                    string_char = char
-                elif char == string_char:
-                    in_string = False
-                    string_char = None
-                result.append(char)
-                i += 1
-                continue
-
-            # Replace ? with $n outside of strings
-            if char == '?' and not in_string:
-                result.append(f'${param_index}')
-                param_index += 1
-            else:
-                result.append(char)
-
-            i += 1
-
-        return ''.join(result)
+        return convert_query(query).sql
 
 
 # Global adapter instance
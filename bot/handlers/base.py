@@ -11,6 +11,8 @@ from bot.keyboards.inline import get_main_menu_keyboard, get_translation_actions
 from bot.keyboards.reply import get_main_reply_keyboard
 from bot.services.translator import TranslatorService
 from bot.services.voice import VoiceService
+from bot.services.history_writer import history_writer
+from bot.services.voice_prefetch import voice_prefetcher
 from bot.utils.messages import get_text, get_welcome_text
 from bot.utils.rate_limit import rate_limit
 from config import config
@@ -27,6 +29,18 @@ async def keep_typing(bot, chat_id: int, action: str = 'typing'):
     except asyncio.CancelledError:
         pass
 
+async def synthesize_speech(text: str, language: str, speed: float = 1.0,
+                            voice_type: str = 'alloy'):
+    """Get (file_id or audio, cache key) for premium speech in its own VoiceService session"""
+    async with VoiceService() as voice_service:
+        return await voice_service.get_voice_payload(
+            text=text,
+            language=language,
+            premium=True,
+            speed=speed,
+            voice_type=voice_type
+        )
+
 def escape_html(text: str) -> str:
     """Escape special characters for Telegram HTML"""
     if not text:
@@ -38,22 +52,21 @@ def escape_html(text: str) -> str:
     return text
 
 @router.message(CommandStart())
-async def start_handler(message: Message, state: FSMContext):
+async def start_handler(message: Message, state: FSMContext, user_info: dict = None):
     """Handle /start command"""
     await state.clear()
 
-    # Add user to database
-    user = message.from_user
-    await db.add_user(
-        user_id=user.id,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        language_code=user.language_code or 'ru'
-    )
-
-    # Get user info (now includes dynamic premium status)
-    user_info = await db.get_user(user.id)
+    # User is registered by UserMiddleware, which also loads user_info
+    if user_info is None:
+        user = message.from_user
+        await db.add_user(
+            user_id=user.id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            language_code=user.language_code or 'ru'
+        )
+        user_info = await db.get_user(user.id)
 
     welcome_text = get_welcome_text(
         language=user_info.get('interface_language', 'ru'),
@@ -72,18 +85,18 @@ async def start_handler(message: Message, state: FSMContext):
     )
 
 @router.message(Command("help", "помощь"))
-async def help_handler(message: Message):
+async def help_handler(message: Message, user_info: dict = None):
     """Handle help command"""
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
     help_text = get_text('help', user_info.get('interface_language', 'ru'))
 
     await message.answer(help_text)
 
 @router.message(Command("premium", "премиум"))
-async def premium_handler(message: Message):
+async def premium_handler(message: Message, user_info: dict = None):
     """Handle premium command"""
     from bot.keyboards.inline import get_premium_keyboard, get_main_menu_keyboard
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
 
     if user_info.get('is_premium'):
         premium_text = get_text('already_premium', user_info.get('interface_language', 'ru'))
@@ -93,13 +106,13 @@ async def premium_handler(message: Message):
         await message.answer(premium_text, reply_markup=await get_premium_keyboard())
 
 @router.message(Command("language", "язык"))
-async def language_handler(message: Message):
+async def language_handler(message: Message, user_info: dict = None):
     """Handle language selection command"""
     from bot.keyboards.inline import get_language_selection_keyboard
 
     from bot.services.translator import TranslatorService
 
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
     current_lang = user_info.get('target_language', 'en')
     interface_lang = user_info.get('interface_language', 'ru')
 
@@ -113,11 +126,11 @@ async def language_handler(message: Message):
     await message.answer(text, reply_markup=get_language_selection_keyboard())
 
 @router.message(Command("style", "стиль"))
-async def style_handler(message: Message):
+async def style_handler(message: Message, user_info: dict = None):
     """Handle style selection command"""
     from bot.keyboards.inline import get_style_selection_keyboard
 
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
     current_style = user_info.get('translation_style', 'informal')
 
     text = get_text('select_style', user_info.get('interface_language', 'ru')).format(
@@ -127,19 +140,19 @@ async def style_handler(message: Message):
     await message.answer(text, reply_markup=get_style_selection_keyboard())
 
 @router.message(Command("settings", "настройки"))
-async def settings_handler(message: Message):
+async def settings_handler(message: Message, user_info: dict = None):
     """Handle settings command"""
     from bot.keyboards.inline import get_settings_keyboard
 
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
     text = get_text('settings_menu', user_info.get('interface_language', 'ru'))
 
     await message.answer(text, reply_markup=get_settings_keyboard(user_info))
 
 @router.message(Command("feedback", "отзыв"))
-async def feedback_handler(message: Message):
+async def feedback_handler(message: Message, user_info: dict = None):
     """Handle feedback command"""
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
     interface_lang = user_info.get('interface_language', 'ru')
 
     # Extract feedback message from command
@@ -190,9 +203,9 @@ async def feedback_handler(message: Message):
             )
 
 @router.message(Command("history", "история"))
-async def history_handler(message: Message):
+async def history_handler(message: Message, user_info: dict = None):
     """Handle history command"""
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
 
     if not user_info.get('is_premium'):
         await message.answer(get_text('premium_required', user_info.get('interface_language', 'ru')))
@@ -243,38 +256,49 @@ async def history_handler(message: Message):
 
 @router.message(F.voice)
 @rate_limit(key='voice', rate=5, per=60)
-async def voice_handler(message: Message):
+async def voice_handler(message: Message, user_info: dict = None):
     """Handle voice messages"""
     start_time = time.time()
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
 
     # Check if user can use voice features
     if not user_info.get('is_premium'):
         await message.answer(get_text('voice_premium_required', user_info.get('interface_language', 'ru')))
         return
 
-    # Check daily limit for free users (voice counts as translation) - skip for admins
     from config import config
     is_admin = message.from_user.id in config.ADMIN_IDS
 
-    if not is_admin:
-        can_translate, remaining = await db.check_daily_limit(message.from_user.id)
-        if not can_translate:
-            await message.answer(get_text('daily_limit_reached', user_info.get('interface_language', 'ru')))
-            return
+    # Reject long clips from Telegram metadata before downloading anything
+    if message.voice.duration and message.voice.duration > config.MAX_VOICE_DURATION:
+        await message.answer(get_text('voice_too_long', user_info.get('interface_language', 'ru')).format(
+            max_duration=config.MAX_VOICE_DURATION
+        ))
+        return
+
+    # Check and consume the daily limit in one step (voice counts as translation, admins are unlimited)
+    can_translate, remaining = await db.consume_translation_credit(message.from_user.id, unlimited=is_admin)
+    if not can_translate:
+        await message.answer(get_text('daily_limit_reached', user_info.get('interface_language', 'ru')))
+        return
 
     # Show processing message
     processing_msg = await message.answer(get_text('processing_voice', user_info.get('interface_language', 'ru')))
 
     # Start continuous typing indicator
     typing_task = asyncio.create_task(keep_typing(message.bot, message.chat.id, 'typing'))
+    history_record = None
 
     try:
         async with VoiceService() as voice_service:
             # Process voice message
-            text = await voice_service.process_voice_message(message.voice.file_id, message.bot)
+            text, voice_metadata = await voice_service.process_voice_message(
+                message.voice.file_id, message.bot,
+                file_unique_id=message.voice.file_unique_id
+            )
 
             if not text:
+                await db.refund_translation_credit(message.from_user.id)
                 await processing_msg.edit_text(get_text('voice_processing_failed', user_info.get('interface_language', 'ru')))
                 return
 
@@ -292,17 +316,18 @@ async def voice_handler(message: Message):
                     style=style,
                     enhance=has_premium,
                     user_id=message.from_user.id,
-                    explain_grammar=has_premium
+                    explain_grammar=has_premium,
+                    interface_lang=user_info.get('interface_language', 'ru')
                 )
 
                 if not translated:
+                    await db.refund_translation_credit(message.from_user.id)
                     await processing_msg.edit_text(get_text('translation_failed', user_info.get('interface_language', 'ru')))
                     return
 
-                # Update counters
+                # Counters and history are written after the reply
                 processing_time = int((time.time() - start_time) * 1000)  # Convert to milliseconds
-                await db.increment_translation_count(message.from_user.id)
-                await db.add_translation_history(
+                history_record = dict(
                     user_id=message.from_user.id,
                     source_text=text,
                     source_language=metadata.get('source_lang'),
@@ -315,7 +340,9 @@ async def voice_handler(message: Message):
                     alternatives=metadata.get('alternatives'),
                     transcription=metadata.get('transcription'),
                     enhanced_transcription=metadata.get('enhanced_transcription'),
-                    processing_time_ms=processing_time
+                    processing_time_ms=processing_time,
+                    original_duration_ms=voice_metadata.get('original_duration_ms'),
+                    trimmed_duration_ms=voice_metadata.get('trimmed_duration_ms')
                 )
 
                 # Get style display name
@@ -384,8 +411,12 @@ async def voice_handler(message: Message):
                     reply_markup=get_translation_actions_keyboard(is_premium=user_info.get('is_premium', False), interface_lang=user_info.get('interface_language', 'ru'))
                 )
 
+                await history_writer.enqueue(**history_record)
+
     except Exception as e:
         logger.error(f"Voice processing error: {e}")
+        if not history_record:
+            await db.refund_translation_credit(message.from_user.id)
         await processing_msg.edit_text(get_text('voice_processing_failed', user_info.get('interface_language', 'ru')))
     finally:
         # Stop typing indicator
@@ -393,30 +424,29 @@ async def voice_handler(message: Message):
 
 @router.message(F.text & ~F.text.startswith('/'))
 @rate_limit(key='translation', rate=10, per=60)
-async def text_translation_handler(message: Message):
+async def text_translation_handler(message: Message, user_info: dict = None):
     """Handle text translation"""
     start_time = time.time()
-    user_info = await db.get_user(message.from_user.id)
+    user_info = user_info or await db.get_user(message.from_user.id)
 
     # Handle keyboard button presses
     if message.text == '🌍 Язык':
-        await language_handler(message)
+        await language_handler(message, user_info=user_info)
         return
     elif message.text == '🎨 Стиль':
-        await style_handler(message)
+        await style_handler(message, user_info=user_info)
         return
     elif message.text == '⚙️ Настройки':
-        await settings_handler(message)
+        await settings_handler(message, user_info=user_info)
         return
     elif message.text == '❓ Помощь':
-        await help_handler(message)
+        await help_handler(message, user_info=user_info)
         return
     elif message.text == '📚 История':
-        await history_handler(message)
+        await history_handler(message, user_info=user_info)
         return
     elif message.text == '📄 Экспорт':
         # Handle export request
-        user_info = await db.get_user(message.from_user.id)
         if not user_info.get('is_premium'):
             await message.answer(get_text('premium_required', user_info.get('interface_language', 'ru')))
             return
@@ -427,22 +457,23 @@ async def text_translation_handler(message: Message):
         )
         return
     elif message.text == '⭐ Премиум':
-        await premium_handler(message)
+        await premium_handler(message, user_info=user_info)
         return
 
-    # Check daily limit (skip for admins)
+    # Check and consume the daily limit in one step (admins are unlimited)
     from config import config
     is_admin = message.from_user.id in config.ADMIN_IDS
 
-    if not is_admin:
-        can_translate, remaining = await db.check_daily_limit(message.from_user.id)
-        if not can_translate:
-            limit_text = get_text('daily_limit_reached', user_info.get('interface_language', 'ru'))
-            await message.answer(limit_text)
-            return
+    can_translate, remaining = await db.consume_translation_credit(message.from_user.id, unlimited=is_admin)
+    if not can_translate:
+        limit_text = get_text('daily_limit_reached', user_info.get('interface_language', 'ru'))
+        await message.answer(limit_text)
+        return
 
     # Start continuous typing indicator
     typing_task = asyncio.create_task(keep_typing(message.bot, message.chat.id, 'typing'))
+    voice_task = None
+    history_record = None
 
     try:
         async with TranslatorService() as translator:
@@ -456,24 +487,43 @@ async def text_translation_handler(message: Message):
 
             logger.info(f"Translation for user {message.from_user.id}: admin={is_admin}, premium={has_premium}")
 
+            # Voice for the basic translation can start while GPT enhancement is running
+            auto_voice = user_info.get('auto_voice') and user_info.get('is_premium')
+            voice_speed = user_info.get('voice_speed', 1.0)
+            voice_type = user_info.get('voice_type', 'alloy')
+            prefetch_kinds = voice_prefetcher.likely_kinds(message.from_user.id) if user_info.get('is_premium') else []
+
+            def on_basic_translation(basic_translation: str):
+                nonlocal voice_task
+                if auto_voice:
+                    # Use basic translation for voice (more accurate pronunciation)
+                    logger.info(f"Generating voice for: {basic_translation[:50]}...")
+                    voice_task = asyncio.create_task(
+                        synthesize_speech(basic_translation, target_lang, voice_speed, voice_type)
+                    )
+                elif 'voice_exact' in prefetch_kinds:
+                    voice_prefetcher.schedule(message.from_user.id, basic_translation,
+                                              target_lang, voice_speed, voice_type)
+
             translated, metadata = await translator.translate(
                 text=message.text,
                 target_lang=target_lang,
                 style=style,
                 enhance=has_premium,
                 user_id=message.from_user.id,
-                explain_grammar=has_premium
+                explain_grammar=has_premium,
+                on_basic_translation=on_basic_translation,
+                interface_lang=user_info.get('interface_language', 'ru')
             )
 
             if not translated:
+                await db.refund_translation_credit(message.from_user.id)
                 await message.answer(get_text('translation_failed', user_info.get('interface_language', 'ru')))
                 return
 
-            # Update counters
-            logger.info("Starting database updates...")
+            # Counters and history are written after the reply
             processing_time = int((time.time() - start_time) * 1000)  # Convert to milliseconds
-            await db.increment_translation_count(message.from_user.id)
-            await db.add_translation_history(
+            history_record = dict(
                 user_id=message.from_user.id,
                 source_text=message.text,
                 source_language=metadata.get('source_lang'),
@@ -488,7 +538,6 @@ async def text_translation_handler(message: Message):
                 enhanced_transcription=metadata.get('enhanced_transcription'),
                 processing_time_ms=processing_time
             )
-            logger.info("Database updates completed")
 
             # Format response
             logger.info(f"Getting language names: source={metadata.get('source_lang', 'auto')}, target={target_lang}")
@@ -588,8 +637,8 @@ async def text_translation_handler(message: Message):
                 response_text += f"📝 <b>Перевод ({style_display}):</b>\n{escape_html(translated)}"
 
             # Add remaining translations info for free users (skip for admins)
-            if not user_info.get('is_premium') and not is_admin:
-                response_text += f"\n\n📊 Осталось переводов сегодня: {remaining - 1}"
+            if remaining >= 0:
+                response_text += f"\n\n📊 Осталось переводов сегодня: {remaining}"
 
             keyboard = get_translation_actions_keyboard(is_premium=user_info.get('is_premium', False), interface_lang=user_info.get('interface_language', 'ru'))
 
@@ -601,6 +650,13 @@ async def text_translation_handler(message: Message):
                 logger.info(f"Explanation: {metadata.get('explanation', 'Not found')}")
                 logger.info(f"Grammar: {metadata.get('grammar', 'Not found')}")
                 last_translation_metadata[message.from_user.id] = metadata
+                voice_prefetcher.record_translation(message.from_user.id)
+
+                # Styled translation is only known now, prefetch it after enhancement
+                styled_text = metadata.get('enhanced_translation', metadata.get('basic_translation', ''))
+                if 'voice_styled' in prefetch_kinds:
+                    voice_prefetcher.schedule(message.from_user.id, styled_text,
+                                              target_lang, voice_speed, voice_type)
 
             logger.info(f"Sending response to user {message.from_user.id}")
             await message.answer(
@@ -610,31 +666,26 @@ async def text_translation_handler(message: Message):
             )
             logger.info("Response sent successfully")
 
-            # Auto voice if enabled
-            if user_info.get('auto_voice') and user_info.get('is_premium'):
+            await history_writer.enqueue(**history_record)
+
+            # Auto voice if enabled (synthesis was started together with enhancement)
+            if voice_task:
                 try:
-                    async with VoiceService() as voice_service:
-                        # Use basic translation for voice (more accurate pronunciation)
-                        voice_text = metadata.get('basic_translation', translated)
-                        logger.info(f"Generating voice for: {voice_text[:50]}...")
-                        audio_data = await voice_service.generate_speech(
-                            text=voice_text,
-                            language=target_lang,
-                            premium=True,
-                            speed=user_info.get('voice_speed', 1.0),
-                            voice_type=user_info.get('voice_type', 'alloy')
-                        )
-
-                        if audio_data:
-                            from aiogram.types import BufferedInputFile
-                            audio_file = BufferedInputFile(audio_data, filename="translation.mp3")
-                            await message.answer_voice(audio_file)
+                    payload, voice_request = await voice_task
+
+                    if payload:
+                        async with VoiceService() as voice_service:
+                            await voice_service.send_voice_payload(message, payload, voice_request)
                 except Exception as e:
                     logger.error(f"Auto voice error: {e}")
 
     except Exception as e:
         logger.error(f"Translation error: {e}")
+        if not history_record:
+            await db.refund_translation_credit(message.from_user.id)
         await message.answer(get_text('translation_failed', user_info.get('interface_language', 'ru')))
     finally:
-        # Stop typing indicator
-        typing_task.cancel()
\ No newline at end of file
+        # Stop typing indicator and any voice synthesis nobody will wait for
+        typing_task.cancel()
+        if voice_task and not voice_task.done():
+            voice_task.cancel()
\ No newline at end of file
@@ -9,6 +9,7 @@ from bot.keyboards.inline import get_voice_options_keyboard, get_quick_styles_ke
 from bot.keyboards.reply import get_main_reply_keyboard
 from bot.services.translator import TranslatorService
 from bot.services.voice import VoiceService
+from bot.services.voice_prefetch import voice_prefetcher
 from bot.utils.messages import get_text
 from bot.handlers.base import escape_html
 from config import config
@@ -20,9 +21,9 @@ router = Router()
 last_translation_metadata = {}
 
 @router.callback_query(F.data == "back_to_menu")
-async def back_to_menu_handler(callback: CallbackQuery):
+async def back_to_menu_handler(callback: CallbackQuery, user_info: dict = None):
     """Return to main menu"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
     is_premium = user_info.get('is_premium', False)
 
     try:
@@ -40,11 +41,11 @@ async def back_to_menu_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "select_language")
-async def select_language_handler(callback: CallbackQuery):
+async def select_language_handler(callback: CallbackQuery, user_info: dict = None):
     """Show language selection"""
     from bot.services.translator import TranslatorService
 
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
     current_lang = user_info.get('target_language', 'en')
     interface_lang = user_info.get('interface_language', 'ru')
 
@@ -108,9 +109,9 @@ async def language_selection_handler(callback: CallbackQuery):
     await callback.answer(f"✅ Язык изменен на {lang_name}")
 
 @router.callback_query(F.data == "select_style")
-async def select_style_handler(callback: CallbackQuery):
+async def select_style_handler(callback: CallbackQuery, user_info: dict = None):
     """Show style selection"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
     current_style = user_info.get('translation_style', 'informal')
 
     text = get_text('select_style', user_info.get('interface_language', 'ru')).format(
@@ -146,9 +147,9 @@ async def style_selection_handler(callback: CallbackQuery):
     await callback.answer(f"✅ Стиль изменен на {style_name}")
 
 @router.callback_query(F.data == "premium")
-async def premium_handler(callback: CallbackQuery):
+async def premium_handler(callback: CallbackQuery, user_info: dict = None):
     """Show premium subscription info"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -164,9 +165,9 @@ async def premium_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "premium_features")
-async def premium_features_handler(callback: CallbackQuery):
+async def premium_features_handler(callback: CallbackQuery, user_info: dict = None):
     """Show premium features"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     await callback.message.edit_text(
         get_text('premium_features', user_info.get('interface_language', 'ru')),
@@ -177,9 +178,9 @@ async def premium_features_handler(callback: CallbackQuery):
 
 
 @router.callback_query(F.data == "settings")
-async def settings_handler(callback: CallbackQuery):
+async def settings_handler(callback: CallbackQuery, user_info: dict = None):
     """Show settings menu"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     await callback.message.edit_text(
         get_text('settings_menu', user_info.get('interface_language', 'ru')),
@@ -188,11 +189,11 @@ async def settings_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data.startswith("toggle_"))
-async def toggle_setting_handler(callback: CallbackQuery):
+async def toggle_setting_handler(callback: CallbackQuery, user_info: dict = None):
     """Handle setting toggles"""
     setting = callback.data[7:]  # Remove "toggle_" prefix
 
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
     current_value = user_info.get(setting, False)
 
     # Update setting
@@ -215,9 +216,9 @@ async def toggle_setting_handler(callback: CallbackQuery):
     await callback.answer(f"✅ {setting_name} {new_status}")
 
 @router.callback_query(F.data == "voice_speed")
-async def voice_speed_handler(callback: CallbackQuery):
+async def voice_speed_handler(callback: CallbackQuery, user_info: dict = None):
     """Show voice speed selection"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -250,9 +251,9 @@ async def speed_selection_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "voice_type")
-async def voice_type_handler(callback: CallbackQuery):
+async def voice_type_handler(callback: CallbackQuery, user_info: dict = None):
     """Show voice type selection"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -285,9 +286,9 @@ async def voice_type_selection_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "history")
-async def history_handler(callback: CallbackQuery):
+async def history_handler(callback: CallbackQuery, user_info: dict = None):
     """Show translation history"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -346,9 +347,9 @@ async def history_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "clear_history")
-async def clear_history_handler(callback: CallbackQuery):
+async def clear_history_handler(callback: CallbackQuery, user_info: dict = None):
     """Show history clearing confirmation"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
             get_text('premium_required', user_info.get('interface_language', 'ru')),
@@ -376,9 +377,9 @@ async def confirm_clear_history_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "voice_translation")
-async def voice_translation_handler(callback: CallbackQuery):
+async def voice_translation_handler(callback: CallbackQuery, user_info: dict = None):
     """Show voice options selection"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -415,9 +416,9 @@ async def voice_translation_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "help")
-async def help_handler(callback: CallbackQuery):
+async def help_handler(callback: CallbackQuery, user_info: dict = None):
     """Show help message"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     await callback.message.edit_text(
         get_text('help', user_info.get('interface_language', 'ru')),
@@ -470,14 +471,14 @@ async def show_alternatives_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "show_explanation")
-async def show_explanation_handler(callback: CallbackQuery):
+async def show_explanation_handler(callback: CallbackQuery, user_info: dict = None):
     """Show translation explanation"""
     user_id = callback.from_user.id
     metadata = last_translation_metadata.get(user_id, {})
 
     # Get user's interface language
     from bot.database import db
-    user_info = await db.get_user(user_id)
+    user_info = user_info or await db.get_user(user_id)
     interface_lang = user_info.get('interface_language', 'ru') if user_info else 'ru'
 
     explanation = metadata.get('explanation', '') or ''
@@ -504,14 +505,14 @@ async def show_explanation_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "show_grammar")
-async def show_grammar_handler(callback: CallbackQuery):
+async def show_grammar_handler(callback: CallbackQuery, user_info: dict = None):
     """Show grammar explanation"""
     user_id = callback.from_user.id
     metadata = last_translation_metadata.get(user_id, {})
 
     # Get user's interface language
     from bot.database import db
-    user_info = await db.get_user(user_id)
+    user_info = user_info or await db.get_user(user_id)
     interface_lang = user_info.get('interface_language', 'ru') if user_info else 'ru'
 
     grammar = metadata.get('grammar', '') or ''
@@ -552,20 +553,30 @@ async def generate_voice_for_text(callback: CallbackQuery, text: str, voice_type
     await callback.bot.send_chat_action(chat_id=callback.message.chat.id, action='record_voice')
 
     try:
+        target_lang = user_info.get('target_language', 'en')
+        speed = user_info.get('voice_speed', 1.0)
+        voice_type = user_info.get('voice_type', 'alloy')
+
+        # Use speculatively generated audio if the prefetcher already made it
+        prefetched = await voice_prefetcher.take(callback.from_user.id, text, target_lang, speed, voice_type)
+
         async with VoiceService() as voice_service:
-            target_lang = user_info.get('target_language', 'en')
-            audio_data = await voice_service.generate_speech(
-                text=text.strip(),
-                language=target_lang,
-                premium=True,
-                speed=user_info.get('voice_speed', 1.0),
-                voice_type=user_info.get('voice_type', 'alloy')
-            )
+            if prefetched:
+                payload, voice_request = prefetched
+            else:
+                # Cached file_id or audio is reused, synthesis happens only on a miss
+                payload, voice_request = await voice_service.get_voice_payload(
+                    text=text.strip(),
+                    language=target_lang,
+                    premium=True,
+                    speed=speed,
+                    voice_type=voice_type
+                )
 
-            if audio_data:
-                from aiogram.types import BufferedInputFile
-                audio_file = BufferedInputFile(audio_data, filename=f"{voice_type_name}.mp3")
-                await callback.message.answer_voice(audio_file)
+            if payload:
+                await voice_service.send_voice_payload(
+                    callback.message, payload, voice_request, filename=voice_type_name
+                )
             else:
                 await callback.answer("❌ Не удалось создать голосовое сообщение", show_alert=True)
 
@@ -574,9 +585,9 @@ async def generate_voice_for_text(callback: CallbackQuery, text: str, voice_type
         await callback.answer("❌ Ошибка при создании голосового сообщения", show_alert=True)
 
 @router.callback_query(F.data == "voice_exact")
-async def voice_exact_handler(callback: CallbackQuery):
+async def voice_exact_handler(callback: CallbackQuery, user_info: dict = None):
     """Generate voice for exact translation"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -589,6 +600,7 @@ async def voice_exact_handler(callback: CallbackQuery):
 
     # Get exact translation from metadata
     user_id = callback.from_user.id
+    voice_prefetcher.record_voice_request(user_id, 'voice_exact')
     metadata = last_translation_metadata.get(user_id, {})
     exact_text = metadata.get('basic_translation', '')
 
@@ -601,9 +613,9 @@ async def voice_exact_handler(callback: CallbackQuery):
     await generate_voice_for_text(callback, exact_text, "точный перевод")
 
 @router.callback_query(F.data == "voice_styled")
-async def voice_styled_handler(callback: CallbackQuery):
+async def voice_styled_handler(callback: CallbackQuery, user_info: dict = None):
     """Generate voice for styled translation"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -616,6 +628,7 @@ async def voice_styled_handler(callback: CallbackQuery):
 
     # Get styled translation from metadata - need to extract from message or use stored data
     user_id = callback.from_user.id
+    voice_prefetcher.record_voice_request(user_id, 'voice_styled')
     metadata = last_translation_metadata.get(user_id, {})
 
     # Try to get enhanced translation, fallback to basic if not available
@@ -632,9 +645,9 @@ async def voice_styled_handler(callback: CallbackQuery):
     await generate_voice_for_text(callback, styled_text, "стилизованный перевод")
 
 @router.callback_query(F.data == "voice_alternatives")
-async def voice_alternatives_handler(callback: CallbackQuery):
+async def voice_alternatives_handler(callback: CallbackQuery, user_info: dict = None):
     """Show alternatives selection for voice generation"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -723,9 +736,9 @@ async def voice_specific_alternative_handler(callback: CallbackQuery):
     await generate_voice_for_text(callback, alternative_text, f"альтернатива #{alt_index + 1}")
 
 @router.callback_query(F.data == "back_to_translation")
-async def back_to_translation_handler(callback: CallbackQuery):
+async def back_to_translation_handler(callback: CallbackQuery, user_info: dict = None):
     """Return to translation actions"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
     interface_lang = user_info.get('interface_language', 'ru')
     is_premium = user_info.get('is_premium', False)
 
@@ -738,9 +751,9 @@ async def back_to_translation_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "voice_any_style")
-async def voice_any_style_handler(callback: CallbackQuery):
+async def voice_any_style_handler(callback: CallbackQuery, user_info: dict = None):
     """Show style selection for voice generation"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -765,9 +778,9 @@ async def voice_any_style_handler(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "translate_any_style")
-async def translate_any_style_handler(callback: CallbackQuery):
+async def translate_any_style_handler(callback: CallbackQuery, user_info: dict = None):
     """Show style selection for re-translation"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
 
     if not user_info.get('is_premium'):
         await callback.message.edit_text(
@@ -899,9 +912,9 @@ async def translate_style_handler(callback: CallbackQuery):
     await translate_with_style(callback, style, for_voice=False)
 
 @router.callback_query(F.data == "back_to_voice_menu")
-async def back_to_voice_menu_handler(callback: CallbackQuery):
+async def back_to_voice_menu_handler(callback: CallbackQuery, user_info: dict = None):
     """Return to voice options menu"""
-    user_info = await db.get_user(callback.from_user.id)
+    user_info = user_info or await db.get_user(callback.from_user.id)
     user_id = callback.from_user.id
     metadata = last_translation_metadata.get(user_id, {})
     has_alternatives = bool(metadata.get('alternatives') and len(metadata.get('alternatives', [])) > 0)
@@ -2,8 +2,7 @@
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
-from datetime import datetime
-from bot.db_adapter import db_adapter
+from bot.utils.premium import check_premium_status
 
 
 class PremiumMiddleware(BaseMiddleware):
@@ -19,18 +18,7 @@ class PremiumMiddleware(BaseMiddleware):
         user_id = event.from_user.id if event.from_user else None
 
         if user_id:
-            # Check active subscription
-            async with db_adapter.get_connection() as conn:
-                subscription = await conn.fetchone("""
-                    SELECT expires_at FROM subscriptions
-                    WHERE user_id = ?
-                      AND status = 'active'
-                      AND expires_at > ?
-                    ORDER BY expires_at DESC LIMIT 1
-                """, user_id, datetime.now())
-
-            # Add premium status to data
-            data['is_premium'] = subscription is not None
-            data['premium_until'] = subscription['expires_at'] if subscription else None
+            # Add premium status to data (memory lookup unless the cache entry expired)
+            data['is_premium'], data['premium_until'] = await check_premium_status(user_id)
 
         return await handler(event, data)
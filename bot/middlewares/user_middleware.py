@@ -1,16 +1,60 @@
 """User middleware for automatic user registration"""
 
-from typing import Callable, Dict, Any, Awaitable
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Awaitable, Optional
 from aiogram import BaseMiddleware
 from aiogram.types import Update, User
 import logging
 
 from bot.database import db
+from config import config
 
 logger = logging.getLogger(__name__)
 
+
+class ProfileFingerprintCache:
+    """LRU of user_id -> hash of the Telegram profile fields last written to the database"""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or config.USER_PROFILE_CACHE_SIZE
+        self.entries: "OrderedDict[int, str]" = OrderedDict()
+
+    @staticmethod
+    def fingerprint(user: User) -> str:
+        raw = '\x1f'.join([user.username or '', user.first_name or '',
+                           user.last_name or '', user.language_code or 'ru'])
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    def is_unchanged(self, user: User) -> bool:
+        """True if this exact profile was already stored"""
+        stored: Optional[str] = self.entries.get(user.id)
+        if stored is None or stored != self.fingerprint(user):
+            return False
+        self.entries.move_to_end(user.id)
+        return True
+
+    def remember(self, user: User):
+        self.entries[user.id] = self.fingerprint(user)
+        self.entries.move_to_end(user.id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def forget(self, user_id: int):
+        self.entries.pop(user_id, None)
+
+
+# Global cache instance
+profile_cache = ProfileFingerprintCache()
+
+
 class UserMiddleware(BaseMiddleware):
-    """Middleware to automatically register users in database"""
+    """Middleware to automatically register users in database
+
+    Loads the request-scoped user context (profile, settings, block flag, premium
+    status, daily counters) with one query and passes it to handlers as data['user_info'].
+    The users row is only written for new users or when the Telegram profile changed.
+    """
 
     async def __call__(
         self,
@@ -22,18 +66,29 @@ class UserMiddleware(BaseMiddleware):
 
         if user:
             try:
-                # Add user to database if not exists
-                await db.add_user(
-                    user_id=user.id,
-                    username=user.username,
-                    first_name=user.first_name,
-                    last_name=user.last_name,
-                    language_code=user.language_code or 'ru'
-                )
+                user_info = None
+                if profile_cache.is_unchanged(user):
+                    # Known profile, read-only load
+                    user_info = await db.load_user_context(user.id)
+                    if user_info is None:
+                        profile_cache.forget(user.id)
+
+                if user_info is None:
+                    # Add or update user and load the context in one round-trip
+                    user_info = await db.get_user_context(
+                        user_id=user.id,
+                        username=user.username,
+                        first_name=user.first_name,
+                        last_name=user.last_name,
+                        language_code=user.language_code or 'ru'
+                    )
+                    if user_info:
+                        profile_cache.remember(user)
+
+                data['user_info'] = user_info
 
                 # Check if user is blocked
-                is_blocked = await db.is_user_blocked(user.id)
-                if is_blocked:
+                if user_info and user_info.get('is_blocked'):
                     # Send blocked message and don't process the update
                     from aiogram.types import Message
                     if isinstance(event, Message):
@@ -0,0 +1,198 @@
+"""Audio worker subsystem: ffmpeg jobs and a process pool off the event loop"""
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Callable, Dict, Any, List
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Raw PCM layout used when audio is decoded for speech recognition
+PCM_SAMPLE_RATE = 16000
+PCM_SAMPLE_WIDTH = 2  # bytes, s16le mono
+
+
+class AudioEngineBusy(Exception):
+    """Raised when the audio job queue is full"""
+
+
+def build_atempo_filter(speed: float) -> str:
+    """Build ffmpeg atempo chain (each stage is limited to 0.5-2.0)"""
+    stages = []
+    while speed > 2.0:
+        stages.append('atempo=2.0')
+        speed /= 2.0
+    while speed < 0.5:
+        stages.append('atempo=0.5')
+        speed /= 0.5
+    stages.append(f'atempo={speed:.4f}')
+    return ','.join(stages)
+
+
+class AudioEngine:
+    """Runs audio CPU work outside the event loop with bounded concurrency
+
+    Decoding, transcoding, tempo changes and speech synthesis are subprocesses
+    (ffmpeg, espeak-ng) fed through stdin/stdout. Python-level CPU work goes to a process pool. At most
+    AUDIO_MAX_JOBS jobs run at once, up to AUDIO_QUEUE_SIZE more may wait, and
+    every job is cancelled after AUDIO_JOB_TIMEOUT seconds.
+    """
+
+    def __init__(self, workers: int = None, max_jobs: int = None,
+                 queue_size: int = None, timeout: float = None):
+        self.workers = workers or config.AUDIO_WORKERS
+        self.max_jobs = max_jobs or config.AUDIO_MAX_JOBS
+        self.queue_size = queue_size if queue_size is not None else config.AUDIO_QUEUE_SIZE
+        self.timeout = timeout or config.AUDIO_JOB_TIMEOUT
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.stats = {'completed': 0, 'failed': 0, 'timeouts': 0, 'rejected': 0}
+
+    def start(self):
+        """Create the worker process pool"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            logger.info(f"Audio engine started with {self.workers} workers")
+
+    def stop(self):
+        """Shut down the worker process pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            logger.info("Audio engine stopped")
+
+    async def _acquire(self):
+        """Take a job slot or raise AudioEngineBusy when the queue is full"""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_jobs)
+
+        if self.semaphore.locked() and self.waiting >= self.queue_size:
+            self.stats['rejected'] += 1
+            raise AudioEngineBusy("Audio queue is full")
+
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+    async def run_in_worker(self, func: Callable, *args, timeout: float = None) -> Any:
+        """Run a picklable function in the process pool"""
+        self.start()
+        await self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, func, *args)
+            result = await asyncio.wait_for(future, timeout or self.timeout)
+            self.stats['completed'] += 1
+            return result
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        finally:
+            self.semaphore.release()
+
+    async def run_ffmpeg(self, audio_data: bytes, input_format: Optional[str],
+                         output_format: str, *args: str, timeout: float = None,
+                         input_args: List[str] = None) -> bytes:
+        """Convert audio through ffmpeg stdin/stdout without temporary files"""
+        command = ['ffmpeg', '-hide_banner', '-loglevel', 'error']
+        if input_format:
+            command += ['-f', input_format]
+        if input_args:
+            command += input_args
+        command += ['-i', 'pipe:0', *args, '-f', output_format, 'pipe:1']
+        return await self.run_process(command, audio_data, timeout)
+
+    async def run_process(self, command: List[str], input_data: bytes,
+                          timeout: float = None) -> bytes:
+        """Run an audio tool as a job: feed stdin, return stdout"""
+        await self._acquire()
+        process = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(audio_data), timeout or self.timeout
+            )
+
+            if process.returncode != 0:
+                raise RuntimeError(f"{command[0]} failed: {stderr.decode(errors='ignore').strip()[:200]}")
+
+            self.stats['completed'] += 1
+            return stdout
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            if process and process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        finally:
+            self.semaphore.release()
+
+    async def decode(self, audio_data: bytes, input_format: str = None,
+                     sample_rate: int = PCM_SAMPLE_RATE) -> bytes:
+        """Decode audio to mono s16le PCM"""
+        return await self.run_ffmpeg(
+            audio_data, input_format, 's16le',
+            '-ac', '1', '-ar', str(sample_rate)
+        )
+
+    async def encode_pcm(self, pcm_data: bytes, sample_rate: int = PCM_SAMPLE_RATE,
+                         output_format: str = 'ogg') -> bytes:
+        """Encode mono s16le PCM, as OGG/Opus by default (compact upload for ASR)"""
+        args = ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip'] if output_format == 'ogg' else []
+        return await self.run_ffmpeg(
+            pcm_data, 's16le', output_format, *args,
+            input_args=['-ar', str(sample_rate), '-ac', '1']
+        )
+
+    async def transcode(self, audio_data: bytes, input_format: Optional[str],
+                        output_format: str, *args: str) -> bytes:
+        """Convert audio between container formats"""
+        return await self.run_ffmpeg(audio_data, input_format, output_format, *args)
+
+    async def change_tempo(self, audio_data: bytes, speed: float,
+                           input_format: str = 'mp3', output_format: str = 'mp3') -> bytes:
+        """Speed audio up or down without changing pitch"""
+        if speed == 1.0 or speed <= 0:
+            return audio_data
+        return await self.run_ffmpeg(
+            audio_data, input_format, output_format, '-filter:a', build_atempo_filter(speed)
+        )
+
+    async def to_voice_note(self, audio_data: bytes, input_format: str = 'mp3',
+                            speed: float = 1.0) -> bytes:
+        """Encode audio as mono OGG/Opus for Telegram voice messages, changing tempo in the same pass"""
+        args = ['-vn', '-ac', '1', '-c:a', 'libopus', '-b:a', config.VOICE_OPUS_BITRATE,
+                '-application', 'voip']
+        if speed != 1.0 and speed > 0:
+            args += ['-filter:a', build_atempo_filter(speed)]
+        return await self.run_ffmpeg(audio_data, input_format, 'ogg', *args)
+
+    async def probe_duration(self, audio_data: bytes, input_format: str = None) -> float:
+        """Measure duration in seconds by decoding to low-rate PCM"""
+        sample_rate = 8000
+        pcm_data = await self.decode(audio_data, input_format, sample_rate)
+        return len(pcm_data) / (sample_rate * PCM_SAMPLE_WIDTH)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Engine counters for monitoring"""
+        return {**self.stats, 'waiting': self.waiting, 'workers': self.workers}
+
+
+# Global engine instance
+audio_engine = AudioEngine()
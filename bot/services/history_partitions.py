@@ -0,0 +1,327 @@
+"""Monthly partitions of translation_history: creation ahead of time and archiving"""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from bot.db_adapter import db_adapter
+from config import config
+
+logger = logging.getLogger(__name__)
+
+PARENT = 'translation_history'
+DEFAULT_PARTITION = 'translation_history_default'
+ARCHIVE = 'translation_history_archive'
+
+BOUND_RE = re.compile(r"FROM \((MINVALUE|'[^']+')\) TO \((MAXVALUE|'[^']+')\)")
+# Prefix of the partitioned indexes, partition indexes are named {partition}_{rest}_idx
+INDEX_PREFIX = f'idx_{PARENT}_'
+# Tables that were partitions of translation_history (left detached if archiving was interrupted)
+PARTITION_NAME_RE = rf'^{PARENT}_(legacy|y[0-9]{{4}}m[0-9]{{2}})$'
+
+
+def month_start(day: date, months: int = 0) -> date:
+    """First day of the month `months` away from the month of `day`"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+
+def _parse_bound(value: str) -> Optional[date]:
+    if value in ('MINVALUE', 'MAXVALUE'):
+        return None
+    return datetime.fromisoformat(value.strip("'")).date()
+
+
+class HistoryPartitionManager:
+    """Keeps translation_history (partitioned by migration 018) in shape
+
+    Every HISTORY_PARTITION_INTERVAL seconds it creates the partitions of the
+    current and next HISTORY_PARTITIONS_AHEAD months, moving rows that landed
+    in the default partition. The default partition is kept so inserts never
+    fail when maintenance falls behind. Partitions older than
+    HISTORY_HOT_MONTHS are detached under a short lock_timeout, folded into
+    translation_history_archive (one JSONB row per user and month) and
+    dropped. Archive rows older than HISTORY_ARCHIVE_MONTHS are
+    deleted (0 keeps them forever). It also backfills search_vector of rows
+    written before migration 019 and builds partition indexes that parent
+    indexes created ON ONLY translation_history are still missing.
+    """
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.search_backfilled = False
+        self.stats = {'runs': 0, 'created': 0, 'archived': 0, 'archived_rows': 0, 'purged': 0, 'failed': 0}
+
+    def start(self):
+        """Start the maintenance loop"""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+            logger.info(f"History partition manager started: every {config.HISTORY_PARTITION_INTERVAL}s, "
+                        f"{config.HISTORY_HOT_MONTHS} hot months")
+
+    async def stop(self):
+        """Stop the maintenance loop"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            await self.maintain()
+            await asyncio.sleep(config.HISTORY_PARTITION_INTERVAL)
+
+    async def maintain(self):
+        """Create upcoming partitions, archive old ones and purge the archive"""
+        try:
+            if not await self.is_partitioned():
+                logger.info("translation_history is not partitioned (migration 018), skipping maintenance")
+                return
+            await self.ensure_partitions()
+            await self.backfill_search_vectors()
+            await self.ensure_partition_indexes()
+            await self.archive_old()
+            await self.purge_archive()
+            self.stats['runs'] += 1
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"History partition maintenance error: {e}")
+
+    async def is_partitioned(self) -> bool:
+        async with db_adapter.get_connection() as conn:
+            row = await conn.fetchone(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(?)", PARENT
+            )
+        return bool(row) and row['relkind'] == 'p'
+
+    async def get_partitions(self) -> List[Tuple[str, Optional[date], Optional[date], bool]]:
+        """(name, lower, upper, detach pending) of range partitions, None for MINVALUE/MAXVALUE"""
+        async with db_adapter.get_connection() as conn:
+            rows = await conn.fetchall('''
+                SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound, i.inhdetachpending
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(?)
+            ''', PARENT)
+
+        partitions = []
+        for row in rows:
+            match = BOUND_RE.search(row['bound'])
+            if match:
+                partitions.append((row['relname'], _parse_bound(match.group(1)), _parse_bound(match.group(2)),
+                                   row['inhdetachpending']))
+        return sorted(partitions, key=lambda p: p[1] or date.min)
+
+    async def get_detached(self) -> List[str]:
+        """Former partitions that were detached but not archived yet"""
+        async with db_adapter.get_connection() as conn:
+            rows = await conn.fetchall('''
+                SELECT c.relname
+                FROM pg_class c
+                WHERE c.relkind = 'r' AND c.relnamespace = 'public'::regnamespace AND c.relname ~ ?
+                  AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+            ''', PARTITION_NAME_RE)
+        return [row['relname'] for row in rows]
+
+    async def ensure_partitions(self):
+        """Create partitions for the current month and HISTORY_PARTITIONS_AHEAD months after it"""
+        partitions = await self.get_partitions()
+        this_month = month_start(datetime.now().date())
+
+        for offset in range(config.HISTORY_PARTITIONS_AHEAD + 1):
+            lower, upper = month_start(this_month, offset), month_start(this_month, offset + 1)
+            covered = any(
+                (start is None or start < upper) and (end is None or end > lower)
+                for _, start, end, _ in partitions
+            )
+            if not covered:
+                await self.create_partition(lower, upper)
+
+    async def has_default_partition(self, conn) -> bool:
+        row = await conn.fetchone('SELECT to_regclass(?) IS NOT NULL AS present', DEFAULT_PARTITION)
+        return row['present']
+
+    async def create_partition(self, lower: date, upper: date):
+        """Create and attach one month, taking over its rows from the default partition"""
+        name = partition_name(lower)
+        async with db_adapter.get_connection() as conn:
+            async with conn.transaction():
+                await conn.execute("SET LOCAL lock_timeout = '5s'")
+                await conn.execute('SET LOCAL statement_timeout = 0')
+                await conn.execute(f'CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)')
+                start, end = datetime(lower.year, lower.month, 1), datetime(upper.year, upper.month, 1)
+                if await self.has_default_partition(conn):
+                    await conn.execute(f'''
+                        INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION}
+                        WHERE created_at >= ? AND created_at < ?
+                    ''', start, end, timeout=config.DB_MAINTENANCE_TIMEOUT)
+                    await conn.execute(f'''
+                        DELETE FROM {DEFAULT_PARTITION}
+                        WHERE created_at >= ? AND created_at < ?
+                    ''', start, end, timeout=config.DB_MAINTENANCE_TIMEOUT)
+                await conn.execute(
+                    f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+        self.stats['created'] += 1
+        logger.info(f"Created history partition {name}")
+
+    async def backfill_search_vectors(self):
+        """Fill search_vector of rows written before migration 019, one id range per statement"""
+        if self.search_backfilled:
+            return
+
+        async with db_adapter.get_connection() as conn:
+            column = await conn.fetchone('''
+                SELECT 1 FROM pg_attribute
+                WHERE attrelid = to_regclass(?) AND attname = 'search_vector' AND NOT attisdropped
+            ''', PARENT)
+            if not column:
+                return
+
+            # Session setting, reset when the connection returns to the pool
+            await conn.execute('SET statement_timeout = 0')
+            bounds = await conn.fetchone(
+                f'SELECT MIN(id) AS low, MAX(id) AS high FROM {PARENT} WHERE search_vector IS NULL',
+                timeout=config.DB_MAINTENANCE_TIMEOUT
+            )
+            low, high = bounds['low'], bounds['high']
+            updated = 0
+            # Autocommit: every batch commits on its own and holds its row locks briefly
+            while low is not None and low <= high:
+                status = await conn.execute(f'''
+                    UPDATE {PARENT}
+                    SET search_vector = to_tsvector('pg_catalog.simple',
+                                                    COALESCE(source_text, '') || ' ' || COALESCE(basic_translation, ''))
+                    WHERE id >= ? AND id < ? AND search_vector IS NULL
+                ''', low, low + config.HISTORY_BACKFILL_BATCH, timeout=config.DB_MAINTENANCE_TIMEOUT)
+                updated += int(status.split()[-1])
+                low += config.HISTORY_BACKFILL_BATCH
+
+        self.search_backfilled = True
+        if updated:
+            logger.info(f"Backfilled search_vector of {updated} history rows")
+
+    async def ensure_partition_indexes(self):
+        """Build and attach partition indexes missing under invalid parent indexes
+
+        Indexes created ON ONLY translation_history stay invalid until every
+        partition has an attached index, partitions attached later get theirs
+        from ATTACH PARTITION.
+        """
+        async with db_adapter.get_connection() as conn:
+            missing = await conn.fetchall('''
+                SELECT pi.relname AS parent_index, c.relname AS partition, pg_get_indexdef(pi.oid) AS definition
+                FROM pg_index x
+                JOIN pg_class pi ON pi.oid = x.indexrelid
+                JOIN pg_inherits i ON i.inhparent = x.indrelid
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE x.indrelid = to_regclass(?) AND NOT x.indisvalid
+                  AND NOT EXISTS (
+                      SELECT 1 FROM pg_inherits ii
+                      JOIN pg_index cx ON cx.indexrelid = ii.inhrelid
+                      WHERE ii.inhparent = pi.oid AND cx.indrelid = c.oid
+                  )
+            ''', PARENT)
+            if not missing:
+                return
+
+            await conn.execute('SET statement_timeout = 0')
+            for row in missing:
+                parent_index, partition = row['parent_index'], row['partition']
+                index = f"{partition}_{parent_index.removeprefix(INDEX_PREFIX)}_idx"
+
+                # A failed CONCURRENTLY build leaves an invalid index behind
+                existing = await conn.fetchone(
+                    'SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(?)', index
+                )
+                if existing and not existing['indisvalid']:
+                    await conn.execute(f'DROP INDEX CONCURRENTLY {index}', timeout=config.DB_MAINTENANCE_TIMEOUT)
+                if not existing or not existing['indisvalid']:
+                    definition = re.sub(r'^CREATE (UNIQUE )?INDEX \S+ ON ONLY \S+',
+                                        rf'CREATE \1INDEX CONCURRENTLY {index} ON {partition}',
+                                        row['definition'])
+                    await conn.execute(definition, timeout=config.DB_MAINTENANCE_TIMEOUT)
+                await conn.execute(f'ALTER INDEX {parent_index} ATTACH PARTITION {index}')
+                logger.info(f"Built {index} for {parent_index}")
+
+    async def archive_old(self):
+        """Move partitions older than HISTORY_HOT_MONTHS into the archive table"""
+        # Finish archiving interrupted after the detach
+        for name in await self.get_detached():
+            await self.archive_detached(name)
+
+        cutoff = month_start(datetime.now().date(), -config.HISTORY_HOT_MONTHS)
+        for name, _, upper, pending in await self.get_partitions():
+            if upper is not None and upper <= cutoff:
+                await self.archive_partition(name, pending)
+
+    async def archive_partition(self, name: str, detach_pending: bool = False):
+        """Detach a partition, fold its rows into the archive and drop it"""
+        async with db_adapter.get_connection() as conn:
+            # Session setting, reset when the connection returns to the pool
+            await conn.execute('SET statement_timeout = 0')
+            if detach_pending:
+                # A concurrent detach was interrupted between its two transactions
+                await conn.execute(f'ALTER TABLE {PARENT} DETACH PARTITION {name} FINALIZE',
+                                   timeout=config.DB_MAINTENANCE_TIMEOUT)
+            elif not await self.has_default_partition(conn):
+                # Only without a default partition: own transactions, waits for running
+                # queries instead of blocking new ones (autocommit)
+                await conn.execute(f'ALTER TABLE {PARENT} DETACH PARTITION {name} CONCURRENTLY',
+                                   timeout=config.DB_MAINTENANCE_TIMEOUT)
+            else:
+                # Metadata-only with the default partition in place, keep the lock wait short
+                async with conn.transaction():
+                    await conn.execute("SET LOCAL lock_timeout = '5s'")
+                    await conn.execute(f'ALTER TABLE {PARENT} DETACH PARTITION {name}')
+
+        await self.archive_detached(name)
+
+    async def archive_detached(self, name: str):
+        """Fold a detached partition into the archive and drop it, in one transaction"""
+        async with db_adapter.get_connection() as conn:
+            async with conn.transaction():
+                await conn.execute('SET LOCAL statement_timeout = 0')
+                status = await conn.execute(f'''
+                    INSERT INTO {ARCHIVE} (month, user_id, item_count, items)
+                    SELECT date_trunc('month', created_at)::DATE, COALESCE(user_id, 0), COUNT(*),
+                           jsonb_agg(to_jsonb(p) - 'user_id' - 'search_vector' ORDER BY created_at, id)
+                    FROM {name} p
+                    GROUP BY 1, 2
+                    ON CONFLICT (month, user_id) DO UPDATE SET
+                        item_count = {ARCHIVE}.item_count + EXCLUDED.item_count,
+                        items = {ARCHIVE}.items || EXCLUDED.items,
+                        archived_at = CURRENT_TIMESTAMP
+                ''', timeout=config.DB_MAINTENANCE_TIMEOUT)
+                row = await conn.fetchone(f'SELECT COUNT(*) FROM {name}', timeout=config.DB_MAINTENANCE_TIMEOUT)
+                await conn.execute(f'DROP TABLE {name}')
+
+        self.stats['archived'] += 1
+        self.stats['archived_rows'] += row[0]
+        logger.info(f"Archived history partition {name}: {row[0]} items in {status.split()[-1]} user-months")
+
+    async def purge_archive(self):
+        """Delete archived months older than HISTORY_ARCHIVE_MONTHS"""
+        if config.HISTORY_ARCHIVE_MONTHS <= 0:
+            return
+        cutoff = month_start(datetime.now().date(), -config.HISTORY_ARCHIVE_MONTHS)
+        async with db_adapter.get_connection() as conn:
+            status = await conn.execute(f'DELETE FROM {ARCHIVE} WHERE month < ?', cutoff)
+        deleted = int(status.split()[-1])
+        self.stats['purged'] += deleted
+        if deleted:
+            logger.info(f"Purged {deleted} archived history rows before {cutoff}")
+
+
+# Global partition manager instance
+history_partitions = HistoryPartitionManager()
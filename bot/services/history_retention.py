@@ -0,0 +1,134 @@
+"""Out-of-band enforcement of MAX_HISTORY_ITEMS for translation history"""
+
+import asyncio
+import logging
+from typing import Iterable, Optional, Set
+
+from bot.db_adapter import db_adapter
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryRetention:
+    """Background trimmer for translation_history
+
+    Inserts only mark the user; every HISTORY_TRIM_INTERVAL seconds the marked
+    users are trimmed in one DELETE. A full sweep over all users runs every
+    HISTORY_SWEEP_INTERVAL seconds to catch rows written by other processes.
+    Users may briefly hold a few more than MAX_HISTORY_ITEMS rows in between.
+    """
+
+    def __init__(self):
+        self.pending: Set[int] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {'runs': 0, 'deleted': 0, 'failed': 0}
+
+    def mark(self, user_id: int):
+        """Schedule user history for trimming on the next run"""
+        self.pending.add(user_id)
+
+    def start(self):
+        """Start the background trimming loop"""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+            logger.info(f"History retention started: every {config.HISTORY_TRIM_INTERVAL}s, "
+                        f"keeping {config.MAX_HISTORY_ITEMS} items per user")
+
+    async def stop(self):
+        """Stop the loop and trim users marked since the last run"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.trim_pending()
+
+    async def _run(self):
+        elapsed = 0
+        # Sweep once at startup, then every HISTORY_SWEEP_INTERVAL
+        await self.sweep()
+        while True:
+            await asyncio.sleep(config.HISTORY_TRIM_INTERVAL)
+            elapsed += config.HISTORY_TRIM_INTERVAL
+            if elapsed >= config.HISTORY_SWEEP_INTERVAL:
+                elapsed = 0
+                # The sweep covers the marked users, unless it fails
+                marked, self.pending = self.pending, set()
+                if await self.sweep() is None:
+                    self.pending |= marked
+            else:
+                await self.trim_pending()
+
+    async def trim_pending(self) -> int:
+        """Trim history of users marked since the last run (kept marked when the delete fails)"""
+        if not self.pending:
+            return 0
+        user_ids, self.pending = list(self.pending), set()
+        deleted = await self.trim(user_ids)
+        if deleted is None:
+            self.pending.update(user_ids)
+            return 0
+        return deleted
+
+    async def trim(self, user_ids: Iterable[int]) -> Optional[int]:
+        """Delete everything beyond the newest MAX_HISTORY_ITEMS rows of the given users
+
+        Returns the number of deleted rows, None when the delete failed.
+        """
+        return await self._delete('''
+            DELETE FROM translation_history th
+            USING (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id ORDER BY created_at DESC, id DESC
+                    ) AS rn
+                    FROM translation_history
+                    WHERE user_id = ANY(?::BIGINT[])
+                ) ranked
+                WHERE rn > ?
+            ) old
+            WHERE th.id = old.id
+        ''', list(user_ids), config.MAX_HISTORY_ITEMS)
+
+    async def sweep(self) -> Optional[int]:
+        """Trim every user that is over the limit (None when the delete failed)"""
+        return await self._delete('''
+            DELETE FROM translation_history th
+            USING (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id ORDER BY created_at DESC, id DESC
+                    ) AS rn
+                    FROM translation_history
+                    WHERE user_id IN (
+                        SELECT user_id FROM translation_history
+                        GROUP BY user_id HAVING COUNT(*) > ?
+                    )
+                ) ranked
+                WHERE rn > ?
+            ) old
+            WHERE th.id = old.id
+        ''', config.MAX_HISTORY_ITEMS, config.MAX_HISTORY_ITEMS)
+
+    async def _delete(self, query: str, *args) -> Optional[int]:
+        try:
+            async with db_adapter.get_connection() as conn:
+                status = await conn.execute(query, *args)
+            deleted = int(status.split()[-1])
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"History retention error: {e}")
+            return None
+
+        self.stats['runs'] += 1
+        self.stats['deleted'] += deleted
+        if deleted:
+            logger.info(f"History retention: deleted {deleted} old items")
+        return deleted
+
+
+# Global trimmer instance
+history_retention = HistoryRetention()
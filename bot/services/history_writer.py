@@ -0,0 +1,175 @@
+"""Write-behind queue for translation history"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bot.database import db
+from bot.db_adapter import CONNECTION_LOST_ERRORS
+from bot.services.stats_rollup import stats_rollup
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop(): the writer flushes its current batch and exits
+_STOP = object()
+
+# Failures worth retrying the same batch for (database unreachable, pool exhausted)
+RETRY_ERRORS = CONNECTION_LOST_ERRORS + (asyncio.TimeoutError,)
+RETRY_DELAY = 1.0  # seconds before the first retry, doubled after each
+
+
+class HistoryWriter:
+    """Batches translation writes off the reply path
+
+    Handlers call enqueue() after answering the user. A background task
+    writes the queued translations with one executemany, as soon as
+    HISTORY_BATCH_SIZE records are queued or HISTORY_FLUSH_INTERVAL seconds
+    after the first one. Daily counters are not written here, they are
+    consumed up front by consume_translation_credit(). When the queue is
+    full (HISTORY_QUEUE_SIZE) new records are dropped and counted.
+
+    A batch is retried with backoff while the database is unreachable and
+    split in halves when a row is rejected, so only the rejected rows are
+    dropped (counted as failed).
+    """
+
+    def __init__(self):
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {
+            'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'retries': 0,
+            'batches': 0, 'last_flush_ms': 0, 'max_flush_ms': 0, 'total_flush_ms': 0
+        }
+
+    def start(self):
+        """Start the background writer"""
+        if self.task is None:
+            self.queue = asyncio.Queue(maxsize=config.HISTORY_QUEUE_SIZE)
+            self.task = asyncio.create_task(self._run())
+            logger.info(f"History writer started: batches of {config.HISTORY_BATCH_SIZE}, "
+                        f"every {config.HISTORY_FLUSH_INTERVAL}s")
+
+    async def stop(self):
+        """Stop the writer and flush everything still queued"""
+        if self.task is not None:
+            if not self.task.done():
+                await self.queue.put(_STOP)
+            try:
+                await self.task
+            except Exception as e:
+                logger.error(f"History writer stopped with error: {e}")
+            self.task = None
+
+        while self.queue is not None and not self.queue.empty():
+            await self._write(self._take(config.HISTORY_BATCH_SIZE))
+
+    async def enqueue(self, **record):
+        """Queue a translation (add_translation_history keyword arguments)
+
+        Written directly when the writer is not running (e.g. scripts).
+        The statistics rollups count it right away, under the time it was
+        made, even if the history write is late or dropped.
+        """
+        record.setdefault('created_at', datetime.now())
+        stats_rollup.record_translation(record['user_id'], record.get('source_language'),
+                                        record.get('target_language'), record.get('is_voice', False),
+                                        record.get('processing_time_ms'), record.get('status', 'success'),
+                                        record['created_at'])
+
+        if self.task is None:
+            await db.add_translation_history(**record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            self.stats['enqueued'] += 1
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            logger.warning(f"History writer queue full, dropped translation of user {record['user_id']}")
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [await self.queue.get()]
+            deadline = time.monotonic() + config.HISTORY_FLUSH_INTERVAL
+
+            # Collect until the batch is full or the oldest record waited long enough
+            while len(batch) < config.HISTORY_BATCH_SIZE and _STOP not in batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                batch.extend(self._take(config.HISTORY_BATCH_SIZE - len(batch)))
+
+            # Records after the marker are left in the queue for stop() to drain
+            if _STOP in batch:
+                batch.remove(_STOP)
+                stopping = True
+            await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+
+        start = time.monotonic()
+        await self._write_batch(batch)
+
+        flush_ms = int((time.monotonic() - start) * 1000)
+        self.stats['batches'] += 1
+        self.stats['last_flush_ms'] = flush_ms
+        self.stats['total_flush_ms'] += flush_ms
+        self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], flush_ms)
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        delay = RETRY_DELAY
+        for attempt in range(config.HISTORY_WRITE_RETRIES + 1):
+            try:
+                await db.add_translation_history_batch(batch)
+                self.stats['written'] += len(batch)
+                return
+            except RETRY_ERRORS as e:
+                if attempt == config.HISTORY_WRITE_RETRIES:
+                    self.stats['failed'] += len(batch)
+                    logger.error(f"History writer flush error ({len(batch)} records), "
+                                 f"gave up after {attempt} retries: {e}")
+                    return
+                self.stats['retries'] += 1
+                logger.warning(f"History writer flush error ({len(batch)} records), retrying in {delay:g}s: {e}")
+                await asyncio.sleep(delay)
+                delay *= 2
+            except Exception as e:
+                # One rejected row fails the whole executemany: write the halves separately
+                if len(batch) > 1:
+                    middle = len(batch) // 2
+                    await self._write_batch(batch[:middle])
+                    await self._write_batch(batch[middle:])
+                    return
+                self.stats['failed'] += 1
+                logger.error(f"History writer dropped translation of user {batch[0]['user_id']}: {e}")
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, flush latency and drop counters for monitoring"""
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'avg_flush_ms': self.stats['total_flush_ms'] // batches if batches else 0,
+            'running': self.task is not None
+        }
+
+
+# Global writer instance
+history_writer = HistoryWriter()
@@ -0,0 +1,126 @@
+"""Offline CPU speech recognition with faster-whisper (CTranslate2) in worker processes"""
+
+import asyncio
+import importlib.util
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, Dict
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Model instance of the current worker process, loaded once by the pool initializer
+_model = None
+
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int):
+    """Load the model when the worker process starts so requests find it warm"""
+    global _model
+    from faster_whisper import WhisperModel
+
+    _model = WhisperModel(model_size, device='cpu', compute_type=compute_type,
+                          cpu_threads=cpu_threads)
+
+
+def _warm_up() -> bool:
+    """No-op job that forces the pool to spawn its workers"""
+    return _model is not None
+
+
+def _transcribe(pcm_data: bytes, sample_rate: int,
+                language: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Transcribe mono s16le PCM, returns (text, detected language code)"""
+    import numpy as np
+
+    if sample_rate != 16000:
+        raise ValueError("faster-whisper expects 16 kHz audio")
+    audio = np.frombuffer(pcm_data, dtype=np.int16).astype(np.float32) / 32768.0
+
+    segments, info = _model.transcribe(audio, language=language, beam_size=1)
+    text = ' '.join(segment.text.strip() for segment in segments)
+    return text.strip(), info.language
+
+
+class LocalASR:
+    """Pool of worker processes, each holding a quantized Whisper model
+
+    Enabled only when faster-whisper is installed. Concurrency is bounded by
+    LOCAL_ASR_WORKERS (extra requests queue in the pool) and every request is
+    limited by LOCAL_ASR_TIMEOUT seconds.
+    """
+
+    def __init__(self):
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.warm_up_task: Optional[asyncio.Task] = None
+        self.stats = {'completed': 0, 'failed': 0, 'timeouts': 0}
+
+    @property
+    def available(self) -> bool:
+        return importlib.util.find_spec('faster_whisper') is not None
+
+    async def start(self):
+        """Create the worker pool and load models in the background"""
+        if self.executor is not None:
+            return
+        if not self.available:
+            logger.warning("Local ASR selected but faster-whisper is not installed, "
+                           "voice messages fall back to Whisper API / Google")
+            return
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=config.LOCAL_ASR_WORKERS,
+            initializer=_init_worker,
+            initargs=(config.LOCAL_ASR_MODEL, config.LOCAL_ASR_COMPUTE_TYPE, config.LOCAL_ASR_THREADS)
+        )
+        loop = asyncio.get_running_loop()
+        warm_ups = [loop.run_in_executor(self.executor, _warm_up) for _ in range(config.LOCAL_ASR_WORKERS)]
+        self.warm_up_task = asyncio.create_task(self._log_warm_up(warm_ups))
+        logger.info(f"Local ASR started: faster-whisper {config.LOCAL_ASR_MODEL} "
+                    f"({config.LOCAL_ASR_COMPUTE_TYPE}), {config.LOCAL_ASR_WORKERS} workers")
+
+    @staticmethod
+    async def _log_warm_up(warm_ups):
+        """Report worker model loading without blocking startup"""
+        results = await asyncio.gather(*warm_ups, return_exceptions=True)
+        failed = [r for r in results if isinstance(r, BaseException)]
+        if failed:
+            logger.error(f"Local ASR warm-up failed in {len(failed)}/{len(results)} workers: {failed[0]}")
+        else:
+            logger.info(f"Local ASR models loaded in {len(results)} workers")
+
+    def stop(self):
+        """Shut down the worker pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            logger.info("Local ASR stopped")
+
+    async def transcribe(self, pcm_data: bytes, sample_rate: int = 16000,
+                         language: str = None) -> Tuple[Optional[str], Optional[str]]:
+        """Transcribe PCM in a worker, returns (text, language) or (None, None)"""
+        if not self.available:
+            return None, None
+
+        await self.start()
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, _transcribe, pcm_data, sample_rate, language)
+            text, detected = await asyncio.wait_for(future, config.LOCAL_ASR_TIMEOUT)
+            self.stats['completed'] += 1
+            return text, detected
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            logger.error("Local ASR timeout")
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"Local ASR error: {e}")
+        return None, None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Engine counters for monitoring"""
+        return {**self.stats, 'running': int(self.executor is not None)}
+
+
+# Global engine instance
+local_asr = LocalASR()
@@ -0,0 +1,79 @@
+"""Offline text-to-speech with the espeak-ng formant synthesizer"""
+
+import shutil
+import logging
+from typing import Optional
+
+from bot.services.audio_engine import audio_engine
+
+logger = logging.getLogger(__name__)
+
+# espeak-ng voices for SUPPORTED_LANGUAGES
+ESPEAK_VOICES = {
+    'ru': 'ru',
+    'en': 'en-us',
+    'es': 'es',
+    'fr': 'fr-fr',
+    'de': 'de',
+    'it': 'it',
+    'pt': 'pt-br',
+    'ja': 'ja',
+    'zh': 'cmn',
+    'ko': 'ko',
+    'ar': 'ar',
+    'hi': 'hi',
+    'tr': 'tr',
+    'pl': 'pl',
+    'nl': 'nl',
+    'sv': 'sv',
+    'da': 'da',
+    'no': 'nb',
+    'fi': 'fi',
+    'cs': 'cs',
+    'hu': 'hu',
+    'ro': 'ro',
+    'uk': 'uk',
+    'he': 'he',
+    'th': 'th',
+    'vi': 'vi'
+}
+
+BASE_RATE = 175  # espeak-ng default words per minute
+MIN_RATE = 80
+MAX_RATE = 450
+
+
+class LocalTTS:
+    """Speech synthesis without network calls, run as audio engine jobs
+
+    Tempo is set natively through the espeak-ng rate, so no post-processing
+    is needed to change speed.
+    """
+
+    def __init__(self, binary: str = 'espeak-ng'):
+        self.binary = binary
+
+    @property
+    def available(self) -> bool:
+        return shutil.which(self.binary) is not None
+
+    async def synthesize(self, text: str, language: str = 'en',
+                         speed: float = 1.0) -> Optional[bytes]:
+        """Synthesize text to WAV bytes"""
+        if not self.available:
+            return None
+
+        voice = ESPEAK_VOICES.get(language, 'en-us')
+        rate = min(max(int(BASE_RATE * speed), MIN_RATE), MAX_RATE)
+
+        # Text is read from stdin, WAV is written to stdout
+        command = [self.binary, '-v', voice, '-s', str(rate), '-b', '1', '--stdout']
+        try:
+            return await audio_engine.run_process(command, text.encode('utf-8'))
+        except Exception as e:
+            logger.error(f"Local TTS error: {e}")
+            return None
+
+
+# Global engine instance
+local_tts = LocalTTS()
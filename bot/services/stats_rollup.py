@@ -0,0 +1,190 @@
+"""Daily statistics rollups aggregated in memory and flushed periodically"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import date as date_type, datetime
+from typing import Dict, Optional, Set, Tuple
+
+from bot.db_adapter import db_adapter
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Counters of one statistics row / one translation_stats_daily row
+DAILY_COUNTERS = (
+    'total_translations', 'voice_translations', 'error_count',
+    'processing_time_sum_ms', 'processing_time_count',
+    'voice_time_sum_ms', 'voice_time_count',
+)
+PAIR_COUNTERS = ('translations', 'voice_translations', 'error_count',
+                 'processing_time_sum_ms', 'processing_time_count')
+
+
+class StatsRollup:
+    """Incrementally maintained statistics, daily_active_users and translation_stats_daily
+
+    Translations and payments only touch in-memory counters. Every
+    STATS_FLUSH_INTERVAL seconds the counters are added to the rollup tables
+    with additive upserts, so several processes can flush into the same rows.
+    Total and premium user counts are snapshotted into today's row at most
+    every STATS_SNAPSHOT_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self.daily: Dict[date_type, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.pairs: Dict[Tuple[date_type, str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.active_users: Set[Tuple[date_type, int]] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.last_snapshot = float('-inf')  # first run always snapshots (monotonic may start near 0)
+
+    def record_translation(self, user_id: int, source_language: Optional[str], target_language: Optional[str],
+                           is_voice: bool = False, processing_time_ms: int = None, status: str = 'success',
+                           created_at: datetime = None):
+        """Count one translation for the day it was made (today by default)"""
+        today = (created_at or datetime.now()).date()
+        daily = self.daily[today]
+        pair = self.pairs[(today, source_language or 'auto', target_language or 'en')]
+
+        daily['total_translations'] += 1
+        pair['translations'] += 1
+        if is_voice:
+            daily['voice_translations'] += 1
+            pair['voice_translations'] += 1
+        if status != 'success':
+            daily['error_count'] += 1
+            pair['error_count'] += 1
+        if processing_time_ms is not None:
+            daily['processing_time_sum_ms'] += processing_time_ms
+            daily['processing_time_count'] += 1
+            pair['processing_time_sum_ms'] += processing_time_ms
+            pair['processing_time_count'] += 1
+            if is_voice:
+                daily['voice_time_sum_ms'] += processing_time_ms
+                daily['voice_time_count'] += 1
+
+        self.active_users.add((today, user_id))
+
+    def record_payment(self, amount: float):
+        """Add subscription revenue to today"""
+        self.daily[datetime.now().date()]['revenue'] += amount
+
+    def start(self):
+        """Start the periodic flush loop"""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+            logger.info(f"Statistics rollups started: flush every {config.STATS_FLUSH_INTERVAL}s")
+
+    async def stop(self):
+        """Stop the loop and flush pending counters"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(config.STATS_FLUSH_INTERVAL)
+            await self.flush()
+            if time.monotonic() - self.last_snapshot >= config.STATS_SNAPSHOT_INTERVAL:
+                await self.snapshot_users()
+
+    async def flush(self):
+        """Write pending counters to the rollup tables"""
+        if not self.daily and not self.active_users:
+            return
+
+        daily, self.daily = self.daily, defaultdict(lambda: defaultdict(float))
+        pairs, self.pairs = self.pairs, defaultdict(lambda: defaultdict(float))
+        active_users, self.active_users = self.active_users, set()
+
+        try:
+            async with db_adapter.get_connection() as conn:
+                async with conn.transaction():
+                    # Users seen for the first time that day
+                    new_active = defaultdict(int)
+                    if active_users:
+                        rows = await conn.fetchall('''
+                            INSERT INTO daily_active_users (date, user_id)
+                            SELECT * FROM UNNEST(?::DATE[], ?::BIGINT[])
+                            ON CONFLICT DO NOTHING
+                            RETURNING date
+                        ''', [day for day, _ in active_users], [user_id for _, user_id in active_users])
+                        for row in rows:
+                            new_active[row['date']] += 1
+
+                    for day in set(daily) | set(new_active):
+                        counters = daily.get(day, {})
+                        await conn.execute('''
+                            INSERT INTO statistics (
+                                date, active_users, total_translations, voice_translations, error_count,
+                                processing_time_sum_ms, processing_time_count,
+                                voice_time_sum_ms, voice_time_count, revenue
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (date) DO UPDATE SET
+                                active_users = statistics.active_users + EXCLUDED.active_users,
+                                total_translations = statistics.total_translations + EXCLUDED.total_translations,
+                                voice_translations = statistics.voice_translations + EXCLUDED.voice_translations,
+                                error_count = statistics.error_count + EXCLUDED.error_count,
+                                processing_time_sum_ms = statistics.processing_time_sum_ms + EXCLUDED.processing_time_sum_ms,
+                                processing_time_count = statistics.processing_time_count + EXCLUDED.processing_time_count,
+                                voice_time_sum_ms = statistics.voice_time_sum_ms + EXCLUDED.voice_time_sum_ms,
+                                voice_time_count = statistics.voice_time_count + EXCLUDED.voice_time_count,
+                                revenue = statistics.revenue + EXCLUDED.revenue
+                        ''', day, new_active.get(day, 0),
+                             *[int(counters.get(name, 0)) for name in DAILY_COUNTERS],
+                             float(counters.get('revenue', 0)))
+
+                    for (day, source_language, target_language), counters in pairs.items():
+                        await conn.execute('''
+                            INSERT INTO translation_stats_daily (
+                                date, source_language, target_language, translations, voice_translations,
+                                error_count, processing_time_sum_ms, processing_time_count
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (date, source_language, target_language) DO UPDATE SET
+                                translations = translation_stats_daily.translations + EXCLUDED.translations,
+                                voice_translations = translation_stats_daily.voice_translations + EXCLUDED.voice_translations,
+                                error_count = translation_stats_daily.error_count + EXCLUDED.error_count,
+                                processing_time_sum_ms = translation_stats_daily.processing_time_sum_ms + EXCLUDED.processing_time_sum_ms,
+                                processing_time_count = translation_stats_daily.processing_time_count + EXCLUDED.processing_time_count
+                        ''', day, source_language, target_language,
+                             *[int(counters.get(name, 0)) for name in PAIR_COUNTERS])
+        except Exception as e:
+            logger.error(f"Statistics rollup flush error: {e}")
+            self._restore(daily, pairs, active_users)
+
+    def _restore(self, daily, pairs, active_users):
+        """Put counters of a failed flush back so they are retried"""
+        for day, counters in daily.items():
+            for name, value in counters.items():
+                self.daily[day][name] += value
+        for key, counters in pairs.items():
+            for name, value in counters.items():
+                self.pairs[key][name] += value
+        self.active_users |= active_users
+
+    async def snapshot_users(self):
+        """Store current total and premium user counts in today's row"""
+        self.last_snapshot = time.monotonic()
+        now = datetime.now()
+        try:
+            async with db_adapter.get_connection() as conn:
+                await conn.execute('''
+                    INSERT INTO statistics (date, total_users, premium_users)
+                    SELECT ?::DATE, (SELECT COUNT(*) FROM users),
+                           (SELECT COUNT(*) FROM users WHERE premium_until > ?::TIMESTAMP)
+                    ON CONFLICT (date) DO UPDATE SET
+                        total_users = EXCLUDED.total_users,
+                        premium_users = EXCLUDED.premium_users
+                ''', now.date(), now)
+        except Exception as e:
+            logger.error(f"Statistics snapshot error: {e}")
+
+
+# Global rollup instance
+stats_rollup = StatsRollup()
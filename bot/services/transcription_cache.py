@@ -0,0 +1,66 @@
+"""Cache of voice message transcriptions keyed by Telegram file_unique_id"""
+
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionCache:
+    """In-process LRU in front of the voice_transcriptions table
+
+    Telegram keeps file_unique_id stable for the same file, so forwarded voice
+    notes map to one entry and skip download and ASR entirely.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or config.TRANSCRIPTION_CACHE_SIZE
+        self.entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0}
+
+    def _remember(self, key: Tuple[str, str], text: str):
+        self.entries[key] = text
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get(self, file_unique_id: str, asr_model: str) -> Optional[str]:
+        """Get transcription from memory, then from the database"""
+        key = (file_unique_id, asr_model)
+
+        text = self.entries.get(key)
+        if text is not None:
+            self.entries.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return text
+
+        from bot.database import db
+        text = await db.get_cached_transcription(file_unique_id, asr_model)
+        if text is not None:
+            self._remember(key, text)
+            self.stats['db_hits'] += 1
+            return text
+
+        self.stats['misses'] += 1
+        return None
+
+    async def put(self, file_unique_id: str, asr_model: str, text: str):
+        """Store transcription in memory and in the database"""
+        if not text:
+            return
+
+        self._remember((file_unique_id, asr_model), text)
+
+        from bot.database import db
+        await db.save_transcription(file_unique_id, asr_model, text)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cache counters for monitoring"""
+        return {**self.stats, 'entries': len(self.entries)}
+
+
+# Global cache instance
+transcription_cache = TranscriptionCache()
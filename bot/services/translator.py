@@ -1,7 +1,7 @@
 import aiohttp
 import asyncio
 import json
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Callable
 from langdetect import detect, LangDetectException
 import openai
 from config import config
@@ -258,7 +258,7 @@ class TranslatorService:
     async def enhance_with_gpt(self, original_text: str, translated_text: str,
                               target_lang: str, style: str = 'informal',
                               explain_grammar: bool = False, user_id: int = None,
-                              api_key: str = None) -> Dict[str, Any]:
+                              api_key: str = None, interface_lang: str = None) -> Dict[str, Any]:
         """Enhance translation using GPT for natural language and style"""
         style_prompts = {
             'informal': 'casual and friendly, using colloquial expressions, contractions, and everyday language as if talking to a close friend',
@@ -270,10 +270,11 @@ class TranslatorService:
 
         style_description = style_prompts.get(style, style_prompts['informal'])
 
-        # Get user's interface language for explanations
-        from bot.database import db
-        user_info = await db.get_user(user_id) if user_id else {}
-        interface_lang = user_info.get('interface_language', 'ru')
+        # Get user's interface language for explanations (callers with a loaded user context pass it in)
+        if interface_lang is None:
+            from bot.database import db
+            user_info = await db.get_user(user_id) if user_id else {}
+            interface_lang = (user_info or {}).get('interface_language', 'ru')
 
         # Get target language name for prompts
         lang_names = {
@@ -433,8 +434,14 @@ Provide ONLY the enhanced translation in {target_lang_name} with {style} style.
 
     async def translate(self, text: str, target_lang: str, source_lang: str = None,
                        style: str = 'informal', enhance: bool = True, user_id: int = None,
-                       explain_grammar: bool = False) -> Tuple[str, Dict[str, Any]]:
-        """Main translation method with enhancement"""
+                       explain_grammar: bool = False,
+                       on_basic_translation: Callable[[str], None] = None,
+                       interface_lang: str = None) -> Tuple[str, Dict[str, Any]]:
+        """Main translation method with enhancement
+
+        on_basic_translation is called with the basic translation as soon as it is
+        known, before GPT enhancement starts, so callers can overlap work with it.
+        """
         logger.info(f"Translation request: text='{text[:30]}...', target_lang={target_lang}, source_lang={source_lang}")
 
         # Get API configuration from database
@@ -494,9 +501,15 @@ Provide ONLY the enhanced translation in {target_lang_name} with {style} style.
             'original_text': text  # Store original text for re-translation
         }
 
+        if on_basic_translation:
+            try:
+                on_basic_translation(translated)
+            except Exception as e:
+                logger.error(f"Basic translation callback error: {e}")
+
         if enhance and api_config['gpt_enhancement'] and api_config['openai_api_key']:
             logger.info(f"Starting GPT enhancement for text: {text[:50]}... with style: {style}")
-            enhancement = await self.enhance_with_gpt(text, translated, target_lang, style, explain_grammar=explain_grammar, user_id=user_id, api_key=api_config['openai_api_key'])
+            enhancement = await self.enhance_with_gpt(text, translated, target_lang, style, explain_grammar=explain_grammar, user_id=user_id, api_key=api_config['openai_api_key'], interface_lang=interface_lang)
             logger.info(f"GPT enhancement result: {enhancement.get('enhanced_translation', 'No enhancement')[:50]}...")
             if enhancement['enhanced_translation']:
                 translated = enhancement['enhanced_translation']
@@ -0,0 +1,184 @@
+"""Content-addressed cache for synthesized speech"""
+
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict
+
+import aiofiles
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class TTSCache:
+    """Disk cache of TTS audio keyed by (text, language, provider, voice_type, speed, format)
+
+    Audio bytes live in <key>.audio files and are evicted in LRU order once the
+    cache exceeds TTS_CACHE_MAX_BYTES or TTS_CACHE_MAX_ENTRIES. When Telegram has
+    seen the audio, its file_id is kept in <key>.fid so repeat requests can be
+    answered with send_voice(file_id) without synthesis or upload.
+    """
+
+    def __init__(self, cache_dir: Path = None, max_bytes: int = None, max_entries: int = None):
+        self.cache_dir = Path(cache_dir or config.TTS_CACHE_DIR)
+        self.max_bytes = max_bytes or config.TTS_CACHE_MAX_BYTES
+        self.max_entries = max_entries or config.TTS_CACHE_MAX_ENTRIES
+        self.entries: "OrderedDict[str, int]" = OrderedDict()  # key -> audio size, LRU order
+        self.file_ids: Dict[str, str] = {}
+        self.total_bytes = 0
+        self.loaded = False
+        self.stats = {'file_id_hits': 0, 'audio_hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(text: str, language: str, provider: str,
+                 voice_type: str = 'alloy', speed: float = 1.0,
+                 audio_format: str = 'ogg') -> str:
+        """Build content address for a synthesis request"""
+        raw = '\x1f'.join([text.strip(), language or '', provider or '',
+                           voice_type or '', f"{float(speed):.2f}", audio_format or ''])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _audio_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.audio"
+
+    def _file_id_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.fid"
+
+    def _ensure_loaded(self):
+        """Rebuild the in-memory index from disk on first use"""
+        if self.loaded:
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Oldest files first so the LRU order survives restarts approximately
+        audio_files = sorted(self.cache_dir.glob('*.audio'), key=lambda p: p.stat().st_mtime)
+        for path in audio_files:
+            size = path.stat().st_size
+            self.entries[path.stem] = size
+            self.total_bytes += size
+
+        for path in self.cache_dir.glob('*.fid'):
+            try:
+                self.file_ids[path.stem] = path.read_text().strip()
+            except OSError as e:
+                logger.error(f"TTS cache: failed to read {path.name}: {e}")
+
+        self.loaded = True
+        logger.info(f"TTS cache loaded: {len(self.entries)} entries, {self.total_bytes} bytes")
+        self._evict()
+
+    def _remove(self, key: str):
+        """Remove entry audio and file_id from memory and disk"""
+        size = self.entries.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+        self.file_ids.pop(key, None)
+
+        for path in (self._audio_path(key), self._file_id_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"TTS cache: failed to remove {path.name}: {e}")
+
+    def _evict(self):
+        """Evict least recently used entries until size limits are met"""
+        while self.entries and (self.total_bytes > self.max_bytes or len(self.entries) > self.max_entries):
+            key = next(iter(self.entries))
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def get_file_id(self, key: str) -> Optional[str]:
+        """Get Telegram file_id for cached audio"""
+        self._ensure_loaded()
+
+        file_id = self.file_ids.get(key)
+        if file_id:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            self.stats['file_id_hits'] += 1
+        return file_id
+
+    def set_file_id(self, key: str, file_id: str):
+        """Remember Telegram file_id for cached audio"""
+        self._ensure_loaded()
+
+        if not file_id or self.file_ids.get(key) == file_id:
+            return
+
+        self.file_ids[key] = file_id
+        try:
+            self._file_id_path(key).write_text(file_id)
+        except OSError as e:
+            logger.error(f"TTS cache: failed to store file_id: {e}")
+
+    def forget_file_id(self, key: str):
+        """Drop a file_id Telegram no longer accepts"""
+        self.file_ids.pop(key, None)
+        try:
+            self._file_id_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get cached audio bytes"""
+        self._ensure_loaded()
+
+        if key not in self.entries:
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            async with aiofiles.open(self._audio_path(key), 'rb') as f:
+                audio_data = await f.read()
+        except FileNotFoundError:
+            self._remove(key)
+            self.stats['misses'] += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.stats['audio_hits'] += 1
+        return audio_data
+
+    async def put(self, key: str, audio_data: bytes):
+        """Store audio bytes, evicting old entries if needed"""
+        self._ensure_loaded()
+
+        if not audio_data or len(audio_data) > self.max_bytes:
+            return
+
+        path = self._audio_path(key)
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                await f.write(audio_data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"TTS cache: failed to store audio: {e}")
+            return
+
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= previous
+        self.entries[key] = len(audio_data)
+        self.total_bytes += len(audio_data)
+        self._evict()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cache counters for monitoring"""
+        return {
+            **self.stats,
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'file_ids': len(self.file_ids),
+        }
+
+
+# Global cache instance
+tts_cache = TTSCache()
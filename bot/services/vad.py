@@ -0,0 +1,79 @@
+"""Silence detection on raw PCM (runs in audio engine worker processes)"""
+
+from typing import List, Tuple
+
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+SAMPLE_WIDTH = 2  # s16le mono
+
+
+def find_speech_ranges(pcm_data: bytes, sample_rate: int, min_silence_ms: int,
+                       threshold_db: float) -> List[Tuple[int, int]]:
+    """Return [start_ms, end_ms] ranges that contain speech
+
+    threshold_db is relative to the clip loudness, so quiet recordings are not
+    treated as silence as a whole.
+    """
+    audio = AudioSegment(data=pcm_data, sample_width=SAMPLE_WIDTH,
+                         frame_rate=sample_rate, channels=1)
+    if audio.dBFS == float('-inf'):
+        return []
+
+    return detect_nonsilent(
+        audio,
+        min_silence_len=min_silence_ms,
+        silence_thresh=audio.dBFS + threshold_db,
+        seek_step=10
+    )
+
+
+def _speech_chunks(pcm_data: bytes, sample_rate: int, min_silence_ms: int,
+                   threshold_db: float, keep_ms: int) -> List[bytes]:
+    """Cut PCM into speech chunks padded with keep_ms, dropping the silence between them"""
+    ranges = find_speech_ranges(pcm_data, sample_rate, min_silence_ms, threshold_db)
+    if not ranges:
+        return [pcm_data]
+
+    bytes_per_ms = sample_rate * SAMPLE_WIDTH // 1000
+    duration_ms = len(pcm_data) // bytes_per_ms
+
+    chunks = []
+    previous_end = 0
+    for start, end in ranges:
+        start = max(start - keep_ms, previous_end)
+        end = min(end + keep_ms, duration_ms)
+        chunks.append(pcm_data[start * bytes_per_ms:end * bytes_per_ms])
+        previous_end = end
+    return chunks
+
+
+def trim_silence(pcm_data: bytes, sample_rate: int, min_silence_ms: int,
+                 threshold_db: float, keep_ms: int) -> bytes:
+    """Cut leading/trailing silence and shorten pauses longer than min_silence_ms
+
+    keep_ms of padding is left around every speech range so words are not
+    clipped and Whisper still sees sentence breaks.
+    """
+    return b''.join(_speech_chunks(pcm_data, sample_rate, min_silence_ms, threshold_db, keep_ms))
+
+
+def split_segments(pcm_data: bytes, sample_rate: int, min_silence_ms: int,
+                   threshold_db: float, keep_ms: int, segment_ms: int) -> List[bytes]:
+    """Trim silence and group speech into segments of about segment_ms
+
+    Segments are only cut at pauses, so a single uninterrupted phrase longer
+    than segment_ms stays in one piece.
+    """
+    bytes_per_segment = sample_rate * SAMPLE_WIDTH * segment_ms // 1000
+
+    segments = []
+    current = b''
+    for chunk in _speech_chunks(pcm_data, sample_rate, min_silence_ms, threshold_db, keep_ms):
+        if current and len(current) + len(chunk) > bytes_per_segment:
+            segments.append(current)
+            current = b''
+        current += chunk
+    if current:
+        segments.append(current)
+    return segments
@@ -1,23 +1,60 @@
-import os
 import io
 import asyncio
-import tempfile
-from typing import Optional, Tuple
-from pathlib import Path
-import aiofiles
+from typing import Optional, Tuple, Union, List, NamedTuple
 import aiohttp
-from pydub import AudioSegment
 from gtts import gTTS
 import openai
 from config import config
+from bot.services.tts_cache import tts_cache
+from bot.services.transcription_cache import transcription_cache
+from bot.services.audio_engine import audio_engine, PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
+from bot.services import vad
+from bot.services.local_asr import local_asr
+from bot.services.local_tts import local_tts
+from bot.utils.audio_probe import probe_duration
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Container of synthesized speech, Telegram voice notes are OGG/Opus
+VOICE_FORMAT = 'ogg'
+
+# Whisper verbose_json reports language names, the API expects ISO-639-1 codes
+WHISPER_LANGUAGE_CODES = {
+    'russian': 'ru', 'english': 'en', 'spanish': 'es', 'french': 'fr', 'german': 'de',
+    'italian': 'it', 'portuguese': 'pt', 'japanese': 'ja', 'chinese': 'zh', 'korean': 'ko',
+    'arabic': 'ar', 'hindi': 'hi', 'turkish': 'tr', 'polish': 'pl', 'dutch': 'nl',
+    'swedish': 'sv', 'danish': 'da', 'norwegian': 'no', 'finnish': 'fi', 'czech': 'cs',
+    'hungarian': 'hu', 'romanian': 'ro', 'ukrainian': 'uk', 'hebrew': 'he', 'thai': 'th',
+    'vietnamese': 'vi'
+}
+
+
+class VoiceRequest(NamedTuple):
+    """Synthesis parameters and the cache key of the audio that was produced"""
+    text: str
+    language: str
+    premium: bool
+    speed: float
+    voice_type: str
+    key: str  # keyed by the provider that actually synthesized the audio
+
+
+# Shared limit of concurrent Whisper requests across all voice messages
+_whisper_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_whisper_semaphore() -> asyncio.Semaphore:
+    global _whisper_semaphore
+    if _whisper_semaphore is None:
+        _whisper_semaphore = asyncio.Semaphore(config.WHISPER_CONCURRENCY)
+    return _whisper_semaphore
+
 class VoiceService:
     def __init__(self):
         self.openai_client = openai.AsyncOpenAI(api_key=config.OPENAI_API_KEY) if config.OPENAI_API_KEY else None
         self.session = None
+        self.asr_model = None  # Engine that produced the last transcription
 
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -34,6 +71,7 @@ class VoiceService:
 
             # Get settings from database with fallback to config
             asr_enabled = await db.get_setting('asr_enabled', True)
+            asr_provider = await db.get_setting('asr_api_provider', config.ASR_API_PROVIDER)
             tts_provider = await db.get_setting('tts_provider', 'openai')
 
             openai_api_key = await db.get_setting('openai_api_key', config.OPENAI_API_KEY or '')
@@ -41,6 +79,7 @@ class VoiceService:
 
             return {
                 'asr_enabled': asr_enabled,
+                'asr_provider': asr_provider,
                 'tts_provider': tts_provider,
                 'openai_api_key': openai_api_key.strip() if openai_api_key else '',
                 'elevenlabs_api_key': elevenlabs_api_key.strip() if elevenlabs_api_key else '',
@@ -50,71 +89,145 @@ class VoiceService:
             # Fallback to config values
             return {
                 'asr_enabled': True,
+                'asr_provider': config.ASR_API_PROVIDER,
                 'tts_provider': 'openai',
                 'openai_api_key': config.OPENAI_API_KEY or '',
                 'elevenlabs_api_key': config.ELEVENLABS_API_KEY or '',
             }
 
-    async def transcribe_with_whisper(self, audio_file_path: str, api_key: str = None) -> Optional[str]:
+    async def transcribe_with_whisper(self, audio_data: bytes, filename: str = 'voice.ogg',
+                                      api_key: str = None, language: str = None) -> Optional[str]:
         """Transcribe audio using OpenAI Whisper API"""
         openai_key = api_key or config.OPENAI_API_KEY
         if not openai_key:
             return None
 
         try:
-            async with aiofiles.open(audio_file_path, 'rb') as audio_file:
-                audio_data = await audio_file.read()
-
-            # Create a file-like object from bytes
-            audio_file = io.BytesIO(audio_data)
-            audio_file.name = Path(audio_file_path).name
-
             # Use custom API key if provided
             client = openai.AsyncOpenAI(api_key=openai_key) if openai_key != config.OPENAI_API_KEY else self.openai_client
 
-            response = await client.audio.transcriptions.create(
-                model=config.WHISPER_MODEL,
-                file=audio_file,
-                response_format="text"
-            )
+            params = {'language': language} if language else {}
 
+            # Bytes are passed directly, the filename only tells Whisper the container format
+            async with get_whisper_semaphore():
+                response = await client.audio.transcriptions.create(
+                    model=config.WHISPER_MODEL,
+                    file=(filename, audio_data),
+                    response_format="text",
+                    **params
+                )
+
+            self.asr_model = config.WHISPER_MODEL
             return response
         except Exception as e:
             logger.error(f"Whisper transcription error: {e}")
             return None
 
-    async def transcribe_with_google(self, audio_file_path: str) -> Optional[str]:
+    async def transcribe_with_whisper_language(self, audio_data: bytes, filename: str = 'voice.ogg',
+                                               api_key: str = None) -> Tuple[Optional[str], Optional[str]]:
+        """Transcribe audio with Whisper and return (text, detected ISO-639-1 language)"""
+        openai_key = api_key or config.OPENAI_API_KEY
+        if not openai_key:
+            return None, None
+
+        try:
+            client = openai.AsyncOpenAI(api_key=openai_key) if openai_key != config.OPENAI_API_KEY else self.openai_client
+
+            async with get_whisper_semaphore():
+                response = await client.audio.transcriptions.create(
+                    model=config.WHISPER_MODEL,
+                    file=(filename, audio_data),
+                    response_format="verbose_json"
+                )
+
+            self.asr_model = config.WHISPER_MODEL
+            language = WHISPER_LANGUAGE_CODES.get((response.language or '').lower())
+            return response.text, language
+        except Exception as e:
+            logger.error(f"Whisper transcription error: {e}")
+            return None, None
+
+    async def transcribe_with_local_language(self, audio_data: bytes, input_format: str = None,
+                                             language: str = None) -> Tuple[Optional[str], Optional[str]]:
+        """Transcribe audio with the offline faster-whisper engine, returns (text, language)"""
+        if not local_asr.available:
+            return None, None
+
+        try:
+            pcm_data = await audio_engine.decode(audio_data, input_format)
+        except Exception as e:
+            logger.error(f"Local ASR decoding error: {e}")
+            return None, None
+
+        text, detected = await local_asr.transcribe(pcm_data, PCM_SAMPLE_RATE, language)
+        if text is not None:
+            self.asr_model = f"local:{config.LOCAL_ASR_MODEL}"
+        return text, detected
+
+    async def transcribe_with_local(self, audio_data: bytes, input_format: str = None,
+                                    language: str = None) -> Optional[str]:
+        """Transcribe audio with the offline faster-whisper engine"""
+        text, _ = await self.transcribe_with_local_language(audio_data, input_format, language)
+        return text
+
+    async def transcribe_segments(self, segments: List[bytes], api_key: str = None,
+                                  provider: str = 'openai') -> Optional[str]:
+        """Transcribe segments concurrently and join the text in order
+
+        The first segment is transcribed alone to detect the language, which is
+        then passed to the remaining segments so short pieces are not misdetected.
+        """
+        local = provider == 'local'
+
+        if len(segments) == 1:
+            if local:
+                return await self.transcribe_with_local(segments[0], 'ogg')
+            return await self.transcribe_with_whisper(segments[0], 'voice.ogg', api_key)
+
+        if local:
+            first_text, language = await self.transcribe_with_local_language(segments[0], 'ogg')
+        else:
+            first_text, language = await self.transcribe_with_whisper_language(segments[0], 'segment_0.ogg', api_key)
+        if first_text is None:
+            return None
+
+        rest = await asyncio.gather(*(
+            self.transcribe_with_local(segment, 'ogg', language) if local else
+            self.transcribe_with_whisper(segment, f'segment_{index}.ogg', api_key, language=language)
+            for index, segment in enumerate(segments[1:], start=1)
+        ))
+        if any(part is None for part in rest):
+            return None
+
+        parts = [part.strip() for part in [first_text, *rest] if part and part.strip()]
+        return ' '.join(parts)
+
+    async def transcribe_with_google(self, audio_data: bytes, input_format: str = None,
+                                     language: str = None) -> Optional[str]:
         """Transcribe audio using Google Speech-to-Text (fallback)"""
         try:
             import speech_recognition as sr
 
             recognizer = sr.Recognizer()
 
-            # Convert audio to WAV if needed
-            audio = AudioSegment.from_file(audio_file_path)
-            wav_path = audio_file_path.replace(Path(audio_file_path).suffix, '.wav')
-            audio.export(wav_path, format='wav')
-
-            with sr.AudioFile(wav_path) as source:
-                audio_data = recognizer.record(source)
+            # Decode to raw PCM in memory instead of exporting a WAV file
+            pcm_data = await audio_engine.decode(audio_data, input_format)
+            audio = sr.AudioData(pcm_data, PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH)
 
             # Run in executor to avoid blocking
             loop = asyncio.get_event_loop()
             text = await loop.run_in_executor(
                 None,
-                lambda: recognizer.recognize_google(audio_data, language='auto')
+                lambda: recognizer.recognize_google(audio, language=language or config.GOOGLE_ASR_LANGUAGE)
             )
 
-            # Clean up temporary file
-            if wav_path != audio_file_path:
-                os.remove(wav_path)
-
+            self.asr_model = 'google'
             return text
         except Exception as e:
             logger.error(f"Google STT error: {e}")
             return None
 
-    async def transcribe_audio(self, audio_file_path: str) -> Optional[str]:
+    async def transcribe_audio(self, audio_data: bytes, filename: str = 'voice.mp3') -> Optional[str]:
         """Transcribe audio using available services"""
         # Get voice configuration
         voice_config = await self.get_voice_config()
@@ -124,14 +237,28 @@ class VoiceService:
             logger.warning("ASR is disabled in settings")
             return None
 
-        # Try Whisper first
+        input_format = filename.rsplit('.', 1)[-1]
+        local_first = voice_config['asr_provider'] == 'local'
+
+        if local_first:
+            text = await self.transcribe_with_local(audio_data, input_format)
+            if text:
+                return text
+
+        # Try Whisper
         if voice_config['openai_api_key']:
-            text = await self.transcribe_with_whisper(audio_file_path, voice_config['openai_api_key'])
+            text = await self.transcribe_with_whisper(audio_data, filename, voice_config['openai_api_key'])
+            if text:
+                return text
+
+        # Offline engine keeps voice working while Whisper is unavailable
+        if not local_first:
+            text = await self.transcribe_with_local(audio_data, input_format)
             if text:
                 return text
 
-        # Fallback to Google
-        return await self.transcribe_with_google(audio_file_path)
+        # Last resort: Google
+        return await self.transcribe_with_google(audio_data, filename.rsplit('.', 1)[-1])
 
     async def generate_speech_gtts(self, text: str, language: str = 'en',
                                   speed: float = 1.0) -> Optional[bytes]:
@@ -169,31 +296,14 @@ class VoiceService:
 
             lang_code = gtts_lang_map.get(language, 'en')
 
-            # Generate speech
+            # Generate speech into memory (gTTS does blocking HTTP, keep it off the event loop)
             tts = gTTS(text=text, lang=lang_code, slow=(speed < 1.0))
+            buffer = io.BytesIO()
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, tts.write_to_fp, buffer)
 
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-                tts.save(tmp_file.name)
-                tmp_path = tmp_file.name
-
-            # Read the file
-            async with aiofiles.open(tmp_path, 'rb') as f:
-                audio_data = await f.read()
-
-            # Adjust speed if needed
-            if speed != 1.0 and speed > 0:
-                audio = AudioSegment.from_mp3(io.BytesIO(audio_data))
-                # Speed up or slow down
-                audio = audio.speedup(playback_speed=speed)
-                buffer = io.BytesIO()
-                audio.export(buffer, format='mp3')
-                audio_data = buffer.getvalue()
-
-            # Clean up
-            os.remove(tmp_path)
-
-            return audio_data
+            # Speed change and Opus encoding in one ffmpeg pass
+            return await self.encode_voice_note(buffer.getvalue(), 'mp3', speed)
         except Exception as e:
             logger.error(f"gTTS error: {e}")
             return None
@@ -226,7 +336,7 @@ class VoiceService:
 
             async with self.session.post(url, headers=headers, json=data) as response:
                 if response.status == 200:
-                    return await response.read()
+                    return await self.encode_voice_note(await response.read(), 'mp3')
                 else:
                     logger.error(f"ElevenLabs error: {response.status}")
                     return None
@@ -250,7 +360,7 @@ class VoiceService:
                 voice=voice,  # alloy, echo, fable, onyx, nova, shimmer
                 input=text,
                 speed=speed,  # 0.25 to 4.0
-                response_format="mp3"
+                response_format="opus"  # OGG/Opus, sent as a voice note without transcoding
             )
 
             # Convert response to bytes
@@ -260,113 +370,277 @@ class VoiceService:
             logger.error(f"OpenAI TTS error: {e}")
             return None
 
+    async def generate_speech_local(self, text: str, language: str = 'en',
+                                    speed: float = 1.0) -> Optional[bytes]:
+        """Generate speech offline with espeak-ng (tempo is set natively)"""
+        wav_data = await local_tts.synthesize(text, language, speed)
+        if not wav_data:
+            return None
+        return await self.encode_voice_note(wav_data, 'wav')
+
+    async def encode_voice_note(self, audio_data: bytes, input_format: str = 'mp3',
+                                speed: float = 1.0) -> bytes:
+        """Transcode provider audio to OGG/Opus, keeping the original if ffmpeg fails"""
+        try:
+            return await audio_engine.to_voice_note(audio_data, input_format, speed)
+        except Exception as e:
+            logger.error(f"Voice note encoding error: {e}")
+            return audio_data
+
+    @staticmethod
+    def get_tts_provider(voice_config: dict, premium: bool = False) -> str:
+        """Provider generate_speech will try first for this configuration"""
+        if voice_config['tts_provider'] == 'local' and local_tts.available:
+            return 'local'
+        if premium:
+            if voice_config['tts_provider'] == 'elevenlabs' and voice_config['elevenlabs_api_key']:
+                return 'elevenlabs'
+            if voice_config['openai_api_key']:
+                return 'openai'
+        return 'local' if local_tts.available else 'gtts'
+
     async def generate_speech(self, text: str, language: str = 'en',
                             premium: bool = False, speed: float = 1.0,
-                            voice_type: str = 'alloy') -> Optional[bytes]:
+                            voice_type: str = 'alloy', voice_config: dict = None) -> Optional[bytes]:
         """Generate speech using available services"""
+        audio, _ = await self.generate_speech_with_provider(text, language, premium, speed, voice_type,
+                                                            voice_config=voice_config)
+        return audio
+
+    async def generate_speech_with_provider(self, text: str, language: str = 'en',
+                                            premium: bool = False, speed: float = 1.0,
+                                            voice_type: str = 'alloy',
+                                            voice_config: dict = None) -> Tuple[Optional[bytes], Optional[str]]:
+        """Generate speech, returns (audio, provider that produced it)"""
         # Get voice configuration
-        voice_config = await self.get_voice_config()
+        if voice_config is None:
+            voice_config = await self.get_voice_config()
         tts_provider = voice_config['tts_provider']
 
+        # Offline engine is used for everyone when selected explicitly
+        if tts_provider == 'local':
+            audio = await self.generate_speech_local(text, language, speed)
+            if audio:
+                return audio, 'local'
+
         # For premium users, try higher quality services first based on provider setting
         if premium:
             # Try ElevenLabs first if configured
             if tts_provider == 'elevenlabs' and voice_config['elevenlabs_api_key']:
                 audio = await self.generate_speech_elevenlabs(text, language, api_key=voice_config['elevenlabs_api_key'])
                 if audio:
-                    return audio
+                    return audio, 'elevenlabs'
 
             # Try OpenAI TTS with user settings (default or fallback)
             if voice_config['openai_api_key']:
                 audio = await self.generate_speech_openai(text, language, voice=voice_type, speed=speed, api_key=voice_config['openai_api_key'])
                 if audio:
-                    return audio
+                    return audio, 'openai'
+
+        # Free tier: offline engine, gTTS only when espeak-ng is not installed or fails
+        if tts_provider != 'local':
+            audio = await self.generate_speech_local(text, language, speed)
+            if audio:
+                return audio, 'local'
+
+        audio = await self.generate_speech_gtts(text, language, speed)
+        return audio, 'gtts' if audio else None
+
+    async def get_voice_payload(self, text: str, language: str = 'en',
+                                premium: bool = False, speed: float = 1.0,
+                                voice_type: str = 'alloy') -> Tuple[Optional[Union[str, bytes]], VoiceRequest]:
+        """Get Telegram file_id or audio bytes for text, synthesizing only on cache miss
+
+        Returns:
+            tuple: (cached file_id or audio bytes, None on failure; request for send_voice_payload)
+        """
+        text = text.strip()
+        voice_config = await self.get_voice_config()
+        provider = self.get_tts_provider(voice_config, premium)
+        cache_key = tts_cache.make_key(text, language, provider, voice_type, speed, VOICE_FORMAT)
+        request = VoiceRequest(text, language, premium, speed, voice_type, cache_key)
+
+        file_id = tts_cache.get_file_id(cache_key)
+        if file_id:
+            return file_id, request
+
+        audio_data = await tts_cache.get(cache_key)
+        if audio_data:
+            return audio_data, request
+
+        audio_data, produced_by = await self.generate_speech_with_provider(
+            text, language, premium, speed, voice_type, voice_config=voice_config
+        )
+        if audio_data:
+            # A fallback engine's audio is cached under its own provider, never the preferred one
+            if produced_by != provider:
+                logger.info(f"TTS fell back from {provider} to {produced_by}")
+                request = request._replace(
+                    key=tts_cache.make_key(text, language, produced_by, voice_type, speed, VOICE_FORMAT)
+                )
+            await tts_cache.put(request.key, audio_data)
+        return audio_data, request
+
+    async def send_voice_payload(self, message, payload: Union[str, bytes], request: VoiceRequest,
+                                 filename: str = "translation"):
+        """Send voice by cached file_id or upload bytes and remember the new file_id"""
+        from aiogram.types import BufferedInputFile
+        from aiogram.exceptions import TelegramBadRequest
+
+        if isinstance(payload, str):
+            try:
+                return await message.answer_voice(payload)
+            except TelegramBadRequest as e:
+                logger.warning(f"Cached voice file_id rejected, re-uploading: {e}")
+                tts_cache.forget_file_id(request.key)
+                payload = await tts_cache.get(request.key)
+
+            if not payload:
+                # Audio was evicted from disk, synthesize it again
+                payload, request = await self.get_voice_payload(
+                    request.text, request.language, request.premium, request.speed, request.voice_type
+                )
+                if not payload:
+                    return None
+                if isinstance(payload, str):
+                    return await message.answer_voice(payload)
 
-        # Fallback to gTTS (free)
-        return await self.generate_speech_gtts(text, language, speed)
+        # Audio is OGG/Opus unless encoding fell back to the provider's MP3
+        extension = 'ogg' if payload[:4] == b'OggS' else 'mp3'
+        sent = await message.answer_voice(BufferedInputFile(payload, filename=f"{filename}.{extension}"))
+        if sent and sent.voice:
+            tts_cache.set_file_id(request.key, sent.voice.file_id)
+        return sent
 
     async def convert_audio_format(self, audio_data: bytes, input_format: str,
                                   output_format: str = 'mp3') -> bytes:
         """Convert audio between formats"""
         try:
-            audio = AudioSegment.from_file(io.BytesIO(audio_data), format=input_format)
-            buffer = io.BytesIO()
-            audio.export(buffer, format=output_format)
-            return buffer.getvalue()
+            return await audio_engine.transcode(audio_data, input_format, output_format)
         except Exception as e:
             logger.error(f"Audio conversion error: {e}")
             return audio_data
 
-    async def download_voice_message(self, file_url: str, bot_token: str) -> Optional[bytes]:
-        """Download voice message from Telegram"""
+    async def download_voice_message(self, file_id: str, bot) -> Optional[bytes]:
+        """Download voice message from Telegram straight into memory"""
         try:
-            if not self.session:
-                self.session = aiohttp.ClientSession()
-
-            async with self.session.get(file_url) as response:
-                if response.status == 200:
-                    return await response.read()
-                else:
-                    logger.error(f"Failed to download voice message: {response.status}")
-                    return None
+            buffer = await bot.download(file_id, destination=io.BytesIO())
+            return buffer.getvalue() if buffer else None
         except Exception as e:
             logger.error(f"Voice download error: {e}")
             return None
 
-    async def process_voice_message(self, file_id: str, bot) -> Optional[str]:
-        """Process voice message from Telegram"""
-        try:
-            # Get file info
-            file = await bot.get_file(file_id)
-            file_url = f"https://api.telegram.org/file/bot{config.BOT_TOKEN}/{file.file_path}"
+    async def process_voice_message(self, file_id: str, bot,
+                                    file_unique_id: str = None) -> Tuple[Optional[str], dict]:
+        """Process voice message from Telegram
 
-            # Download the file
-            audio_data = await self.download_voice_message(file_url, config.BOT_TOKEN)
-            if not audio_data:
-                return None
+        Returns:
+            tuple: (transcribed text or None, metadata with original/trimmed durations)
+        """
+        # Cache under the configured primary engine so local and Whisper results never mix
+        voice_config = await self.get_voice_config()
+        if voice_config['asr_provider'] == 'local' and local_asr.available:
+            asr_model = f"local:{config.LOCAL_ASR_MODEL}"
+        else:
+            asr_model = config.WHISPER_MODEL
 
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.ogg') as tmp_file:
-                tmp_file.write(audio_data)
-                tmp_path = tmp_file.name
+        # Forwarded voice notes keep their file_unique_id, skip download and ASR for them
+        if file_unique_id:
+            cached_text = await transcription_cache.get(file_unique_id, asr_model)
+            if cached_text:
+                logger.info(f"Transcription cache hit for {file_unique_id}")
+                return cached_text, {}
 
-            try:
-                # Try to transcribe OGG directly with Whisper first (it supports OGG)
-                if config.OPENAI_API_KEY:
-                    text = await self.transcribe_with_whisper(tmp_path)
-                    if text:
-                        os.remove(tmp_path)
-                        return text
+        text, metadata = await self.download_and_transcribe(file_id, bot)
 
-                # If Whisper fails or is not available, try to convert using pydub
-                audio = AudioSegment.from_ogg(tmp_path)
-                mp3_path = tmp_path.replace('.ogg', '.mp3')
-                audio.export(mp3_path, format='mp3')
+        # Only results of the preferred engine are cached, fallbacks are retried next time
+        if text and file_unique_id and self.asr_model == asr_model:
+            await transcription_cache.put(file_unique_id, asr_model, text)
 
-                # Transcribe converted file
-                text = await self.transcribe_audio(mp3_path)
+        return text, metadata
 
-                # Clean up
-                os.remove(tmp_path)
-                os.remove(mp3_path)
+    async def prepare_segments(self, audio_data: bytes) -> Tuple[List[bytes], dict]:
+        """Trim silence and split long voice messages at pauses before speech recognition
 
-                return text
+        Returns:
+            tuple: (OGG/Opus segments in order, metadata with durations in ms)
+        """
+        metadata = {}
+        if not config.VAD_ENABLED:
+            return [audio_data], metadata
+
+        try:
+            pcm_data = await audio_engine.decode(audio_data)
+            bytes_per_ms = PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH // 1000
+            metadata['original_duration_ms'] = len(pcm_data) // bytes_per_ms
+
+            segments = await audio_engine.run_in_worker(
+                vad.split_segments, pcm_data, PCM_SAMPLE_RATE,
+                config.VAD_MIN_SILENCE_MS, config.VAD_THRESHOLD_DB, config.VAD_KEEP_MS,
+                config.ASR_SEGMENT_MS
+            )
+            trimmed_size = sum(len(segment) for segment in segments)
+            metadata['trimmed_duration_ms'] = trimmed_size // bytes_per_ms
+            metadata['segments'] = len(segments)
+
+            # Re-encoding is only worth it when a noticeable part was cut or the clip is split
+            if len(segments) == 1 and trimmed_size > len(pcm_data) * 0.95:
+                return [audio_data], metadata
+
+            encoded = await asyncio.gather(*(audio_engine.encode_pcm(segment) for segment in segments))
+            return list(encoded), metadata
+        except Exception as e:
+            logger.error(f"Silence trimming error: {e}")
+            return [audio_data], metadata
+
+    async def download_and_transcribe(self, file_id: str, bot) -> Tuple[Optional[str], dict]:
+        """Download voice message from Telegram, trim silence and transcribe it"""
+        metadata = {}
+        text = None
+        try:
+            # Download the file into memory
+            audio_data = await self.download_voice_message(file_id, bot)
+            if not audio_data:
+                return None, metadata
+
+            if not await self.validate_audio_duration(audio_data, config.MAX_VOICE_DURATION):
+                logger.warning(f"Voice message {file_id} exceeds {config.MAX_VOICE_DURATION}s, skipping")
+                return None, metadata
+
+            segments, metadata = await self.prepare_segments(audio_data)
+            voice_config = await self.get_voice_config()
+
+            try:
+                # Transcribe OGG segments with the configured engine (Whisper supports OGG)
+                if voice_config['asr_provider'] == 'local' and local_asr.available:
+                    text = await self.transcribe_segments(segments, provider='local')
+                elif voice_config['openai_api_key']:
+                    text = await self.transcribe_segments(segments, voice_config['openai_api_key'])
+                if text:
+                    return text, metadata
+
+                # Fallbacks transcribe the clip in one piece (trimmed when it was not split)
+                if len(segments) == 1:
+                    audio_data = segments[0]
+
+                # If Whisper fails or is not available, convert through ffmpeg pipes
+                mp3_data = await audio_engine.transcode(audio_data, 'ogg', 'mp3')
+
+                # Transcribe converted audio
+                text = await self.transcribe_audio(mp3_data, 'voice.mp3')
             except Exception as conversion_error:
                 logger.error(f"Audio conversion error (ffmpeg might be missing): {conversion_error}")
 
                 # If conversion fails, try transcribing OGG directly with Google (may not work)
                 try:
-                    text = await self.transcribe_with_google(tmp_path)
-                    os.remove(tmp_path)
-                    return text
+                    text = await self.transcribe_with_google(audio_data, 'ogg')
                 except Exception as google_error:
                     logger.error(f"Google STT with OGG failed: {google_error}")
-                    os.remove(tmp_path)
-                    return None
 
         except Exception as e:
             logger.error(f"Voice processing error: {e}")
-            return None
+
+        return text, metadata
 
     async def validate_audio_duration(self, audio_data: bytes, max_duration: int = None) -> bool:
         """Validate audio duration"""
@@ -375,8 +649,10 @@ class VoiceService:
             max_duration = await db.get_setting('max_voice_duration', config.MAX_VOICE_DURATION)
 
         try:
-            audio = AudioSegment.from_file(io.BytesIO(audio_data))
-            duration_seconds = len(audio) / 1000
+            # Read duration from container headers, decode only for unknown formats
+            duration_seconds = probe_duration(audio_data)
+            if duration_seconds is None:
+                duration_seconds = await audio_engine.probe_duration(audio_data)
             return duration_seconds <= max_duration
         except Exception as e:
             logger.error(f"Audio validation error: {e}")
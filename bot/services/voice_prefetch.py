@@ -0,0 +1,149 @@
+"""Speculative voice generation for users who usually request voice replies"""
+
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Tuple, Optional, List, Union
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Voice buttons whose audio can be generated ahead of the tap
+PREFETCH_KINDS = ('voice_exact', 'voice_styled')
+
+
+class VoicePrefetcher:
+    """Tracks voice button usage per user and synthesizes likely requests in advance
+
+    Prefetched audio goes into the TTS cache, so a later tap is served without
+    synthesis. Pending tasks are remembered for VOICE_PREFETCH_TTL seconds and the
+    number of speculative syntheses is capped by VOICE_PREFETCH_BUDGET per hour.
+    Usage is kept for the VOICE_PREFETCH_USERS most recently active users.
+    """
+
+    def __init__(self):
+        # user_id -> {'translations': n, 'voice_exact': n, 'voice_styled': n}, least recent first
+        self.usage: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+        # (user_id, text, language, speed, voice_type) -> (created_at, task)
+        self.pending: Dict[Tuple, Tuple[float, asyncio.Task]] = {}
+        self.budget_window_start = time.time()
+        self.budget_used = 0
+        self.stats = {'scheduled': 0, 'hits': 0, 'misses': 0, 'over_budget': 0}
+
+    def _user_usage(self, user_id: int) -> Dict[str, int]:
+        usage = self.usage.setdefault(user_id, {'translations': 0})
+        self.usage.move_to_end(user_id)
+        while len(self.usage) > config.VOICE_PREFETCH_USERS:
+            self.usage.popitem(last=False)
+        return usage
+
+    def record_translation(self, user_id: int):
+        """Count a translation shown to the user (denominator for usage ratio)"""
+        self._user_usage(user_id)['translations'] += 1
+
+    def record_voice_request(self, user_id: int, kind: str):
+        """Count a voice button press"""
+        usage = self._user_usage(user_id)
+        usage[kind] = usage.get(kind, 0) + 1
+
+    def likely_kinds(self, user_id: int) -> List[str]:
+        """Voice buttons the user presses often enough to be worth prefetching"""
+        usage = self.usage.get(user_id)
+        if not usage or usage['translations'] < config.VOICE_PREFETCH_MIN_SAMPLES:
+            return []
+
+        return [
+            kind for kind in PREFETCH_KINDS
+            if usage.get(kind, 0) / usage['translations'] >= config.VOICE_PREFETCH_MIN_RATIO
+        ]
+
+    def _take_budget(self) -> bool:
+        """Consume one unit of the hourly speculative synthesis budget"""
+        now = time.time()
+        if now - self.budget_window_start >= 3600:
+            self.budget_window_start = now
+            self.budget_used = 0
+
+        if self.budget_used >= config.VOICE_PREFETCH_BUDGET:
+            return False
+
+        self.budget_used += 1
+        return True
+
+    def _cleanup(self):
+        """Drop expired prefetch tasks"""
+        now = time.time()
+        expired = [key for key, (created_at, _) in self.pending.items()
+                   if now - created_at > config.VOICE_PREFETCH_TTL]
+        for key in expired:
+            _, task = self.pending.pop(key)
+            task.cancel()
+
+    def schedule(self, user_id: int, text: str, language: str,
+                 speed: float = 1.0, voice_type: str = 'alloy') -> bool:
+        """Start background synthesis of text unless it is already scheduled or over budget"""
+        if not text or not text.strip():
+            return False
+
+        self._cleanup()
+
+        key = (user_id, text.strip(), language, speed, voice_type)
+        if key in self.pending:
+            return True
+
+        if not self._take_budget():
+            self.stats['over_budget'] += 1
+            logger.info(f"Voice prefetch budget exhausted, skipping user {user_id}")
+            return False
+
+        task = asyncio.create_task(self._synthesize(text.strip(), language, speed, voice_type))
+        self.pending[key] = (time.time(), task)
+        self.stats['scheduled'] += 1
+        return True
+
+    async def take(self, user_id: int, text: str, language: str,
+                   speed: float = 1.0,
+                   voice_type: str = 'alloy') -> Optional[Tuple[Union[str, bytes], tuple]]:
+        """Return prefetched (payload, voice request) for text, waiting if still running"""
+        key = (user_id, text.strip(), language, speed, voice_type)
+        entry = self.pending.pop(key, None)
+        if not entry:
+            self.stats['misses'] += 1
+            return None
+
+        _, task = entry
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            result = None
+
+        if result and result[0]:
+            self.stats['hits'] += 1
+            return result
+
+        self.stats['misses'] += 1
+        return None
+
+    async def _synthesize(self, text: str, language: str, speed: float,
+                          voice_type: str) -> Optional[Tuple[Union[str, bytes], tuple]]:
+        """Generate speech in the background and store it in the TTS cache"""
+        from bot.services.voice import VoiceService
+
+        try:
+            async with VoiceService() as voice_service:
+                return await voice_service.get_voice_payload(
+                    text=text,
+                    language=language,
+                    premium=True,
+                    speed=speed,
+                    voice_type=voice_type
+                )
+        except Exception as e:
+            logger.error(f"Voice prefetch error: {e}")
+            return None
+
+
+# Global prefetcher instance
+voice_prefetcher = VoicePrefetcher()
@@ -0,0 +1,81 @@
+"""Header-only audio duration probing (no decoding)"""
+
+import struct
+from typing import Optional
+
+OGG_CAPTURE = b'OggS'
+OGG_HEADER_SIZE = 27
+OPUS_SAMPLE_RATE = 48000  # Opus granule positions are always in 48 kHz samples
+
+
+def _first_ogg_packet(data: bytes) -> bytes:
+    """Return the payload of the first OGG page (codec identification header)"""
+    if len(data) < OGG_HEADER_SIZE or not data.startswith(OGG_CAPTURE):
+        return b''
+    segments = data[26]
+    start = OGG_HEADER_SIZE + segments
+    size = sum(data[OGG_HEADER_SIZE:start])
+    return data[start:start + size]
+
+
+def _last_granule_position(data: bytes) -> Optional[int]:
+    """Find the granule position of the last complete OGG page"""
+    position = data.rfind(OGG_CAPTURE)
+    while position >= 0:
+        if position + OGG_HEADER_SIZE <= len(data):
+            granule = struct.unpack_from('<q', data, position + 6)[0]
+            if granule >= 0:  # -1 means no packet ends on this page
+                return granule
+        position = data.rfind(OGG_CAPTURE, 0, position)
+    return None
+
+
+def probe_ogg_duration(data: bytes) -> Optional[float]:
+    """Duration of an OGG/Opus or OGG/Vorbis stream from page headers"""
+    head = _first_ogg_packet(data)
+    if head.startswith(b'OpusHead') and len(head) >= 12:
+        pre_skip = struct.unpack_from('<H', head, 10)[0]
+        sample_rate = OPUS_SAMPLE_RATE
+    elif head.startswith(b'\x01vorbis') and len(head) >= 16:
+        pre_skip = 0
+        sample_rate = struct.unpack_from('<I', head, 12)[0]
+    else:
+        return None
+
+    granule = _last_granule_position(data)
+    if granule is None or not sample_rate:
+        return None
+    return max(granule - pre_skip, 0) / sample_rate
+
+
+def probe_wav_duration(data: bytes) -> Optional[float]:
+    """Duration of a RIFF/WAVE file from its fmt and data chunk headers"""
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack_from('<I', data, offset + 4)[0]
+        if chunk_id == b'fmt ' and offset + 16 <= len(data):
+            byte_rate = struct.unpack_from('<I', data, offset + 16)[0]
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None
+            # Streamed WAVs may carry a placeholder size, trust the actual payload then
+            size = min(chunk_size, len(data) - offset - 8)
+            return size / byte_rate
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def probe_duration(data: bytes) -> Optional[float]:
+    """Duration in seconds from container headers, None if the format is unknown"""
+    if not data:
+        return None
+    if data.startswith(OGG_CAPTURE):
+        return probe_ogg_duration(data)
+    if data.startswith(b'RIFF'):
+        return probe_wav_duration(data)
+    return None
@@ -0,0 +1,20 @@
+"""SQL of newest-first keyset pagination on (created_at, id)"""
+from datetime import datetime
+
+# Sort key of rows without created_at, they come last in newest-first order
+NULL_CREATED_AT = datetime(1970, 1, 1)
+
+
+def sort_key(created_column: str) -> str:
+    """created_at with NULLs replaced by NULL_CREATED_AT, so the row comparison never sees NULL"""
+    return f"COALESCE({created_column}, TIMESTAMP '{NULL_CREATED_AT.isoformat(' ')}')"
+
+
+def keyset_condition(created_column: str, id_column: str) -> str:
+    """WHERE condition for rows after the cursor in keyset_order() order"""
+    return f"({sort_key(created_column)}, {id_column}) < (?, ?)"
+
+
+def keyset_order(created_column: str, id_column: str) -> str:
+    """ORDER BY newest first, matching the sort key indexes of migration 020"""
+    return f"{sort_key(created_column)} DESC NULLS LAST, {id_column} DESC"
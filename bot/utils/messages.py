@@ -133,6 +133,10 @@ MESSAGES = {
 • Уменьшить фоновый шум
 • Отправить более короткое сообщение""",
 
+        'voice_too_long': """⏱ Голосовое сообщение слишком длинное
+
+Максимальная длительность: {max_duration} сек.""",
+
         'select_language': """🌍 *Выбор языка перевода*
 
 Текущий язык: *{current_lang}*
@@ -237,7 +241,11 @@ English, Russian, Spanish, French, German, Italian, Portuguese, Japanese, Chines
 • 📅 Yearly: 4680₽ (20% off!)
 
 *Payment methods:*
-Bank cards, SBP, e-wallets"""
+Bank cards, SBP, e-wallets""",
+
+        'voice_too_long': """⏱ Voice message is too long
+
+Maximum duration: {max_duration} sec."""
     }
 }
 
@@ -1,6 +1,54 @@
 """Premium status helper functions"""
+import time
 from datetime import datetime
+from typing import Dict, Tuple, Optional
 from bot.db_adapter import db_adapter
+from config import config
+
+
+class PremiumCache:
+    """In-memory users.premium_until per user
+
+    Premium entries stay valid exactly until premium_until. Non-premium entries
+    are re-read after PREMIUM_CACHE_TTL seconds, so subscriptions activated by
+    another process are picked up. Writes in this process update the cache
+    directly through set().
+    """
+
+    def __init__(self):
+        # user_id -> (premium_until or None, cached_at monotonic)
+        self.entries: Dict[int, Tuple[Optional[datetime], float]] = {}
+
+    def get(self, user_id: int) -> Optional[Tuple[bool, Optional[datetime]]]:
+        """Cached (is_premium, expires_at) or None when unknown"""
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+
+        premium_until, cached_at = entry
+        if premium_until is not None:
+            if datetime.now() < premium_until:
+                return True, premium_until
+            # Subscription ended, drop the entry and let the caller re-read
+            self.entries.pop(user_id, None)
+            return None
+
+        if time.monotonic() - cached_at > config.PREMIUM_CACHE_TTL:
+            self.entries.pop(user_id, None)
+            return None
+        return False, None
+
+    def set(self, user_id: int, premium_until: Optional[datetime]):
+        if premium_until is not None and premium_until <= datetime.now():
+            premium_until = None
+        self.entries[user_id] = (premium_until, time.monotonic())
+
+    def invalidate(self, user_id: int):
+        self.entries.pop(user_id, None)
+
+
+# Global cache instance
+premium_cache = PremiumCache()
 
 
 async def check_premium_status(user_id: int) -> tuple[bool, datetime | None]:
@@ -10,18 +58,17 @@ async def check_premium_status(user_id: int) -> tuple[bool, datetime | None]:
     Returns:
         tuple: (is_premium: bool, expires_at: datetime | None)
     """
+    cached = premium_cache.get(user_id)
+    if cached is not None:
+        return cached
+
     async with db_adapter.get_connection() as conn:
-        subscription = await conn.fetchone("""
-            SELECT expires_at FROM subscriptions
-            WHERE user_id = ?
-              AND status = 'active'
-              AND expires_at > ?
-            ORDER BY expires_at DESC LIMIT 1
-        """, user_id, datetime.now())
-
-    if subscription:
-        return True, subscription['expires_at']
-    return False, None
+        row = await conn.fetchone("""
+            SELECT premium_until FROM users WHERE user_id = ?
+        """, user_id)
+
+    premium_cache.set(user_id, row['premium_until'] if row else None)
+    return premium_cache.get(user_id)
 
 
 async def is_premium(user_id: int) -> bool:
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Check that bot and admin panel queries do not sequentially scan large tables
+
+SQL strings passed to execute/fetchone/fetchall/fetch/executemany in bot/database.py and
+admin_app/handlers/*.py are collected from the source and explained with
+EXPLAIN (GENERIC_PLAN), so no parameter values are needed (PostgreSQL 16+).
+Exits with code 1 if any plan contains a Seq Scan on a table with at least
+--min-rows rows (planner estimate from pg_class.reltuples).
+
+Usage: python check_query_plans.py [--min-rows 10000] [-v]
+"""
+import argparse
+import ast
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from bot.db_adapter import db_adapter, convert_query
+
+BASE_DIR = Path(__file__).parent
+SOURCES = [BASE_DIR / 'bot' / 'database.py'] + sorted((BASE_DIR / 'admin_app' / 'handlers').glob('*.py'))
+
+QUERY_METHODS = {'execute', 'fetchone', 'fetchall', 'fetch', 'executemany'}
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+
+# Whole-table aggregates where a full scan is the expected plan: (function, table)
+FULL_SCAN_ALLOWED = {
+    ('get_user_count', 'users'),
+}
+
+
+def _sql_text(node, assignments):
+    """SQL string of a call argument: literal, f-string (placeholders dropped) or local variable"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        # Dynamic parts are WHERE/ORDER fragments, the base query is still worth checking
+        return ''.join(part.value for part in node.values if isinstance(part, ast.Constant))
+    if isinstance(node, ast.Name) and node.id in assignments:
+        return _sql_text(assignments[node.id], {})
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and node.func.attr == 'register_hot_query' and len(node.args) == 2):
+        # SQL_... = db_adapter.register_hot_query(name, query)
+        return _sql_text(node.args[1], {})
+    return None
+
+
+def collect_queries():
+    """Return [(location, function, sql)] for every query found in SOURCES"""
+    queries = []
+    for path in SOURCES:
+        tree = ast.parse(path.read_text(encoding='utf-8'))
+        module_assignments = {
+            node.targets[0].id: node.value for node in tree.body
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+        }
+        for func in ast.walk(tree):
+            if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+
+            assignments = dict(module_assignments)
+            for node in ast.walk(func):
+                if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                    assignments[node.targets[0].id] = node.value
+
+            for node in ast.walk(func):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                        and node.func.attr in QUERY_METHODS and node.args):
+                    continue
+                sql = _sql_text(node.args[0], assignments)
+                if sql and sql.strip().upper().startswith(EXPLAINABLE):
+                    location = f"{path.relative_to(BASE_DIR)}:{node.lineno}"
+                    queries.append((location, func.name, sql.strip()))
+    return queries
+
+
+def seq_scans(plan):
+    """Yield relation names of Seq Scan nodes in an EXPLAIN (FORMAT JSON) plan"""
+    if plan.get('Node Type') == 'Seq Scan':
+        yield plan.get('Relation Name')
+    for child in plan.get('Plans', []):
+        yield from seq_scans(child)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--min-rows', type=int, default=10000,
+                        help='tables with fewer estimated rows may be seq-scanned (default: 10000)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print every checked query')
+    args = parser.parse_args()
+
+    queries = collect_queries()
+    print(f"🔍 Found {len(queries)} queries in {len(SOURCES)} files")
+
+    failures = []
+    skipped = 0
+    async with db_adapter.get_connection() as conn:
+        version = await conn.fetchone('SHOW server_version_num')
+        if int(version[0]) < 160000:
+            print("❌ EXPLAIN (GENERIC_PLAN) requires PostgreSQL 16 or newer")
+            return 2
+
+        rows = await conn.fetchall('''
+            SELECT relname, reltuples::BIGINT AS estimated_rows
+            FROM pg_class
+            WHERE relkind IN ('r', 'p') AND relnamespace = 'public'::regnamespace
+        ''')
+        table_rows = {row['relname']: row['estimated_rows'] for row in rows}
+
+        for location, function, sql in queries:
+            pg_sql = convert_query(sql).sql
+            try:
+                result = await conn.conn.fetchval(f'EXPLAIN (GENERIC_PLAN, FORMAT JSON) {pg_sql}')
+            except Exception as e:
+                skipped += 1
+                print(f"⚠️  {location} ({function}): could not explain: {e}")
+                continue
+
+            plan = json.loads(result)[0]['Plan']
+            large = [
+                table for table in seq_scans(plan)
+                if table_rows.get(table, 0) >= args.min_rows and (function, table) not in FULL_SCAN_ALLOWED
+            ]
+            if large:
+                failures.append((location, function, large))
+                print(f"❌ {location} ({function}): Seq Scan on {', '.join(sorted(set(large)))}")
+            elif args.verbose:
+                print(f"✅ {location} ({function})")
+
+    await db_adapter.close_pool()
+
+    print(f"\nChecked {len(queries) - skipped} queries, {skipped} skipped, {len(failures)} with large seq scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -30,6 +30,22 @@ class Config:
     # Database
     DATABASE_PATH = os.getenv("DATABASE_PATH", "data/bot.db")
 
+    # Connection pool (also overridable by db_* keys in system_settings, applied at startup)
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))  # seconds waiting for a free connection
+    DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "60"))  # client-side, seconds (0 = none)
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # server-side (0 = none)
+    DB_MAX_INACTIVE_LIFETIME = float(os.getenv("DB_MAX_INACTIVE_LIFETIME", "300"))  # close idle connections after, seconds
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "1024"))  # asyncpg prepared statements per connection
+    DB_MAINTENANCE_TIMEOUT = float(os.getenv("DB_MAINTENANCE_TIMEOUT", "3600"))  # client-side limit for migrations and partition upkeep, seconds
+
+    # Analytics pool for admin/statistics reads (DATABASE_REPLICA_URL if set, else the primary)
+    DB_ANALYTICS_POOL_MIN_SIZE = int(os.getenv("DB_ANALYTICS_POOL_MIN_SIZE", "1"))
+    DB_ANALYTICS_POOL_MAX_SIZE = int(os.getenv("DB_ANALYTICS_POOL_MAX_SIZE", "3"))
+    DB_ANALYTICS_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_ANALYTICS_STATEMENT_TIMEOUT_MS", "60000"))
+    DB_REPLICA_RETRY_INTERVAL = int(os.getenv("DB_REPLICA_RETRY_INTERVAL", "60"))  # seconds on the primary before retrying the replica
+
     # Subscription Prices
     DAILY_PRICE = int(os.getenv("DAILY_PRICE", "100"))
     MONTHLY_PRICE = int(os.getenv("MONTHLY_PRICE", "490"))
@@ -38,6 +54,21 @@ class Config:
     # Limits
     FREE_DAILY_LIMIT = int(os.getenv("FREE_DAILY_LIMIT", "10"))
     MAX_HISTORY_ITEMS = int(os.getenv("MAX_HISTORY_ITEMS", "100"))
+    HISTORY_TRIM_INTERVAL = int(os.getenv("HISTORY_TRIM_INTERVAL", "300"))  # seconds between trims of recently active users
+    HISTORY_SWEEP_INTERVAL = int(os.getenv("HISTORY_SWEEP_INTERVAL", "86400"))  # seconds between full sweeps
+    HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "100"))  # write-behind batch size
+    HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))  # max seconds a write waits
+    HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))  # queued writes before dropping
+    HISTORY_WRITE_RETRIES = int(os.getenv("HISTORY_WRITE_RETRIES", "3"))  # retries of a batch while the database is unreachable
+    HISTORY_PARTITION_INTERVAL = int(os.getenv("HISTORY_PARTITION_INTERVAL", "21600"))  # seconds between partition maintenance runs
+    HISTORY_PARTITIONS_AHEAD = int(os.getenv("HISTORY_PARTITIONS_AHEAD", "2"))  # monthly partitions created in advance
+    HISTORY_HOT_MONTHS = int(os.getenv("HISTORY_HOT_MONTHS", "3"))  # full months kept before archiving
+    HISTORY_ARCHIVE_MONTHS = int(os.getenv("HISTORY_ARCHIVE_MONTHS", "24"))  # archive retention (0 = forever)
+    HISTORY_BACKFILL_BATCH = int(os.getenv("HISTORY_BACKFILL_BATCH", "5000"))  # ids per search_vector backfill statement
+
+    # Statistics rollups (admin dashboard)
+    STATS_FLUSH_INTERVAL = int(os.getenv("STATS_FLUSH_INTERVAL", "60"))  # seconds between counter flushes
+    STATS_SNAPSHOT_INTERVAL = int(os.getenv("STATS_SNAPSHOT_INTERVAL", "3600"))  # total/premium user counts
 
     # Admin Settings
     ADMIN_IDS_STR = os.getenv("ADMIN_IDS", "")
@@ -125,12 +156,53 @@ class Config:
     MAX_VOICE_DURATION = 60  # seconds
     SUPPORTED_AUDIO_FORMATS = ['.mp3', '.ogg', '.wav', '.m4a']
 
+    # Speculative voice generation (prefetch for users who usually request voice)
+    VOICE_PREFETCH_BUDGET = int(os.getenv("VOICE_PREFETCH_BUDGET", "100"))  # syntheses per hour
+    VOICE_PREFETCH_MIN_RATIO = float(os.getenv("VOICE_PREFETCH_MIN_RATIO", "0.5"))
+    VOICE_PREFETCH_MIN_SAMPLES = int(os.getenv("VOICE_PREFETCH_MIN_SAMPLES", "5"))
+    VOICE_PREFETCH_TTL = 600  # seconds
+    VOICE_PREFETCH_USERS = int(os.getenv("VOICE_PREFETCH_USERS", "50000"))  # users with tracked voice usage (LRU)
+
+    # Audio worker engine (ffmpeg jobs and process pool)
+    AUDIO_WORKERS = int(os.getenv("AUDIO_WORKERS", str(min(4, os.cpu_count() or 1))))
+    AUDIO_MAX_JOBS = int(os.getenv("AUDIO_MAX_JOBS", "4"))  # concurrent jobs
+    AUDIO_QUEUE_SIZE = int(os.getenv("AUDIO_QUEUE_SIZE", "32"))  # jobs waiting for a slot
+    AUDIO_JOB_TIMEOUT = int(os.getenv("AUDIO_JOB_TIMEOUT", "30"))  # seconds
+    VOICE_OPUS_BITRATE = os.getenv("VOICE_OPUS_BITRATE", "32k")  # TTS voice notes (OGG/Opus)
+
+    # Silence trimming before speech recognition
+    VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+    VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "700"))  # pauses longer than this are shortened
+    VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "-16"))  # relative to clip loudness
+    VAD_KEEP_MS = int(os.getenv("VAD_KEEP_MS", "200"))  # padding kept around speech
+
+    # Long voice messages are split at pauses and transcribed in parallel
+    ASR_SEGMENT_MS = int(os.getenv("ASR_SEGMENT_MS", "15000"))  # target segment length
+    WHISPER_CONCURRENCY = int(os.getenv("WHISPER_CONCURRENCY", "8"))  # parallel Whisper requests
+
+    # Speech recognition provider (overridden by asr_api_provider in system_settings): openai, local
+    ASR_API_PROVIDER = os.getenv("ASR_API_PROVIDER", "openai")
+    GOOGLE_ASR_LANGUAGE = os.getenv("GOOGLE_ASR_LANGUAGE", "ru-RU")  # last-resort fallback
+
+    # Offline CPU speech recognition (faster-whisper, optional dependency)
+    LOCAL_ASR_MODEL = os.getenv("LOCAL_ASR_MODEL", "small")
+    LOCAL_ASR_COMPUTE_TYPE = os.getenv("LOCAL_ASR_COMPUTE_TYPE", "int8")
+    LOCAL_ASR_WORKERS = int(os.getenv("LOCAL_ASR_WORKERS", "1"))
+    LOCAL_ASR_THREADS = int(os.getenv("LOCAL_ASR_THREADS", str(os.cpu_count() or 1)))
+    LOCAL_ASR_TIMEOUT = int(os.getenv("LOCAL_ASR_TIMEOUT", "120"))  # seconds
+
     # Export Settings
     PDF_FONT_SIZE = 12
     PDF_PAGE_SIZE = 'A4'
 
     # Cache Settings
     CACHE_TTL = 3600  # 1 hour
+    TTS_CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", str(Path(__file__).parent / "data" / "tts_cache")))
+    TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    TTS_CACHE_MAX_ENTRIES = int(os.getenv("TTS_CACHE_MAX_ENTRIES", "20000"))
+    TRANSCRIPTION_CACHE_SIZE = int(os.getenv("TRANSCRIPTION_CACHE_SIZE", "5000"))  # in-memory entries
+    USER_PROFILE_CACHE_SIZE = int(os.getenv("USER_PROFILE_CACHE_SIZE", "100000"))  # seen-user fingerprints
+    PREMIUM_CACHE_TTL = int(os.getenv("PREMIUM_CACHE_TTL", "60"))  # seconds, re-check for non-premium users
 
     # Webhook Configuration (for production)
     WEBHOOK_HOST = os.getenv("WEBHOOK_HOST")
@@ -185,6 +257,7 @@ class Config:
                     'max_history_items': 'MAX_HISTORY_ITEMS',
                     'rate_limit_window': 'RATE_LIMIT_WINDOW',
                     'rate_limit_requests': 'RATE_LIMIT_MAX_REQUESTS',
+                    'voice_prefetch_budget': 'VOICE_PREFETCH_BUDGET',
                 }
 
                 attr_name = key_mapping.get(key, key.upper())
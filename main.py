@@ -20,6 +20,13 @@ sys.path.append(str(Path(__file__).parent))
 
 from config import config
 from bot.database import db
+from bot.db_adapter import db_adapter
+from bot.services.audio_engine import audio_engine
+from bot.services.local_asr import local_asr
+from bot.services.history_retention import history_retention
+from bot.services.stats_rollup import stats_rollup
+from bot.services.history_writer import history_writer
+from bot.services.history_partitions import history_partitions
 from bot.handlers import base, callbacks, payments, export, admin
 from bot.middlewares.throttling import ThrottlingMiddleware
 from bot.middlewares.user_middleware import UserMiddleware
@@ -57,16 +64,41 @@ async def on_startup():
         # Load settings from database (overrides .env)
         await config.load_from_db(db)
         logger.info("⚙️ System settings loaded from database")
+
+        # Open the pool's min_size connections now instead of on the first update
+        await db_adapter.warm_up()
     except Exception as e:
         logger.error(f"❌ Database initialization error: {e}")
         return False
 
+    # Start audio workers
+    audio_engine.start()
+    logger.info("✅ Audio engine started")
+
+    # Load the offline speech recognition model up front when it is the primary engine
+    # (warns when faster-whisper is missing)
+    if await db.get_setting('asr_api_provider', config.ASR_API_PROVIDER) == 'local':
+        await local_asr.start()
+
+    # Write translations, trim history, flush statistics rollups and manage history partitions in the background
+    history_writer.start()
+    history_retention.start()
+    stats_rollup.start()
+    history_partitions.start()
+
     logger.info("🎉 PolyglotAI44 started successfully!")
     return True
 
 async def on_shutdown():
     """Bot shutdown handler"""
     logger.info("🛑 Shutting down PolyglotAI44...")
+    audio_engine.stop()
+    local_asr.stop()
+    # Queued history first: it feeds the retention and rollup counters
+    await history_writer.stop()
+    await history_retention.stop()
+    await stats_rollup.stop()
+    await history_partitions.stop()
     logger.info("👋 PolyglotAI44 stopped")
 
 async def main():
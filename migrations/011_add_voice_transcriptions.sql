@@ -0,0 +1,16 @@
+-- Migration 011: Voice transcription cache
+-- Date: 2026-10-19
+-- Task: Reuse Whisper results for forwarded voice messages (same file_unique_id)
+
+CREATE TABLE IF NOT EXISTS voice_transcriptions (
+    file_unique_id TEXT NOT NULL,
+    asr_model TEXT NOT NULL,
+    text TEXT NOT NULL,
+    hits INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (file_unique_id, asr_model)
+);
+
+-- Old entries are rarely forwarded again, index supports cleanup by age
+CREATE INDEX IF NOT EXISTS idx_voice_transcriptions_last_used ON voice_transcriptions(last_used_at);
@@ -0,0 +1,6 @@
+-- Migration 012: Add voice durations to translation_history
+-- Date: 2026-10-19
+-- Task: Measure upload size and latency savings of silence trimming before Whisper
+
+ALTER TABLE translation_history ADD COLUMN IF NOT EXISTS original_duration_ms INTEGER;
+ALTER TABLE translation_history ADD COLUMN IF NOT EXISTS trimmed_duration_ms INTEGER;
@@ -0,0 +1,7 @@
+-- Migration 013: Document local ASR provider option
+-- Date: 2026-10-19
+-- Task: Offline CPU speech recognition selectable via asr_api_provider
+
+UPDATE system_settings
+SET description = 'ASR API provider: openai (Whisper API) or local (offline faster-whisper)'
+WHERE key = 'asr_api_provider';
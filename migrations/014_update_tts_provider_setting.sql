@@ -0,0 +1,7 @@
+-- Migration 014: Document local TTS provider option
+-- Date: 2026-10-19
+-- Task: Offline espeak-ng speech synthesis selectable via tts_provider
+
+UPDATE system_settings
+SET description = 'TTS provider: openai, elevenlabs, local (offline espeak-ng)'
+WHERE key = 'tts_provider';
@@ -0,0 +1,17 @@
+-- Migration 015: Denormalized premium expiry on users
+-- Date: 2026-10-19
+-- Task: Read premium status from users.premium_until instead of querying subscriptions per request
+
+-- Latest expires_at of the user's active subscriptions, kept in sync on subscription writes
+ALTER TABLE users ADD COLUMN IF NOT EXISTS premium_until TIMESTAMP;
+
+-- Backfill from existing active subscriptions
+UPDATE users u
+SET premium_until = s.expires_at
+FROM (
+    SELECT user_id, MAX(expires_at) AS expires_at
+    FROM subscriptions
+    WHERE status = 'active'
+    GROUP BY user_id
+) s
+WHERE s.user_id = u.user_id;
@@ -0,0 +1,28 @@
+-- Migration 016: Indexes for hot-path queries
+-- Date: 2026-10-19
+-- Task: Stop sequential scans in history, premium and dashboard queries (verify with check_query_plans.py)
+
+-- Built CONCURRENTLY so live writes are not blocked. A failed build leaves an
+-- INVALID index that IF NOT EXISTS would keep: DROP INDEX CONCURRENTLY it and re-run.
+
+-- get_user_history, history trimming, admin user history (user_id = ? ORDER BY created_at DESC)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_translation_history_user_created ON translation_history(user_id, created_at DESC);
+
+-- Dashboard statistics by day and last N days
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_translation_history_created ON translation_history(created_at);
+
+-- premium_until sync reads MAX(expires_at) of active subscriptions per user
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subscriptions_active_user_expires ON subscriptions(user_id, expires_at) WHERE status = 'active';
+
+-- Revenue by day
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subscriptions_created ON subscriptions(created_at);
+
+-- Premium user counts and the admin "premium only" filter (most users never subscribe)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_premium_until ON users(premium_until) WHERE premium_until IS NOT NULL;
+
+-- Admin users list, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_created ON users(created_at DESC);
+
+-- Admin feedback and action log lists, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_feedback_status_created ON feedback(status, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_admin_actions_created ON admin_actions(created_at DESC);
@@ -0,0 +1,78 @@
+-- Migration 017: Daily statistics rollups
+-- Date: 2026-10-19
+-- Task: Admin dashboard reads incrementally maintained counters instead of scanning translation_history
+
+-- Per-day error count and latency sums (averages = sum / count)
+ALTER TABLE statistics ADD COLUMN IF NOT EXISTS error_count INTEGER DEFAULT 0;
+ALTER TABLE statistics ADD COLUMN IF NOT EXISTS processing_time_sum_ms BIGINT DEFAULT 0;
+ALTER TABLE statistics ADD COLUMN IF NOT EXISTS processing_time_count INTEGER DEFAULT 0;
+ALTER TABLE statistics ADD COLUMN IF NOT EXISTS voice_time_sum_ms BIGINT DEFAULT 0;
+ALTER TABLE statistics ADD COLUMN IF NOT EXISTS voice_time_count INTEGER DEFAULT 0;
+
+-- Users that translated at least once per day (statistics.active_users counts new rows)
+CREATE TABLE IF NOT EXISTS daily_active_users (
+    date DATE NOT NULL,
+    user_id BIGINT NOT NULL,
+    PRIMARY KEY (date, user_id)
+);
+
+-- Per-day counters by language pair
+CREATE TABLE IF NOT EXISTS translation_stats_daily (
+    date DATE NOT NULL,
+    source_language TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    translations INTEGER DEFAULT 0,
+    voice_translations INTEGER DEFAULT 0,
+    error_count INTEGER DEFAULT 0,
+    processing_time_sum_ms BIGINT DEFAULT 0,
+    processing_time_count INTEGER DEFAULT 0,
+    PRIMARY KEY (date, source_language, target_language)
+);
+
+-- Backfill from existing history (days already written by the bot are kept)
+INSERT INTO daily_active_users (date, user_id)
+SELECT DISTINCT DATE(created_at), user_id
+FROM translation_history
+WHERE user_id IS NOT NULL AND created_at IS NOT NULL
+ON CONFLICT DO NOTHING;
+
+INSERT INTO translation_stats_daily (
+    date, source_language, target_language, translations, voice_translations,
+    error_count, processing_time_sum_ms, processing_time_count
+)
+SELECT DATE(created_at), COALESCE(source_language, 'auto'), COALESCE(target_language, 'en'),
+       COUNT(*),
+       COUNT(*) FILTER (WHERE is_voice),
+       COUNT(*) FILTER (WHERE status != 'success'),
+       COALESCE(SUM(processing_time_ms), 0),
+       COUNT(processing_time_ms)
+FROM translation_history
+WHERE created_at IS NOT NULL
+GROUP BY 1, 2, 3
+ON CONFLICT (date, source_language, target_language) DO NOTHING;
+
+INSERT INTO statistics (
+    date, active_users, total_translations, voice_translations, error_count,
+    processing_time_sum_ms, processing_time_count, voice_time_sum_ms, voice_time_count
+)
+SELECT DATE(created_at),
+       COUNT(DISTINCT user_id),
+       COUNT(*),
+       COUNT(*) FILTER (WHERE is_voice),
+       COUNT(*) FILTER (WHERE status != 'success'),
+       COALESCE(SUM(processing_time_ms), 0),
+       COUNT(processing_time_ms),
+       COALESCE(SUM(processing_time_ms) FILTER (WHERE is_voice), 0),
+       COUNT(processing_time_ms) FILTER (WHERE is_voice)
+FROM translation_history
+WHERE created_at IS NOT NULL
+GROUP BY 1
+ON CONFLICT (date) DO NOTHING;
+
+-- Revenue by day of purchase
+INSERT INTO statistics (date, revenue)
+SELECT DATE(created_at), SUM(amount)
+FROM subscriptions
+WHERE status = 'active' AND created_at IS NOT NULL
+GROUP BY 1
+ON CONFLICT (date) DO UPDATE SET revenue = EXCLUDED.revenue;
@@ -0,0 +1,112 @@
+-- Migration 018: Monthly partitions for translation_history
+-- Date: 2026-10-19
+-- Task: Range-partition translation_history by created_at and archive old months into translation_history_archive
+
+-- Every step is skipped or a no-op once translation_history is partitioned, so the
+-- migration can be re-run after a failure at any point.
+
+-- The partition key must be NOT NULL (scans the table, run at low traffic)
+UPDATE translation_history SET created_at = TIMESTAMP '1970-01-01' WHERE created_at IS NULL;
+ALTER TABLE translation_history ALTER COLUMN created_at SET NOT NULL;
+
+-- Upper bound of the rows that become the legacy partition, proven by a validated CHECK so
+-- ATTACH PARTITION does not scan the table. Added NOT VALID (brief lock) and validated in a
+-- separate statement (no write lock). Inserts past the bound fail until the swap below runs,
+-- hence the bound is the end of next month.
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'translation_history'::regclass) = 'r'
+       AND NOT EXISTS (SELECT 1 FROM pg_constraint
+                       WHERE conrelid = 'translation_history'::regclass
+                         AND conname = 'translation_history_legacy_bound') THEN
+        EXECUTE format(
+            'ALTER TABLE translation_history ADD CONSTRAINT translation_history_legacy_bound '
+            'CHECK (created_at < %L) NOT VALID',
+            date_trunc('month', LOCALTIMESTAMP) + INTERVAL '2 months'
+        );
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'translation_history'::regclass) = 'r' THEN
+        ALTER TABLE translation_history VALIDATE CONSTRAINT translation_history_legacy_bound;
+    END IF;
+END $$;
+
+-- Swap in the partitioned table in one transaction (a DO block is one statement) so inserts
+-- never see a missing table. With the CHECK above and the existing indexes and foreign key
+-- of the legacy table adopted as they are, the ATTACH only updates the catalog.
+DO $$
+DECLARE
+    legacy_bound TEXT;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'translation_history'::regclass) <> 'r' THEN
+        RETURN;
+    END IF;
+
+    SELECT substring(pg_get_constraintdef(oid) FROM '''([^'']+)''') INTO legacy_bound
+    FROM pg_constraint
+    WHERE conrelid = 'translation_history'::regclass AND conname = 'translation_history_legacy_bound';
+
+    ALTER TABLE translation_history RENAME TO translation_history_legacy;
+    ALTER INDEX IF EXISTS translation_history_pkey RENAME TO translation_history_legacy_pkey;
+    ALTER INDEX IF EXISTS idx_translation_history_user_created RENAME TO translation_history_legacy_user_created_idx;
+    ALTER INDEX IF EXISTS idx_translation_history_created RENAME TO translation_history_legacy_created_idx;
+
+    CREATE TABLE translation_history (
+        LIKE translation_history_legacy INCLUDING DEFAULTS,
+        FOREIGN KEY (user_id) REFERENCES users (user_id)
+    ) PARTITION BY RANGE (created_at);
+
+    -- The id sequence must outlive the legacy partition
+    ALTER SEQUENCE translation_history_id_seq OWNED BY translation_history.id;
+
+    CREATE INDEX idx_translation_history_user_created ON translation_history(user_id, created_at DESC);
+    CREATE INDEX idx_translation_history_created ON translation_history(created_at);
+
+    -- Existing rows become one partition up to the CHECK bound,
+    -- monthly partitions after it are created by the partition manager
+    EXECUTE format(
+        'ALTER TABLE translation_history ATTACH PARTITION translation_history_legacy '
+        'FOR VALUES FROM (MINVALUE) TO (%L)',
+        legacy_bound
+    );
+    ALTER TABLE translation_history_legacy DROP CONSTRAINT translation_history_legacy_bound;
+
+    -- Catches rows of months without a partition, moved out when the partition is created
+    CREATE TABLE translation_history_default PARTITION OF translation_history DEFAULT;
+END $$;
+
+-- Primary key (id, created_at): the unique index of the legacy partition is built CONCURRENTLY
+-- (a plain table, unlike the partitioned parent), and the parent's key adopts it instead of
+-- building one under lock. Partitions without one (default, monthly) are small.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS translation_history_legacy_id_created_key
+    ON translation_history_legacy (id, created_at);
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_constraint
+               WHERE conrelid = 'translation_history'::regclass AND contype = 'p') THEN
+        RETURN;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint
+                   WHERE conrelid = 'translation_history_legacy'::regclass
+                     AND conname = 'translation_history_legacy_id_created_key') THEN
+        ALTER TABLE translation_history_legacy ADD CONSTRAINT translation_history_legacy_id_created_key
+            UNIQUE USING INDEX translation_history_legacy_id_created_key;
+    END IF;
+    ALTER TABLE translation_history ADD CONSTRAINT translation_history_pkey PRIMARY KEY (id, created_at);
+END $$;
+
+-- Archived months: one row per user and month, items as a JSONB array (TOAST-compressed)
+CREATE TABLE IF NOT EXISTS translation_history_archive (
+    month DATE NOT NULL,
+    user_id BIGINT NOT NULL,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    items JSONB NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (month, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_translation_history_archive_user ON translation_history_archive(user_id, month DESC);
@@ -0,0 +1,38 @@
+-- Migration 019: Trigram and full-text search indexes
+-- Date: 2026-10-19
+-- Task: Index admin log and user search (pg_trgm for ILIKE, tsvector for ranked search)
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Full-text vector over source and translation, 'simple' config since texts are in any language
+ALTER TABLE translation_history ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
+-- Built-in trigger function, fills search_vector on every insert and update
+DROP TRIGGER IF EXISTS trg_translation_history_search_vector ON translation_history;
+CREATE TRIGGER trg_translation_history_search_vector
+    BEFORE INSERT OR UPDATE OF source_text, basic_translation ON translation_history
+    FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.simple', source_text, basic_translation);
+
+-- Existing rows are backfilled by the partition manager (bot/services/history_partitions.py)
+-- in HISTORY_BACKFILL_BATCH id ranges, one commit per range
+
+-- translation_history is partitioned (migration 018) and CONCURRENTLY is not available for it:
+-- the parent indexes are created ON ONLY (invalid, no build), then each partition index is
+-- built CONCURRENTLY and attached. The parent index turns valid once every partition has one,
+-- the partition manager builds those of monthly partitions that already exist.
+CREATE INDEX IF NOT EXISTS idx_translation_history_search ON ONLY translation_history USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_translation_history_source_trgm ON ONLY translation_history USING GIN (source_text gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_translation_history_translation_trgm ON ONLY translation_history USING GIN (basic_translation gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS translation_history_legacy_search_idx ON translation_history_legacy USING GIN (search_vector);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS translation_history_legacy_source_trgm_idx ON translation_history_legacy USING GIN (source_text gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS translation_history_legacy_translation_trgm_idx ON translation_history_legacy USING GIN (basic_translation gin_trgm_ops);
+
+ALTER INDEX idx_translation_history_search ATTACH PARTITION translation_history_legacy_search_idx;
+ALTER INDEX idx_translation_history_source_trgm ATTACH PARTITION translation_history_legacy_source_trgm_idx;
+ALTER INDEX idx_translation_history_translation_trgm ATTACH PARTITION translation_history_legacy_translation_trgm_idx;
+
+-- User search by name
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_username_trgm ON users USING GIN (username gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_first_name_trgm ON users USING GIN (first_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_last_name_trgm ON users USING GIN (last_name gin_trgm_ops);
@@ -0,0 +1,20 @@
+-- Migration 020: Sort key indexes for admin keyset pagination
+-- Date: 2026-10-19
+-- Task: Newest-first admin lists order by COALESCE(created_at, TIMESTAMP '1970-01-01') DESC NULLS LAST, id DESC
+
+-- Built CONCURRENTLY so live writes are not blocked. A failed build leaves an
+-- INVALID index that IF NOT EXISTS would keep: DROP INDEX CONCURRENTLY it and re-run.
+
+-- /api/users
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_created_sort
+    ON users ((COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC NULLS LAST, user_id DESC);
+
+-- /api/feedback with and without the status filter
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_feedback_created_sort
+    ON feedback ((COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC NULLS LAST, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_feedback_status_created_sort
+    ON feedback (status, (COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC NULLS LAST, id DESC);
+
+-- /api/admin-logs
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_admin_actions_created_sort
+    ON admin_actions ((COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC NULLS LAST, id DESC);